@@ -67,7 +67,8 @@ def plot_advanced_candlestick(
         if not asset:
             raise HTTPException(status_code=422, detail="Pelo menos um ativo deve ser especificado")
         
-        chart_bytes = visualizer.plot_candlestick(prices, asset) # Assuming visualizer has this method
+        # O provedor só entrega fechamentos: o OHLC é aproximado a partir deles
+        chart_bytes = visualizer.plot_candlestick(prices, asset, simulate=True)
         return StreamingResponse(io.BytesIO(chart_bytes), media_type="image/png")
         
     except DataProviderError as e:
@@ -815,7 +816,8 @@ def plot_interactive_candlestick(
         if not asset:
             raise HTTPException(status_code=422, detail="Pelo menos um ativo deve ser especificado")
         
-        chart_json = visualizer.plot_interactive_candlestick(prices, asset)
+        # O provedor só entrega fechamentos: o OHLC é aproximado a partir deles
+        chart_json = visualizer.plot_interactive_candlestick(prices, asset, simulate=True)
         return StreamingResponse(io.BytesIO(chart_json), media_type="application/json")
     
     except DataProviderError as e:
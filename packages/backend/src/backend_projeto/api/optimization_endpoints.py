@@ -31,7 +31,7 @@ def opt_markowitz(req: OptimizeRequest, opt: OptimizationEngine = Depends(get_op
     Args:
         req (OptimizeRequest): Request body containing assets, start date, end date,
                                objective, optional bounds, long-only constraint, max weight,
-                               and an optional risk-free rate.
+                               an optional risk-free rate and the covariance shrinkage flag.
         opt (OptimizationEngine): Dependency injection for the optimization engine.
 
     Returns:
@@ -45,7 +45,8 @@ def opt_markowitz(req: OptimizeRequest, opt: OptimizationEngine = Depends(get_op
         bounds=req.bounds,
         long_only=req.long_only,
         max_weight=req.max_weight,
-        risk_free_rate=req.risk_free_rate
+        risk_free_rate=req.risk_free_rate,
+        use_shrinkage=req.use_shrinkage
     )
     return RiskResponse(result=result)
 
@@ -46,39 +46,56 @@ def calculate_portfolio_values(
         HTTPException: 400 if there are insufficient funds for a buy order
                        or insufficient shares for a sell order.
     """
-    portfolio = pd.DataFrame(0, index=prices.index, columns=prices.columns)
-    cash = pd.Series(initial_investment, index=prices.index)
+    price_mat = prices.to_numpy(dtype=float)
+    asset_col = {a: i for i, a in enumerate(prices.columns)}
+    n_rows = price_mat.shape[0]
+    pos_delta = np.zeros(price_mat.shape)
+    cash_delta = np.zeros(n_rows)
     
     # Process orders chronologically
     sorted_orders = sorted(orders, key=lambda x: x.date)
+    # Parse all order dates at once and find the first trading row on or after each
+    order_dates = pd.to_datetime([o.date for o in sorted_orders])
+    row_idx = prices.index.searchsorted(order_dates, side='left')
     
-    for order in sorted_orders:
-        # Find the first valid date on or after the order date
-        exec_date = prices.index[prices.index >= pd.Timestamp(order.date)][0]
-        
-        asset_price = prices.loc[exec_date, order.asset]
-        order_value = order.quantity * (order.price or asset_price)
+    # Orders are sorted, so the running totals equal the state on each execution date
+    cash_running = float(initial_investment)
+    pos_running = np.zeros(price_mat.shape[1])
+    for order, row in zip(sorted_orders, row_idx):
+        if row >= n_rows:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No price data on or after order date {order.date}"
+            )
+        col = asset_col[order.asset]
+        order_value = order.quantity * (order.price or price_mat[row, col])
         
         if order.type == "BUY":
-            if cash[exec_date] < order_value:
+            if cash_running < order_value:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Insufficient funds for order on {order.date}: needed {order_value}, had {cash[exec_date]}"
+                    detail=f"Insufficient funds for order on {order.date}: needed {order_value}, had {cash_running}"
                 )
-            portfolio.loc[exec_date:, order.asset] += order.quantity
-            cash.loc[exec_date:] -= order_value
+            pos_running[col] += order.quantity
+            cash_running -= order_value
+            pos_delta[row, col] += order.quantity
+            cash_delta[row] -= order_value
         else:  # SELL
-            if portfolio.loc[exec_date, order.asset] < order.quantity:
+            if pos_running[col] < order.quantity:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Insufficient {order.asset} shares for sell order on {order.date}"
                 )
-            portfolio.loc[exec_date:, order.asset] -= order.quantity
-            cash.loc[exec_date:] += order_value
+            pos_running[col] -= order.quantity
+            cash_running += order_value
+            pos_delta[row, col] -= order.quantity
+            cash_delta[row] += order_value
     
-    # Calculate daily portfolio values
-    portfolio_values = (portfolio * prices).sum(axis=1) + cash
-    return portfolio_values
+    # Calculate daily portfolio values (missing prices contribute nothing, as in DataFrame.sum)
+    positions = np.cumsum(pos_delta, axis=0)
+    cash = initial_investment + np.cumsum(cash_delta)
+    holdings_value = np.nansum(positions * price_mat, axis=1)
+    return pd.Series(holdings_value + cash, index=prices.index)
 
 def calculate_performance_metrics(portfolio_values: pd.Series) -> PortfolioPerformance:
     """
@@ -99,7 +116,8 @@ def calculate_performance_metrics(portfolio_values: pd.Series) -> PortfolioPerfo
     annualized_return = (1 + total_return) ** (1/years) - 1
     
     volatility = returns.std() * np.sqrt(252)
-    max_dd = drawdown(portfolio_values).min()
+    pv = portfolio_values.to_numpy(dtype=float)
+    max_dd = float(((pv / np.maximum.accumulate(pv)) - 1.0).min())
     
     # Sharpe ratio (assuming risk-free rate of 4.5%)
     risk_free_rate = 0.045
@@ -71,53 +71,78 @@ class PortfolioSimulator:
         if prices.empty:
             raise ValueError("Não foi possível obter dados de preços para os ativos selecionados")
 
-        # Inicializar posições e caixa
-        positions = pd.DataFrame(0.0, index=prices.index, columns=assets)
-        cash = pd.Series(initial_investment, index=prices.index)
-
-        # Processar ordens
-        for order in sorted_orders:
-            exec_date = prices.index[prices.index >= pd.Timestamp(order['date'])][0]
-            asset = order['asset']
-            quantity = order['quantity']
-            
-            # Usar preço fornecido ou preço de mercado
-            price = order.get('price') or prices.loc[exec_date, asset]
-            order_value = quantity * price
-
-            if order['type'].upper() == 'BUY':
-                if cash[exec_date] < order_value:
-                    raise ValueError(f"Fundos insuficientes para ordem em {order['date']}")
-                positions.loc[exec_date:, asset] += quantity
-                cash.loc[exec_date:] -= order_value
-            else:  # SELL
-                if positions.loc[exec_date, asset] < quantity:
-                    raise ValueError(f"Posição insuficiente em {asset} para venda em {order['date']}")
-                positions.loc[exec_date:, asset] -= quantity
-                cash.loc[exec_date:] += order_value
+        # Matriz de preços T×n contígua (linhas = datas); float32 apenas para a marcação a mercado
+        price_mat = prices[assets].to_numpy(dtype=np.float64)
+        price_mat32 = np.ascontiguousarray(price_mat, dtype=np.float32)
+
+        # Mapear cada ordem para a linha de execução (primeiro pregão na data ou após)
+        n_orders = len(sorted_orders)
+        asset_col = {asset: i for i, asset in enumerate(assets)}
+        order_dates = pd.to_datetime([order['date'] for order in sorted_orders])
+        rows = prices.index.searchsorted(order_dates, side='left')
+        out_of_range = rows >= len(prices.index)
+        if out_of_range.any():
+            first = int(np.argmax(out_of_range))
+            raise ValueError(f"Sem dados de preço na data ou após a ordem de {sorted_orders[first]['date']}")
+        cols = np.array([asset_col[order['asset']] for order in sorted_orders], dtype=np.intp)
+
+        # Usar preço fornecido ou preço de mercado
+        market_prices = price_mat[rows, cols]
+        exec_prices = np.array(
+            [order.get('price') or px for order, px in zip(sorted_orders, market_prices)], dtype=float
+        )
+        sign = np.array([1.0 if order['type'].upper() == 'BUY' else -1.0 for order in sorted_orders])
+        signed_qty = sign * np.array([order['quantity'] for order in sorted_orders], dtype=float)
+        cash_flow = -signed_qty * exec_prices
+
+        # Validar caixa (compras) e posição (vendas) na sequência das ordens
+        order_idx = np.arange(n_orders)
+        running_cash = initial_investment + np.cumsum(cash_flow)
+        order_pos = np.zeros((n_orders, len(assets)))
+        order_pos[order_idx, cols] = signed_qty
+        running_pos = np.cumsum(order_pos, axis=0)[order_idx, cols]
+        invalid = ((sign > 0) & (running_cash < 0)) | ((sign < 0) & (running_pos < 0))
+        if invalid.any():
+            first = int(np.argmax(invalid))
+            order = sorted_orders[first]
+            if sign[first] > 0:
+                raise ValueError(f"Fundos insuficientes para ordem em {order['date']}")
+            raise ValueError(f"Posição insuficiente em {order['asset']} para venda em {order['date']}")
+
+        # Espalhar os deltas nas datas de execução e integrar com um único cumsum
+        # (o caixa permanece em float64 para não perder centavos em capitais elevados)
+        pos_delta = np.zeros((len(prices.index), len(assets)), dtype=np.float32)
+        np.add.at(pos_delta, (rows, cols), signed_qty.astype(np.float32))
+        positions_mat = np.cumsum(pos_delta, axis=0, out=pos_delta)
+        cash_delta = np.zeros(len(prices.index))
+        np.add.at(cash_delta, rows, cash_flow)
+        cash_vec = initial_investment + cash_delta.cumsum()
 
         # Calcular valor total do portfólio ao longo do tempo
-        portfolio_value = pd.Series(0.0, index=prices.index, name='portfolio_value')
-        for asset in assets:
-            portfolio_value += positions[asset] * prices[asset]
-        portfolio_value += cash
-
-        # Calcular métricas de performance
-        returns = portfolio_value.pct_change().dropna()
-        total_return = (portfolio_value.iloc[-1] / portfolio_value.iloc[0]) - 1
+        pv = np.einsum('ta,ta->t', positions_mat, price_mat32) + cash_vec
+        portfolio_value = pd.Series(pv, index=prices.index, name='portfolio_value')
+        positions = pd.DataFrame(positions_mat.astype(np.float64), index=prices.index, columns=assets)
+
+        # Calcular métricas de performance (retornos direto sobre o array de valores)
+        r = np.diff(pv) / pv[:-1]
+        if np.isnan(r).any():
+            r = r[~np.isnan(r)]
+        mean_r = r.mean()
+        std_r = r.std(ddof=1)
+        total_return = (pv[-1] / pv[0]) - 1
         
         # Métricas anualizadas
-        trading_days = len(returns)
+        trading_days = len(r)
         years = trading_days / 252
         annualized_return = (1 + total_return) ** (1/years) - 1
         
-        volatility = returns.std() * np.sqrt(252)
-        max_dd = drawdown(portfolio_value).min()
+        volatility = std_r * np.sqrt(252)
+        running_max = np.maximum.accumulate(pv)
+        max_dd = float(((pv / running_max) - 1.0).min())
         
         # Índice Sharpe (assumindo taxa livre de risco de 4.5%)
         risk_free_rate = self.config.RISK_FREE_RATE
-        excess_returns = returns - risk_free_rate/252
-        sharpe_ratio = np.sqrt(252) * excess_returns.mean() / returns.std()
+        sharpe_ratio = np.sqrt(252) * (mean_r - risk_free_rate/252) / std_r
 
         performance_metrics = {
             'total_return': total_return,
@@ -8,26 +8,92 @@ This module provides functions for:
 """
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit, prange
 
 from backend_projeto.domain.risk_metrics import (
     var_parametric,
     var_historical,
     var_evt,
+    _historical_tail,
+    _var_parametric_np,
+    _z_phi,
 )
 
 
 def _as_weights(assets: List[str], weights: Optional[List[float]]) -> np.ndarray:
-    """Normalizes weights for assets."""
-    if not weights:
-        return np.ones(len(assets)) / len(assets)
-    w = np.array(weights, dtype=float)
-    if len(w) != len(assets):
+    """Normalizes weights for assets (equal weights when `weights` is None or empty)."""
+    n = len(assets)
+    if weights is None or len(weights) == 0:
+        return np.full(n, 1.0 / n)
+    if len(weights) != n:
         raise ValueError("Tamanho de weights difere do número de assets")
+    w = np.array(weights, dtype=np.float64)
     s = w.sum()
     if s == 0:
         raise ValueError("Soma dos pesos não pode ser zero")
-    return w / s
+    w *= 1.0 / s
+    return w
+
+
+def _series_var(port: np.ndarray, alpha: float, method: str, ewma_lambda: float) -> float:
+    """VaR da série de retornos `port` pelo `method` (historical|std|ewma|garch|evt)."""
+    # historical/std/ewma trabalham direto no array; só garch e evt precisam da Series
+    if method == 'historical':
+        return -_historical_tail(port, alpha)[0]
+    if method in ('std', 'ewma'):
+        return _var_parametric_np(port, alpha, method, ewma_lambda)[0]
+    r = pd.Series(port)
+    if method == 'garch':
+        return var_parametric(r, alpha, method=method, ewma_lambda=ewma_lambda)[0]
+    return var_evt(r, alpha)[0]
+
+
+def _asset_moments(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Média e covariância amostral (ddof=1) das colunas de `X`, calculadas uma vez por chamada."""
+    return X.mean(axis=0), np.atleast_2d(np.cov(X, rowvar=False))
+
+
+def _std_var(mu: np.ndarray, cov: np.ndarray, w: np.ndarray, z: float) -> float:
+    """VaR normal (method='std') da carteira `w` a partir da média e da covariância dos ativos.
+
+    Igual a `var_parametric(X @ w, method='std')`: a média da carteira é μ·w e o
+    desvio padrão amostral é √(wᵀΣw), sem montar a série de retornos.
+    """
+    return float(-(mu @ w + z * np.sqrt(w @ cov @ w)))
+
+
+@njit(parallel=True, cache=True)
+def _mvar_historical_kernel(X, port_base, base_w, alpha):
+    """VaR histórico de cada carteira sem o ativo i (um ativo por thread).
+
+    Mesmo quantil interpolado de `_historical_tail`; carteiras cujos pesos restantes
+    somam zero recebem NaN.
+    """
+    T, n = X.shape
+    h = (T - 1) * (1 - alpha)
+    lo = int(np.floor(h))
+    hi = min(lo + 1, T - 1)
+    t = h - lo
+    out = np.empty(n)
+    for i in prange(n):
+        total = 0.0
+        for j in range(n):
+            if j != i:
+                total += base_w[j]
+        if total == 0.0:
+            out[i] = np.nan
+        else:
+            port = np.empty(T)
+            for k in range(T):
+                port[k] = (port_base[k] - base_w[i] * X[k, i]) / total
+            part = np.partition(port, lo)
+            a = part[lo]
+            b = part[lo + 1:].min() if hi != lo else a
+            q = b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+            out[i] = -q
+    return out
 
 
 def covariance_ledoit_wolf(returns_df: pd.DataFrame) -> Dict:
@@ -100,13 +166,12 @@ def risk_attribution(returns_df: pd.DataFrame, assets: List[str], weights: Optio
         total_weight = sum(weights)
         weights = [w / total_weight for w in weights]
     
-    cov_matrix = covariance_ledoit_wolf(asset_returns)["cov"]
-    portfolio_vol = np.sqrt(np.dot(weights, np.dot(cov_matrix, weights)))
-    
-    contribution_vol = []
-    for i, asset in enumerate(assets):
-        marginal_vol = np.dot(cov_matrix[i], weights) / portfolio_vol
-        contribution_vol.append(weights[i] * marginal_vol)
+    cov_matrix = np.asarray(covariance_ledoit_wolf(asset_returns)["cov"], dtype=np.float64)
+    w = np.asarray(weights, dtype=np.float64)
+    # Σw uma vez: serve à volatilidade total e às contribuições marginais de todos os ativos
+    cov_w = cov_matrix @ w
+    portfolio_vol = np.sqrt(w @ cov_w)
+    contribution_vol = w * cov_w / portfolio_vol
     
     contribution_var = []
     
@@ -114,7 +179,7 @@ def risk_attribution(returns_df: pd.DataFrame, assets: List[str], weights: Optio
         "assets": assets,
         "weights": weights,
         "portfolio_vol": float(portfolio_vol),
-        "contribution_vol": [float(c) for c in contribution_vol],
+        "contribution_vol": contribution_vol.tolist(),
         "contribution_var": contribution_var
     }
 
@@ -146,31 +211,35 @@ def incremental_var(
     sel = [a for a in assets if a in returns_df.columns]
     if not sel:
         raise ValueError("Nenhum ativo válido em returns_df")
+    if method not in ('historical', 'std', 'ewma', 'garch', 'evt'):
+        raise ValueError("método inválido para IVaR")
     base_w = _as_weights(sel, weights)
-    X = returns_df[sel].dropna(how='all').fillna(0.0)
-    port_base = pd.Series(X.values @ base_w, index=X.index)
-    
-    if method == 'historical':
-        base_var, _ = var_historical(port_base, alpha)
-    elif method in ('std', 'ewma', 'garch'):
-        base_var, _ = var_parametric(port_base, alpha, method=method, ewma_lambda=ewma_lambda)
-    elif method == 'evt':
-        base_var, _ = var_evt(port_base, alpha)
+    # Ordem de Fortran: cada coluna X[:, i] lida nos laços abaixo fica contígua
+    X = np.asfortranarray(returns_df[sel].dropna(how='all').fillna(0.0).to_numpy(dtype=np.float64))
+    port_base = X @ base_w
+    port_new = np.empty_like(port_base)
+
+    # Para 'std' basta μ e Σ dos ativos, calculados uma vez
+    if method == 'std':
+        mu, cov = _asset_moments(X)
+        z = _z_phi(alpha)[0]
+        base_var = _std_var(mu, cov, base_w, z)
     else:
-        raise ValueError("método inválido para IVaR")
+        base_var = _series_var(port_base, alpha, method, ewma_lambda)
 
     ivar: Dict[str, float] = {}
     for i, a in enumerate(sel):
         w = base_w.copy()
         w[i] = max(w[i] + delta, 0.0)
-        w = w / w.sum()
-        port_new = pd.Series(X.values @ w, index=X.index)
-        if method == 'historical':
-            v, _ = var_historical(port_new, alpha)
-        elif method in ('std', 'ewma', 'garch'):
-            v, _ = var_parametric(port_new, alpha, method=method, ewma_lambda=ewma_lambda)
+        total = w.sum()
+        if method == 'std':
+            v = _std_var(mu, cov, w / total, z)
         else:
-            v, _ = var_evt(port_new, alpha)
+            # Só o peso i muda: a nova série é a base mais a coluna i, renormalizada (O(T))
+            np.multiply(X[:, i], w[i] - base_w[i], out=port_new)
+            port_new += port_base
+            port_new /= total
+            v = _series_var(port_new, alpha, method, ewma_lambda)
         ivar[a] = float(v - base_var)
     
     return {
@@ -209,36 +278,44 @@ def marginal_var(
     sel = [a for a in assets if a in returns_df.columns]
     if not sel:
         raise ValueError("Nenhum ativo válido em returns_df")
+    if method not in ('historical', 'std', 'ewma', 'garch', 'evt'):
+        raise ValueError("método inválido para MVaR")
     base_w = _as_weights(sel, weights)
-    X = returns_df[sel].dropna(how='all').fillna(0.0)
-    port_base = pd.Series(X.values @ base_w, index=X.index)
-    
-    if method == 'historical':
-        base_var, _ = var_historical(port_base, alpha)
-    elif method in ('std', 'ewma', 'garch'):
-        base_var, _ = var_parametric(port_base, alpha, method=method, ewma_lambda=ewma_lambda)
-    elif method == 'evt':
-        base_var, _ = var_evt(port_base, alpha)
+    # Ordem de Fortran: cada coluna X[:, i] lida nos laços abaixo fica contígua
+    X = np.asfortranarray(returns_df[sel].dropna(how='all').fillna(0.0).to_numpy(dtype=np.float64))
+    port_base = X @ base_w
+    port_new = np.empty_like(port_base)
+
+    # Para 'std' basta μ e Σ dos ativos; cada carteira reduzida usa a submatriz
+    if method == 'std':
+        mu, cov = _asset_moments(X)
+        z = _z_phi(alpha)[0]
+        base_var = _std_var(mu, cov, base_w, z)
     else:
-        raise ValueError("método inválido para MVaR")
+        base_var = _series_var(port_base, alpha, method, ewma_lambda)
 
     mvar: Dict[str, float] = {}
-    for i, a in enumerate(sel):
-        keep_idx = [j for j in range(len(sel)) if j != i]
-        if not keep_idx:
-            mvar[a] = float('nan')
-            continue
-        w = base_w[keep_idx]
-        w = w / w.sum()
-        Xsub = X.iloc[:, keep_idx]
-        port_new = pd.Series(Xsub.values @ w, index=Xsub.index)
-        if method == 'historical':
-            v, _ = var_historical(port_new, alpha)
-        elif method in ('std', 'ewma', 'garch'):
-            v, _ = var_parametric(port_new, alpha, method=method, ewma_lambda=ewma_lambda)
-        else:
-            v, _ = var_evt(port_new, alpha)
-        mvar[a] = float(v - base_var)
+    if method == 'historical' and NUMBA_AVAILABLE and len(sel) > 1 and X.shape[0] > 0:
+        # As remoções são independentes: o kernel distribui os ativos entre os núcleos
+        v = _mvar_historical_kernel(X, port_base, base_w, alpha)
+        mvar = {a: float(v[i] - base_var) for i, a in enumerate(sel)}
+    else:
+        for i, a in enumerate(sel):
+            keep_idx = [j for j in range(len(sel)) if j != i]
+            if not keep_idx:
+                mvar[a] = float('nan')
+                continue
+            w = base_w[keep_idx]
+            total = w.sum()
+            if method == 'std':
+                v = _std_var(mu[keep_idx], cov[np.ix_(keep_idx, keep_idx)], w / total, z)
+            else:
+                # Sem o ativo i: a série é a base menos a coluna i, renormalizada (O(T))
+                np.multiply(X[:, i], -base_w[i], out=port_new)
+                port_new += port_base
+                port_new /= total
+                v = _series_var(port_new, alpha, method, ewma_lambda)
+            mvar[a] = float(v - base_var)
     
     return {
         "alpha": alpha,
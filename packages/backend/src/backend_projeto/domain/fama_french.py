@@ -7,9 +7,12 @@ This module provides functions for:
 """
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
 import logging
 from typing import Dict, List, Any
+from scipy.linalg import solve_triangular
+from scipy.stats import t as t_dist
+
+from backend_projeto.domain.financial_math import _pct_change
 
 
 def _monthly_returns_from_prices(df_prices: pd.DataFrame) -> pd.DataFrame:
@@ -23,7 +26,87 @@ def _monthly_returns_from_prices(df_prices: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame containing monthly percentage returns for each asset.
     """
-    return df_prices.sort_index().resample('M').last().pct_change().dropna(how='all')
+    if not df_prices.index.is_monotonic_increasing:
+        df_prices = df_prices.sort_index()
+    # O índice mensal do resample já sai ordenado; a variação é feita direto no array
+    return _pct_change(df_prices.resample('M').last(), drop_empty=True)
+
+
+def _factor_ols(df: pd.DataFrame, factor_cols: List[str], assets: List[str], min_obs: int) -> Dict[str, Dict[str, Any]]:
+    """
+    OLS of each asset's excess return (asset - RF) on a constant plus `factor_cols`.
+
+    Every asset shares the same regressors, so assets with the same set of valid
+    months are solved together: one QR factorization of the design matrix per group
+    and one triangular solve for all of their columns. Statistics follow
+    statsmodels' OLS (t-stats, two-sided p-values, R² with constant, condition number).
+
+    Args:
+        df: Monthly DataFrame with the asset columns, `factor_cols` and 'RF'.
+        factor_cols: Factor columns used as regressors.
+        assets: Assets to regress (missing columns are ignored).
+        min_obs: Minimum number of observations to fit an asset.
+
+    Returns:
+        Dict per asset: params (const first), tstats, pvalues, r2, n_obs, condition_number.
+    """
+    present = [a for a in assets if a in df.columns]
+    if not present:
+        return {}
+    X = np.column_stack([np.ones(len(df)), df[factor_cols].to_numpy(dtype=np.float64)])
+    Y = df[present].to_numpy(dtype=np.float64) - df['RF'].to_numpy(dtype=np.float64)[:, None]
+    valid = ~np.isnan(Y)
+    p = X.shape[1]
+
+    groups: Dict[bytes, List[int]] = {}
+    for k in range(len(present)):
+        groups.setdefault(valid[:, k].tobytes(), []).append(k)
+
+    fits: Dict[str, Dict[str, Any]] = {}
+    for cols in groups.values():
+        names = [present[k] for k in cols]
+        rows = valid[:, cols[0]]
+        n = int(rows.sum())
+        if n < min_obs:
+            for a in names:
+                logging.warning(f"Asset {a}: Insufficient data ({n} < {min_obs}). Skipping.")
+            continue
+        XA = X[rows]
+        if np.linalg.matrix_rank(XA) < p:
+            for a in names:
+                logging.warning(f"Asset {a}: Singular design matrix (perfect collinearity). Skipping.")
+            continue
+        YA = Y[np.ix_(rows, cols)]
+        try:
+            Q, R = np.linalg.qr(XA)
+            B = solve_triangular(R, Q.T @ YA)
+            R_inv = solve_triangular(R, np.eye(p))
+        except Exception as e:
+            for a in names:
+                logging.error(f"Asset {a}: OLS fit error: {e}")
+            continue
+
+        df_resid = n - p
+        E = YA - XA @ B
+        ssr = (E * E).sum(axis=0)
+        centered = YA - YA.mean(axis=0)
+        r2 = 1.0 - ssr / (centered * centered).sum(axis=0)
+        # diag((XᵀX)⁻¹) is the row-wise sum of squares of R⁻¹
+        bse = np.sqrt(np.outer((R_inv * R_inv).sum(axis=1), ssr / df_resid))
+        tvals = B / bse
+        pvals = 2 * t_dist.sf(np.abs(tvals), df_resid)
+        eig = np.linalg.eigvalsh(XA.T @ XA)
+        cond = float(np.sqrt(eig.max() / eig.min()))
+        for j, a in enumerate(names):
+            fits[a] = {
+                'params': B[:, j].tolist(),
+                'tstats': tvals[:, j].tolist(),
+                'pvalues': pvals[:, j].tolist(),
+                'r2': float(r2[j]),
+                'n_obs': n,
+                'condition_number': cond,
+            }
+    return {a: fits[a] for a in present if a in fits}
 
 
 def ff3_metrics(
@@ -51,57 +134,27 @@ def ff3_metrics(
     if df.empty:
         raise ValueError("Sem interseção temporal entre retornos, fatores e RF")
 
-    X = df[['MKT_RF', 'SMB', 'HML']]
-    X = sm.add_constant(X)
-
     results: Dict[str, Any] = {}
-    for a in assets:
-        if a not in df.columns:
-            continue
-        y = (df[a] - df['RF']).dropna()
-        XA = X.loc[y.index]
-        
-        # 1. Increased threshold for FF3 (4 params) -> 24 obs recommended
-        if len(y) < 24:
-            logging.warning(f"Asset {a}: Insufficient data ({len(y)} < 24). Skipping.")
-            continue
-            
-        # 2. Rank validation
-        if np.linalg.matrix_rank(XA) < XA.shape[1]:
-            logging.warning(f"Asset {a}: Singular design matrix (perfect collinearity). Skipping.")
-            continue
-
-        model = sm.OLS(y.values, XA.values)
-        
-        # 3. Secure fit using QR decomposition
-        try:
-            res = model.fit(method='qr')
-        except Exception as e:
-            logging.error(f"Asset {a}: OLS fit error: {e}")
-            continue
-
-        params = res.params.tolist()
-        pvals = res.pvalues.tolist()
-        tstats = res.tvalues.tolist()
-        
+    for a, fit in _factor_ols(df, ['MKT_RF', 'SMB', 'HML'], assets, min_obs=24).items():
         note = None
-        if int(res.nobs) < 36:
+        if fit['n_obs'] < 36:
             note = "Observation count < 36; estimates may be unstable."
-            
-        # 4. Condition Number validation
-        if res.condition_number > 1000:
-            cond_msg = f"High condition number ({res.condition_number:.1f})."
+
+        # Condition Number validation
+        if fit['condition_number'] > 1000:
+            cond_msg = f"High condition number ({fit['condition_number']:.1f})."
             note = f"{note} {cond_msg}" if note else cond_msg
 
+        params = fit['params']
         results[a] = {
             'alpha': float(params[0]),
             'beta_mkt': float(params[1]),
             'beta_smb': float(params[2]),
             'beta_hml': float(params[3]),
-            'pvalues': pvals,
-            'tstats': tstats,
-            'r2': float(res.rsquared),
-            'n_obs': int(res.nobs),
+            'pvalues': fit['pvalues'],
+            'tstats': fit['tstats'],
+            'r2': fit['r2'],
+            'n_obs': fit['n_obs'],
             'notes': note,
         }
     return {'frequency': 'M', 'model': 'FF3', 'results': results}
@@ -134,48 +187,18 @@ def ff5_metrics(
     if df.empty:
         raise ValueError("Sem interseção temporal entre retornos, fatores e RF (FF5)")
     
-    X = df[['MKT_RF', 'SMB', 'HML', 'RMW', 'CMA']]
-    X = sm.add_constant(X)
-    
     results: Dict[str, Any] = {}
-    for a in assets:
-        if a not in df.columns:
-            continue
-        y = (df[a] - df['RF']).dropna()
-        XA = X.loc[y.index]
-        
-        # 1. Increased threshold for FF5 (6 params) -> 36 obs recommended
-        if len(y) < 36:
-            logging.warning(f"Asset {a}: Insufficient data ({len(y)} < 36). Skipping.")
-            continue
-
-        # 2. Rank validation
-        if np.linalg.matrix_rank(XA) < XA.shape[1]:
-            logging.warning(f"Asset {a}: Singular design matrix (perfect collinearity). Skipping.")
-            continue
-
-        model = sm.OLS(y.values, XA.values)
-        
-        # 3. Secure fit using QR decomposition
-        try:
-            res = model.fit(method='qr')
-        except Exception as e:
-            logging.error(f"Asset {a}: OLS fit error: {e}")
-            continue
-
-        params = res.params.tolist()
-        pvals = res.pvalues.tolist()
-        tstats = res.tvalues.tolist()
-        
+    for a, fit in _factor_ols(df, ['MKT_RF', 'SMB', 'HML', 'RMW', 'CMA'], assets, min_obs=36).items():
         note = None
-        if int(res.nobs) < 48:
+        if fit['n_obs'] < 48:
             note = "Observation count < 48; estimates may be unstable."
 
-        # 4. Condition Number validation
-        if res.condition_number > 1000:
-            cond_msg = f"High condition number ({res.condition_number:.1f})."
+        # Condition Number validation
+        if fit['condition_number'] > 1000:
+            cond_msg = f"High condition number ({fit['condition_number']:.1f})."
             note = f"{note} {cond_msg}" if note else cond_msg
 
+        params = fit['params']
         results[a] = {
             'alpha': float(params[0]),
             'beta_mkt': float(params[1]),
@@ -183,10 +206,10 @@ def ff5_metrics(
             'beta_hml': float(params[3]),
             'beta_rmw': float(params[4]),
             'beta_cma': float(params[5]),
-            'pvalues': pvals,
-            'tstats': tstats,
-            'r2': float(res.rsquared),
-            'n_obs': int(res.nobs),
+            'pvalues': fit['pvalues'],
+            'tstats': fit['tstats'],
+            'r2': fit['r2'],
+            'n_obs': fit['n_obs'],
             'notes': note,
         }
     return {'frequency': 'M', 'model': 'FF5', 'results': results}
@@ -9,6 +9,44 @@ import pandas as pd
 import numpy as np
 from typing import Tuple
 
+def _pct_change(prices: pd.DataFrame, finite: bool = False, drop_empty: bool = False) -> pd.DataFrame:
+    """Equivalente a `prices.sort_index().pct_change()` calculado direto no array NumPy.
+
+    Só ordena quando o índice não é crescente e divide A[1:] por A[:-1] em um
+    buffer de saída, sem a cópia deslocada do `shift`. Lacunas são preenchidas
+    para frente antes, como no `fill_method='pad'` padrão do pandas.
+
+    Parâmetros:
+        prices (pd.DataFrame): DataFrame de preços.
+        finite (bool): Se True, retornos ±inf (preço anterior zero) viram NaN.
+        drop_empty (bool): Se True, descarta as linhas sem nenhum retorno válido,
+            como `.dropna(how='all')`, usando a máscara já calculada.
+
+    Retorna:
+        pd.DataFrame: Retornos com as colunas de `prices` (primeira linha NaN, a menos
+        que `drop_empty` a remova).
+    """
+    if not prices.index.is_monotonic_increasing:
+        prices = prices.sort_index()
+    A = prices.to_numpy(dtype=float)
+    if np.isnan(A).any():
+        A = prices.ffill().to_numpy(dtype=float)
+    R = np.empty_like(A)
+    R[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(A[1:], A[:-1], out=R[1:])
+    R[1:] -= 1.0
+    index = prices.index
+    if finite or drop_empty:
+        bad = ~np.isfinite(R) if finite else np.isnan(R)
+        if finite:
+            R[bad] = np.nan
+        if drop_empty:
+            keep = ~bad.all(axis=1)
+            if not keep.all():
+                R, index = R[keep], index[keep]
+    return pd.DataFrame(R, index=index, columns=prices.columns)
+
 def _returns_from_prices(prices: pd.DataFrame) -> pd.DataFrame:
     """Calcula os retornos diários percentuais a partir de um DataFrame de preços.
 
@@ -18,7 +56,7 @@ def _returns_from_prices(prices: pd.DataFrame) -> pd.DataFrame:
     Retorna:
         pd.DataFrame: DataFrame de retornos.
     """
-    return prices.sort_index().pct_change().dropna(how='all')
+    return _pct_change(prices, drop_empty=True)
 
 def _annualize_mean_cov(rets: pd.DataFrame, dias_uteis: int) -> Tuple[np.ndarray, np.ndarray]:
     """Anualiza a média e a matriz de covariância dos retornos.
@@ -30,6 +68,16 @@ def _annualize_mean_cov(rets: pd.DataFrame, dias_uteis: int) -> Tuple[np.ndarray
     Retorna:
         Tuple[np.ndarray, np.ndarray]: Tupla contendo a média anualizada e a matriz de covariância anualizada.
     """
-    mu = rets.mean().values * dias_uteis
-    cov = rets.cov().values * dias_uteis
-    return mu, cov
+    X = rets.to_numpy(dtype=float)
+    n = X.shape[0]
+    if n < 2 or np.isnan(X).any():
+        # Com lacunas o pandas usa pares completos por coluna; a forma matricial não se aplica
+        return rets.mean().values * dias_uteis, rets.cov().values * dias_uteis
+    # Covariância pela forma X'X/N - μμ' (um GEMM, sem a cópia centrada de X); para retornos
+    # diários |μ| << σ, então o cancelamento na subtração é desprezível
+    mu = X.mean(axis=0)
+    cov = X.T @ X
+    cov /= n
+    cov -= np.outer(mu, mu)
+    cov *= dias_uteis * n / (n - 1)
+    return mu * dias_uteis, cov
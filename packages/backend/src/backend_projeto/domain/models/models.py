@@ -234,6 +234,10 @@ class OptimizeRequest(BaseModel):
         le=1.0,
         description="Taxa livre de risco anualizada (ex: 0.05 para 5%). Se não especificada, usa o valor da configuração."
     )
+    use_shrinkage: bool = Field(
+        True,
+        description="Usa a covariância com shrinkage de Ledoit-Wolf em vez da covariância amostral."
+    )
 
 
 class CAPMRequest(BaseModel):
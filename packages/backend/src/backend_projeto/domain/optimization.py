@@ -12,16 +12,212 @@ It includes the `OptimizationEngine` class which orchestrates:
 import pandas as pd
 import numpy as np
 import logging
+import threading
 from typing import Dict, Tuple, List, Optional
 from dataclasses import dataclass
+from cachetools import TTLCache
 from backend_projeto.infrastructure.utils.config import Settings, settings
 from backend_projeto.infrastructure.data_handling import YFinanceProvider
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit, prange
 from numpy.linalg import lstsq
-from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize, Bounds, LinearConstraint
 
 
 from backend_projeto.domain.financial_math import _returns_from_prices, _annualize_mean_cov
 
+try:
+    import jax
+    import jax.numpy as jnp
+except Exception:
+    jax = None
+    jnp = None
+
+# Abaixo disso a transferência para a GPU custa mais do que a regressão em si
+_JAX_MIN_ASSETS = 50
+
+# Momentos (μ, Σ e fatoração de Cholesky) compartilhados entre instâncias do motor,
+# que é criado a cada requisição. Só é usado quando ENABLE_CACHE está ativo.
+_MOMENTS_CACHE: TTLCache = TTLCache(maxsize=64, ttl=settings.CACHE_TTL_SECONDS)
+_MOMENTS_CACHE_LOCK = threading.Lock()
+
+
+def _jax_accelerated(n_assets: int) -> bool:
+    """Indica se a regressão em lote deve ir para o JAX (acelerador e universo grande).
+
+    Exige `jax_enable_x64`: sem ele o JAX trabalha em float32, e as equações normais
+    (que elevam o condicionamento ao quadrado) perdem precisão frente ao caminho em float64.
+    """
+    if jax is None or n_assets < _JAX_MIN_ASSETS:
+        return False
+    try:
+        return bool(jax.config.jax_enable_x64) and jax.default_backend() != 'cpu'
+    except Exception:
+        return False
+
+
+if jax is not None:
+    @jax.jit
+    def _ols_jax(X, Y):
+        """Resolve X'X B = X'Y no dispositivo do JAX (gemm + Cholesky/LU na GPU)."""
+        return jnp.linalg.solve(X.T @ X, X.T @ Y)
+
+
+def _ols_normal_equations(X: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Resolve a regressão OLS de várias séries (colunas de Y) contra o mesmo X.
+
+    Usa as equações normais com fatoração de Cholesky (X'X é k×k, com k pequeno),
+    caindo para `lstsq` se X'X não for positiva definida. Com o JAX instalado (em
+    float64), uma GPU/TPU disponível e muitos ativos, a resolução é feita no acelerador.
+
+    Parâmetros:
+        X (np.ndarray): Matriz de desenho T×k (com a coluna de intercepto).
+        Y (np.ndarray): Matriz de respostas T×n.
+
+    Retorna:
+        Tuple[np.ndarray, np.ndarray]: Coeficientes k×n e R² de cada coluna (n,).
+    """
+    coeffs = None
+    if _jax_accelerated(Y.shape[1]):
+        coeffs = np.asarray(_ols_jax(jnp.asarray(X, dtype=jnp.float64), jnp.asarray(Y, dtype=jnp.float64)),
+                            dtype=float)
+        if not np.all(np.isfinite(coeffs)):
+            coeffs = None
+    if coeffs is None:
+        try:
+            coeffs = cho_solve(cho_factor(X.T @ X), X.T @ Y)
+        except np.linalg.LinAlgError:
+            coeffs, *_ = lstsq(X, Y, rcond=None)
+    resid = Y - X @ coeffs
+    ss_res = np.sum(resid**2, axis=0)
+    ss_tot = np.sum((Y - Y.mean(axis=0))**2, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot == 0, 0.0, 1 - ss_res / ss_tot)
+    return coeffs, r2
+
+
+def _aligned_returns(prices: pd.DataFrame, *others) -> Tuple[np.ndarray, ...]:
+    """Alinha preços pela interseção de datas e devolve os retornos em arrays numpy.
+
+    Equivale a `join(how='inner')` seguido de `_returns_from_prices`, mas calcula a
+    interseção do índice uma única vez e faz o restante por fatias posicionais.
+
+    Parâmetros:
+        prices (pd.DataFrame): Preços dos ativos (índice = datas).
+        *others (pd.Series | pd.DataFrame): Séries/tabelas a alinhar com `prices`.
+
+    Retorna:
+        Tuple[np.ndarray, ...]: Retornos de `prices` (T×n) seguidos dos retornos de
+        cada item de `others` (T para Series, T×m para DataFrame).
+    """
+    idx = prices.index
+    for other in others:
+        idx = idx.intersection(other.index)
+    idx = idx.sort_values()
+    blocks = [prices.reindex(idx).to_numpy(dtype=float)]
+    for other in others:
+        values = other.reindex(idx).to_numpy(dtype=float)
+        blocks.append(values.reshape(-1, 1) if values.ndim == 1 else values)
+    mat = np.hstack(blocks)
+    if np.isnan(mat).any():
+        # pct_change propaga o último preço válido antes de calcular o retorno
+        mat = pd.DataFrame(mat).ffill().to_numpy()
+    rets = np.diff(mat, axis=0) / mat[:-1]
+    keep = ~np.all(np.isnan(rets), axis=1)
+    if not keep.all():
+        rets = rets[keep]
+    out = []
+    start = 0
+    for block, src in zip(blocks, (prices,) + others):
+        stop = start + block.shape[1]
+        part = rets[:, start:stop]
+        out.append(part[:, 0] if isinstance(src, pd.Series) else part)
+        start = stop
+    return tuple(out)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _apt_kernel(X, Y, XtX_inv):
+    """Calcula alfas, betas e R² de cada coluna de Y (paralelo sobre os ativos).
+
+    Parâmetros:
+        X (np.ndarray): Matriz de desenho T×k (com a coluna de intercepto).
+        Y (np.ndarray): Matriz de respostas T×n, preferencialmente em ordem Fortran.
+        XtX_inv (np.ndarray): Inversa k×k de X'X, fatorada fora do kernel.
+
+    Retorna:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Alfas (n,), betas (n, k-1) e R² (n,).
+    """
+    T, k = X.shape
+    n = Y.shape[1]
+    alphas = np.empty(n)
+    betas = np.empty((n, k - 1))
+    r2 = np.empty(n)
+    for i in prange(n):
+        xty = np.zeros(k)
+        mean_y = 0.0
+        for t in range(T):
+            y = Y[t, i]
+            mean_y += y
+            for j in range(k):
+                xty[j] += X[t, j] * y
+        mean_y /= T
+        coef = np.zeros(k)
+        for a in range(k):
+            acc = 0.0
+            for b in range(k):
+                acc += XtX_inv[a, b] * xty[b]
+            coef[a] = acc
+        ss_res = 0.0
+        ss_tot = 0.0
+        for t in range(T):
+            y_hat = 0.0
+            for j in range(k):
+                y_hat += X[t, j] * coef[j]
+            e = Y[t, i] - y_hat
+            ss_res += e * e
+            d = Y[t, i] - mean_y
+            ss_tot += d * d
+        alphas[i] = coef[0]
+        for j in range(1, k):
+            betas[i, j - 1] = coef[j]
+        r2[i] = 0.0 if ss_tot == 0.0 else 1.0 - ss_res / ss_tot
+    return alphas, betas, r2
+
+
+@njit(cache=True)
+def _neg_sharpe(w, mu, cov, rf):
+    """Sharpe negativo da carteira `w` (objetivo do max_sharpe).
+
+    Parâmetros:
+        w (np.ndarray): Pesos (n,).
+        mu (np.ndarray): Retornos esperados anualizados (n,).
+        cov (np.ndarray): Covariância anualizada n×n.
+        rf (float): Taxa livre de risco.
+
+    Retorna:
+        float: -(w·μ - rf) / σ.
+    """
+    var = np.dot(w, np.dot(cov, w))
+    return -(np.dot(w, mu) - rf) / (np.sqrt(max(var, 0.0)) + 1e-12)
+
+
+@njit(cache=True)
+def _neg_sharpe_grad(w, mu, cov, rf):
+    """Gradiente de `_neg_sharpe` pela regra do quociente: -(μσ² - (w·μ - rf)Σw) / σ³.
+
+    Parâmetros:
+        w, mu, cov, rf: Mesmos argumentos de `_neg_sharpe`.
+
+    Retorna:
+        np.ndarray: Gradiente (n,).
+    """
+    cw = np.dot(cov, w)
+    var = max(np.dot(w, cw), 0.0)
+    vol = np.sqrt(var)
+    return -(mu * var - (np.dot(w, mu) - rf) * cw) / (vol**3 + 1e-12)
+
+
 @dataclass
 class OptimizationEngine:
     """Orquestra as otimizações de portfólio e análises de modelos de fatores."""
@@ -32,7 +228,69 @@ class OptimizationEngine:
         """Carrega os preços históricos para uma lista de ativos."""
         return self.loader.fetch_stock_prices(assets, start_date, end_date)
 
-    def optimize_markowitz(self, assets: List[str], start_date: str, end_date: str, objective: str = 'max_sharpe', bounds: Optional[List[Tuple[float,float]]] = None, long_only: bool = True, max_weight: Optional[float] = None, risk_free_rate: Optional[float] = None) -> Dict:
+    def _markowitz_moments(self, assets: List[str], start_date: str, end_date: str, use_shrinkage: bool) -> Dict:
+        """Calcula (ou recupera do cache) μ, Σ anualizados e os termos Σ⁻¹1 e Σ⁻¹μ.
+
+        Com ENABLE_CACHE ativo, trocar apenas o objetivo para o mesmo conjunto de
+        ativos e período não refaz a busca de preços nem a covariância.
+        """
+        key = (tuple(assets), start_date, end_date, use_shrinkage, self.config.DIAS_UTEIS_ANO)
+        if self.config.ENABLE_CACHE:
+            with _MOMENTS_CACHE_LOCK:
+                cached = _MOMENTS_CACHE.get(key)
+            if cached is not None:
+                return cached
+
+        prices = self.load_prices(assets, start_date, end_date)
+        rets = _returns_from_prices(prices)[assets].dropna()
+        if rets.shape[1] < 2:
+            raise ValueError("São necessários pelo menos 2 ativos para otimização")
+        mu, cov = _annualize_mean_cov(rets, self.config.DIAS_UTEIS_ANO)
+        if use_shrinkage:
+            try:
+                from sklearn.covariance import LedoitWolf
+                cov = LedoitWolf(assume_centered=False).fit(rets.values).covariance_ * self.config.DIAS_UTEIS_ANO
+            except ImportError:
+                logging.warning("scikit-learn indisponível; usando covariância amostral na otimização")
+
+        moments = {'mu': mu, 'cov': cov, 'inv1': None, 'invmu': None}
+        try:
+            chol = cho_factor(cov)
+            moments['inv1'] = cho_solve(chol, np.ones(len(mu)))
+            moments['invmu'] = cho_solve(chol, mu)
+        except (np.linalg.LinAlgError, ValueError):
+            pass
+
+        if self.config.ENABLE_CACHE:
+            with _MOMENTS_CACHE_LOCK:
+                _MOMENTS_CACHE[key] = moments
+        return moments
+
+    @staticmethod
+    def _analytic_weights(moments: Dict, objective: str, rf: float, bounds: List[Tuple[float, float]]) -> Optional[np.ndarray]:
+        """Retorna a solução fechada de min_var/max_sharpe se ela respeitar os limites.
+
+        A carteira de variância mínima (Σ⁻¹1) e a tangente (Σ⁻¹(μ - rf)) resolvem o
+        problema só com a restrição de soma 1; se os pesos já estão dentro dos
+        limites, também são ótimos do problema restrito. Caso contrário, None.
+        """
+        if moments['inv1'] is None or objective not in ('min_var', 'max_sharpe'):
+            return None
+        if objective == 'min_var':
+            raw = moments['inv1']
+        else:
+            raw = moments['invmu'] - rf * moments['inv1']
+        total = raw.sum()
+        if not np.isfinite(total) or total <= 1e-12:
+            return None
+        w = raw / total
+        lower = np.array([b[0] for b in bounds], dtype=float)
+        upper = np.array([b[1] for b in bounds], dtype=float)
+        if np.any(w < lower - 1e-10) or np.any(w > upper + 1e-10):
+            return None
+        return w
+
+    def optimize_markowitz(self, assets: List[str], start_date: str, end_date: str, objective: str = 'max_sharpe', bounds: Optional[List[Tuple[float,float]]] = None, long_only: bool = True, max_weight: Optional[float] = None, risk_free_rate: Optional[float] = None, use_shrinkage: bool = True) -> Dict:
         """
         Optimizes a portfolio using the Markowitz model for a specific objective.
 
@@ -53,6 +311,9 @@ class OptimizationEngine:
                                           If None, no upper limit other than 1.0.
             risk_free_rate (Optional[float]): The risk-free rate to use for Sharpe ratio calculation.
                                               If None, uses the configured risk-free rate.
+            use_shrinkage (bool): If True, replaces the sample covariance with the Ledoit-Wolf
+                                  shrunk estimator, which is better conditioned for many assets.
+                                  Defaults to True.
 
         Returns:
             Dict: A dictionary containing the optimal weights and portfolio statistics:
@@ -65,11 +326,8 @@ class OptimizationEngine:
                   - 'success' (bool): True if optimization was successful, False otherwise.
                   - 'message' (str): Message from the optimization solver.
         """
-        prices = self.load_prices(assets, start_date, end_date)
-        rets = _returns_from_prices(prices)[assets].dropna()
-        if rets.shape[1] < 2:
-            raise ValueError("São necessários pelo menos 2 ativos para otimização")
-        mu, cov = _annualize_mean_cov(rets, self.config.DIAS_UTEIS_ANO)
+        moments = self._markowitz_moments(assets, start_date, end_date, use_shrinkage)
+        mu, cov = moments['mu'], moments['cov']
         n = len(assets)
         if bounds is None:
             if long_only:
@@ -88,18 +346,36 @@ class OptimizationEngine:
             sharpe = (ret - rf) / (vol + 1e-12)
             return ret, vol, sharpe
 
-        cons = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0},)
+        cons = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0, 'jac': lambda w: np.ones_like(w)},)
         x0 = np.ones(n) / n
 
         if objective == 'min_var':
             fun = lambda w: w @ cov @ w
+            jac = lambda w: 2.0 * (cov @ w)
         elif objective == 'max_return':
             fun = lambda w: -(w @ mu)
+            jac = lambda w: -mu
         else:  # max_sharpe
-            fun = lambda w: -((w @ mu - rf) / (np.sqrt(max(w @ cov @ w, 0)) + 1e-12))
+            mu_c = np.ascontiguousarray(mu, dtype=np.float64)
+            cov_c = np.ascontiguousarray(cov, dtype=np.float64)
+            rf_c = float(rf)
+            fun = lambda w: _neg_sharpe(w, mu_c, cov_c, rf_c)
+            jac = lambda w: _neg_sharpe_grad(w, mu_c, cov_c, rf_c)
 
-        res = minimize(fun, x0, bounds=bounds, constraints=cons, method='SLSQP', options={'maxiter': 100})
-        w_opt = res.x
+        w_opt = self._analytic_weights(moments, objective, rf, bounds)
+        if w_opt is not None:
+            success, message = True, 'Solução analítica (limites inativos)'
+        elif objective == 'min_var':
+            # Quadrática: com a Hessiana constante (2Σ) o trust-constr converge em poucas iterações
+            lower = np.array([b[0] for b in bounds], dtype=float)
+            upper = np.array([b[1] for b in bounds], dtype=float)
+            res = minimize(fun, x0, jac=jac, hess=lambda w: 2.0 * cov, method='trust-constr',
+                           bounds=Bounds(lower, upper), constraints=LinearConstraint(np.ones((1, n)), 1.0, 1.0),
+                           options={'maxiter': 500, 'gtol': 1e-10, 'xtol': 1e-12})
+            w_opt, success, message = res.x, bool(res.success), res.message
+        else:
+            res = minimize(fun, x0, jac=jac, bounds=bounds, constraints=cons, method='SLSQP', options={'maxiter': 100})
+            w_opt, success, message = res.x, bool(res.success), res.message
         ret, vol, sharpe = portfolio_stats(w_opt)
         return {
             'weights': {assets[i]: float(w_opt[i]) for i in range(n)},
@@ -108,8 +384,8 @@ class OptimizationEngine:
             'sharpe': float(sharpe),
             'risk_free_rate': float(rf),  # Include the used risk-free rate in the response
             'objective': objective,
-            'success': bool(res.success),
-            'message': res.message,
+            'success': success,
+            'message': message,
         }
 
     def capm_metrics(self, assets: List[str], start_date: str, end_date: str, benchmark_ticker: str) -> Dict:
@@ -134,24 +410,13 @@ class OptimizationEngine:
         bench_series = self.loader.fetch_benchmark_data(benchmark_ticker, start_date, end_date)
         if bench_series is None:
             raise ValueError("Benchmark sem dados")
-        df = prices.join(bench_series.rename('BENCH'), how='inner')
-        rets = _returns_from_prices(df)
-        results = {}
-        rb = rets['BENCH'].values.reshape(-1, 1)
+        cols = [a for a in assets if a in prices.columns]
+        ra, rb = _aligned_returns(prices[cols], bench_series)
         X = np.column_stack([np.ones(rb.shape[0]), rb])
-        for a in assets:
-            if a not in rets.columns:
-                continue
-            y = rets[a].values
-            beta_params, *_ = lstsq(X, y, rcond=None)
-            alpha, beta = beta_params[0], beta_params[1]
-            # estatísticas simples
-            y_hat = X @ beta_params
-            resid = y - y_hat
-            ss_res = float(np.sum(resid**2))
-            ss_tot = float(np.sum((y - np.mean(y))**2))
-            r2 = 0.0 if ss_tot == 0 else 1 - ss_res/ss_tot
-            results[a] = {'alpha': float(alpha), 'beta': float(beta), 'r2': float(r2)}
+        coeffs, r2 = _ols_normal_equations(X, ra)
+        results = {}
+        for j, a in enumerate(cols):
+            results[a] = {'alpha': float(coeffs[0, j]), 'beta': float(coeffs[1, j]), 'r2': float(r2[j])}
         return {'benchmark': benchmark_ticker, 'metrics': results}
 
     def apt_metrics(self, assets: List[str], start_date: str, end_date: str, factors: List[str]) -> Dict:
@@ -173,26 +438,24 @@ class OptimizationEngine:
         """
         prices_assets = self.load_prices(assets, start_date, end_date)
         prices_factors = self.load_prices(factors, start_date, end_date)
-        df = prices_assets.join(prices_factors, how='inner', lsuffix='', rsuffix='_F')
-        rets = _returns_from_prices(df)
-        # separa colunas
-        factor_cols = [c for c in rets.columns if c in factors]
-        X = rets[factor_cols].values
+        cols = [a for a in assets if a in prices_assets.columns]
+        factor_cols = [c for c in prices_factors.columns if c in factors]
+        Y, X = _aligned_returns(prices_assets[cols], prices_factors[factor_cols])
         X = np.column_stack([np.ones(X.shape[0]), X])
+        XtX_inv = None
+        if NUMBA_AVAILABLE and not _jax_accelerated(Y.shape[1]):
+            try:
+                XtX_inv = cho_solve(cho_factor(X.T @ X), np.eye(X.shape[1]))
+            except np.linalg.LinAlgError:
+                XtX_inv = None
+        if XtX_inv is not None:
+            alphas, betas, r2 = _apt_kernel(np.ascontiguousarray(X), np.asfortranarray(Y), XtX_inv)
+        else:
+            coeffs, r2 = _ols_normal_equations(X, Y)
+            alphas, betas = coeffs[0], coeffs[1:].T
         results = {}
-        for a in assets:
-            if a not in rets.columns:
-                continue
-            y = rets[a].values
-            coeffs, *_ = lstsq(X, y, rcond=None)
-            alpha = coeffs[0]
-            betas = coeffs[1:].tolist()
-            y_hat = X @ coeffs
-            resid = y - y_hat
-            ss_res = float(np.sum(resid**2))
-            ss_tot = float(np.sum((y - np.mean(y))**2))
-            r2 = 0.0 if ss_tot == 0 else 1 - ss_res/ss_tot
-            results[a] = {'alpha': float(alpha), 'betas': betas, 'factors': factor_cols, 'r2': float(r2)}
+        for j, a in enumerate(cols):
+            results[a] = {'alpha': float(alphas[j]), 'betas': betas[j].tolist(), 'factors': factor_cols, 'r2': float(r2[j])}
         return {'metrics': results}
 
     def black_litterman(self, assets: List[str], start_date: str, end_date: str, market_caps: Dict[str, float], views: List[Dict], tau: float = 0.05) -> Dict:
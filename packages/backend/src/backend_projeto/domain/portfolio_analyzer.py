@@ -14,10 +14,60 @@ import pandas as pd
 
 from backend_projeto.infrastructure.utils.config import Settings, settings
 from backend_projeto.infrastructure.data_handling import YFinanceProvider
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit
 from backend_projeto.domain.risk_metrics import var_historical, es_historical
 from backend_projeto.domain.covariance import risk_attribution
 
 
+@njit(cache=True, error_model='numpy')
+def _rolling_beta_kernel(a, b, invalid, window):
+    """Beta rolante por somas móveis atualizadas em O(1) a cada passo.
+
+    Parâmetros:
+        a (np.ndarray): Retornos do ativo (float64, zero nas posições inválidas).
+        b (np.ndarray): Retornos do benchmark (float64, zero nas posições inválidas).
+        invalid (np.ndarray): 1 onde algum dos dois é NaN (uint8).
+        window (int): Tamanho da janela.
+
+    Retorna:
+        np.ndarray: Beta de cada janela completa (len(a) - window + 1,); NaN nas janelas com posição inválida.
+    """
+    n = a.shape[0]
+    out = np.full(n - window + 1, np.nan)
+    sa = 0.0
+    sb = 0.0
+    sab = 0.0
+    sbb = 0.0
+    bad = 0
+    for i in range(n):
+        sa += a[i]
+        sb += b[i]
+        sab += a[i] * b[i]
+        sbb += b[i] * b[i]
+        bad += invalid[i]
+        if i >= window:
+            j = i - window
+            sa -= a[j]
+            sb -= b[j]
+            sab -= a[j] * b[j]
+            sbb -= b[j] * b[j]
+            bad -= invalid[j]
+        if i >= window - 1 and bad == 0:
+            out[i - window + 1] = (window * sab - sa * sb) / (window * sbb - sb * sb)
+    return out
+
+
+def _rolling_beta_numpy(a: np.ndarray, b: np.ndarray, invalid: np.ndarray, window: int) -> np.ndarray:
+    """Versão NumPy de `_rolling_beta_kernel`: somas móveis a partir de somas acumuladas."""
+    sums = np.cumsum(np.vstack([a, b, a * b, b * b, invalid]), axis=1)
+    sums = np.concatenate([np.zeros((5, 1)), sums], axis=1)
+    sum_a, sum_b, sum_ab, sum_bb, n_invalid = sums[:, window:] - sums[:, :-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = (window * sum_ab - sum_a * sum_b) / (window * sum_bb - sum_b * sum_b)
+    beta[n_invalid > 0] = np.nan
+    return beta
+
+
 def calculate_rolling_beta(asset_returns: pd.Series, benchmark_returns: pd.Series, window: int = 60) -> pd.Series:
     """
     Calculates the rolling beta of an asset's returns against a benchmark's returns.
@@ -30,10 +80,26 @@ def calculate_rolling_beta(asset_returns: pd.Series, benchmark_returns: pd.Serie
     Returns:
         Series of rolling beta values
     """
-    asset_returns, benchmark_returns = asset_returns.align(benchmark_returns, join='inner')
-    rolling_cov = asset_returns.rolling(window=window).cov(benchmark_returns)
-    rolling_var = benchmark_returns.rolling(window=window).var()
-    rolling_beta = rolling_cov / rolling_var
+    # Séries do mesmo DataFrame já compartilham o índice; só alinha quando diferem
+    if not asset_returns.index.equals(benchmark_returns.index):
+        asset_returns, benchmark_returns = asset_returns.align(benchmark_returns, join='inner')
+    index = asset_returns.index
+    a = asset_returns.to_numpy(dtype=float)
+    b = benchmark_returns.to_numpy(dtype=float)
+    if len(a) < window:
+        return pd.Series(dtype=float, index=index[:0])
+
+    # Janelas com algum NaN ficam de fora, como no rolling do pandas; centrar pela média
+    # global não altera a covariância e reduz o cancelamento nas diferenças de somas
+    invalid = np.isnan(a) | np.isnan(b)
+    a = np.where(invalid, 0.0, a - np.nanmean(a))
+    b = np.where(invalid, 0.0, b - np.nanmean(b))
+
+    if NUMBA_AVAILABLE:
+        beta = _rolling_beta_kernel(a, b, invalid.view(np.uint8), window)
+    else:
+        beta = _rolling_beta_numpy(a, b, invalid, window)
+    rolling_beta = pd.Series(beta, index=index[window - 1:])
     return rolling_beta.dropna()
 
 
@@ -4,11 +4,13 @@ Risk Engine module - Orchestrates risk analysis computations.
 This module provides the RiskEngine class which serves as a facade
 for various risk calculations including VaR, ES, drawdown, stress testing, etc.
 """
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
 from backend_projeto.infrastructure.data_handling import YFinanceProvider
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit, prange
 from backend_projeto.infrastructure.utils.config import Settings, settings
 from backend_projeto.domain.risk_metrics import (
     var_parametric,
@@ -18,44 +20,60 @@ from backend_projeto.domain.risk_metrics import (
     drawdown,
 )
 from backend_projeto.domain.stress_testing import stress_test, backtest_var
-from backend_projeto.domain.covariance import covariance_ledoit_wolf, risk_attribution
+from backend_projeto.domain.covariance import covariance_ledoit_wolf, risk_attribution, _as_weights
+from backend_projeto.domain.financial_math import _pct_change
 
 
 def compute_returns(price_df: pd.DataFrame) -> pd.DataFrame:
-    """Calcula os retornos diários percentuais a partir de um DataFrame de preços."""
-    import numpy as np
-    r = price_df.sort_index().pct_change().dropna(how='all')
-    return r.replace([np.inf, -np.inf], np.nan).dropna(how='all')
+    """Calcula os retornos diários percentuais a partir de um DataFrame de preços (±inf viram NaN)."""
+    return _pct_change(price_df, finite=True, drop_empty=True)
+
+
+# Sem fastmath: ele permite ao compilador assumir que não há NaN e descartar o teste
+@njit(parallel=True, cache=True)
+def _portfolio_returns_kernel(X, w):
+    """Retorno ponderado de cada linha de X, renormalizando os pesos sobre os ativos sem NaN.
+
+    Parâmetros:
+        X (np.ndarray): Retornos T×K (NaN onde o ativo não tem cotação).
+        w (np.ndarray): Pesos (K,).
+
+    Retorna:
+        np.ndarray: Retornos do portfólio (T,); 0.0 nas linhas sem peso disponível.
+    """
+    T, K = X.shape
+    out = np.empty(T)
+    for i in prange(T):
+        acc = 0.0
+        wsum = 0.0
+        for j in range(K):
+            x = X[i, j]
+            if not np.isnan(x):
+                acc += x * w[j]
+                wsum += w[j]
+        out[i] = acc / wsum if wsum != 0.0 else 0.0
+    return out
 
 
 def portfolio_returns(returns_df: pd.DataFrame, assets: List[str], weights: Optional[List[float]]) -> pd.Series:
-    """Calcula os retornos de um portfólio a partir dos retornos de ativos individuais e seus pesos."""
-    import numpy as np
-    
-    def _as_weights(assets: List[str], weights: Optional[List[float]]) -> np.ndarray:
-        if not weights:
-            return np.ones(len(assets)) / len(assets)
-        w = np.array(weights, dtype=float)
-        if len(w) != len(assets):
-            raise ValueError("Tamanho de weights difere do número de assets")
-        s = w.sum()
-        if s == 0:
-            raise ValueError("Soma dos pesos não pode ser zero")
-        return w / s
-    
+    """Calcula os retornos de um portfólio a partir dos retornos de ativos individuais e seus pesos.
+
+    Em cada data os pesos são renormalizados sobre os ativos com retorno disponível.
+    """
     sel = [a for a in assets if a in returns_df.columns]
     if not sel:
         raise ValueError("Nenhum ativo encontrado em returns_df")
-    w = _as_weights(sel, weights if weights and len(weights) == len(assets) else None)
-    X = returns_df[sel].copy()
-    w_series = pd.Series(w, index=sel)
-    mask = X.notna()
-    w_masked = mask.mul(w_series, axis=1)
-    row_sum = w_masked.sum(axis=1).replace(0.0, np.nan)
-    w_norm = w_masked.div(row_sum, axis=0).fillna(0.0)
-    port = (X.fillna(0.0) * w_norm).sum(axis=1)
-    port.name = 'portfolio'
-    return port
+    w = _as_weights(sel, None if weights is None or len(weights) != len(assets) else weights)
+    X = returns_df[sel].to_numpy(dtype=float)
+    if NUMBA_AVAILABLE:
+        out = _portfolio_returns_kernel(np.ascontiguousarray(X), w)
+    else:
+        # Sem Numba: numerador e soma dos pesos presentes em dois produtos matriciais
+        present = ~np.isnan(X)
+        num = np.where(present, X, 0.0) @ w
+        den = present @ w
+        out = np.divide(num, den, out=np.zeros_like(num), where=den != 0.0)
+    return pd.Series(out, index=returns_df.index, name='portfolio')
 
 
 @dataclass
@@ -71,6 +89,9 @@ class RiskEngine:
 
     def _portfolio_series(self, df_prices: pd.DataFrame, assets: List[str], weights: Optional[List[float]]) -> pd.Series:
         """Calculates portfolio returns series."""
+        # Valida antes de calcular retornos: sem colunas selecionadas não há o que calcular
+        if not any(a in df_prices.columns for a in assets):
+            raise ValueError("Nenhum ativo encontrado em returns_df")
         rets = compute_returns(df_prices)
         return portfolio_returns(rets, assets, weights)
 
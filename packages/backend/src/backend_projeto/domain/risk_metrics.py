@@ -8,15 +8,137 @@ This module provides various methods for calculating:
 """
 import numpy as np
 import pandas as pd
+from functools import lru_cache
 from typing import Dict, Tuple
 from scipy.stats import norm
 
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit
+
 try:
     from arch import arch_model
 except Exception:
     arch_model = None
 
 
+@lru_cache(maxsize=64)
+def _z_phi(alpha: float) -> Tuple[float, float]:
+    """Quantil normal z = Φ⁻¹(1 - alpha) e a densidade φ(z), memorizados por alpha."""
+    z = float(norm.ppf(1 - alpha))
+    return z, float(norm.pdf(z))
+
+
+# Observações usadas para a variância inicial do EWMA (convenção RiskMetrics)
+_EWMA_WARMUP = 30
+
+
+@njit(cache=True)
+def _ewma_var_kernel(x, lam, warmup):
+    """Variância EWMA de `x`, partindo da média de x² nas primeiras `warmup` observações.
+
+    Parâmetros:
+        x (np.ndarray): Retornos (float64 contíguo, sem NaN).
+        lam (float): Fator de decaimento.
+        warmup (int): Observações usadas na variância inicial.
+
+    Retorna:
+        float: Variância após aplicar v = λ·v + (1-λ)·x² a cada retorno.
+    """
+    n = x.shape[0]
+    m = min(warmup, n)
+    var = 0.0
+    for i in range(m):
+        var += x[i] * x[i]
+    if m > 0:
+        var /= m
+    one_m = 1.0 - lam
+    for i in range(n):
+        var = lam * var + one_m * x[i] * x[i]
+    return var
+
+
+def _ewma_var(x: np.ndarray, lam: float) -> float:
+    """Variância EWMA de `x` (kernel Numba ou, sem ele, a forma fechada da recorrência).
+
+    Desenrolando a recorrência: v_n = λⁿ·v₀ + (1-λ)·Σ λ^(n-1-i)·x_i².
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return float(_ewma_var_kernel(x, lam, _EWMA_WARMUP))
+    n = len(x)
+    head = x[:_EWMA_WARMUP]
+    var0 = float(np.dot(head, head) / head.size) if head.size else 0.0
+    decay = lam ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    return float(lam ** n * var0 + (1 - lam) * np.dot(decay, x * x))
+
+
+def _historical_tail(returns, alpha: float) -> Tuple[float, np.ndarray]:
+    """Quantil (1 - alpha) com interpolação linear, como `Series.quantile`, e a cauda até ele.
+
+    Usa `np.partition` (seleção em O(T)) nas duas estatísticas de ordem vizinhas do
+    quantil em vez de ordenar a série inteira. NaN são ignorados.
+
+    Retorna:
+        Tuple[float, np.ndarray]: O quantil e os retornos das posições até ele (fora de ordem).
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    n = x.size
+    if n == 0:
+        return float('nan'), x
+    h = (n - 1) * (1 - alpha)
+    lo = int(np.floor(h))
+    hi = min(lo + 1, n - 1)
+    part = np.partition(x, [lo, hi] if hi != lo else lo)
+    a, b, t = part[lo], part[hi], h - lo
+    # Mesma interpolação do NumPy, estável para t próximo de 1
+    q = b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+    return float(q), part[:lo + 1]
+
+
+def _mu_sigma_np(x: np.ndarray, method: str, ewma_lambda: float) -> Tuple[float, float]:
+    """
+    Média e volatilidade ('std' ou 'ewma') de um array float64, sem passar por pd.Series.
+
+    NaN é ignorado na média e no desvio padrão (como no pandas) e tratado como
+    retorno zero no EWMA.
+    """
+    valid = x[~np.isnan(x)]
+    mu = float(valid.mean()) if valid.size else float('nan')
+    if method == 'std':
+        sigma = float(valid.std(ddof=1)) if valid.size > 1 else float('nan')
+    else:
+        sigma = float(np.sqrt(_ewma_var(np.nan_to_num(x, nan=0.0), ewma_lambda)))
+    return mu, sigma
+
+
+def _mu_sigma(returns: pd.Series, method: str, ewma_lambda: float) -> Tuple[float, float]:
+    """Média e volatilidade usadas pelo VaR e pelo ES paramétricos (um único ajuste GARCH)."""
+    if method in ('std', 'ewma'):
+        return _mu_sigma_np(returns.to_numpy(dtype=np.float64), method, ewma_lambda)
+    if method == 'garch':
+        if arch_model is None:
+            raise RuntimeError("Pacote 'arch' não disponível para método garch")
+        am = arch_model(returns.dropna() * 100, vol='GARCH', p=1, q=1, dist='normal')
+        res = am.fit(disp='off')
+        return float(returns.mean()), float(res.conditional_volatility.iloc[-1] / 100.0)
+    raise ValueError("method deve ser std|ewma|garch")
+
+
+def _parametric_details(mu: float, sigma: float, z: float, method: str, ewma_lambda: float) -> Dict:
+    """Dicionário de detalhes comum ao VaR e ao ES paramétricos."""
+    details = {"mu": mu, "sigma": sigma, "z": z, "method": method}
+    if method == 'ewma':
+        details["ewma_lambda"] = ewma_lambda
+    return details
+
+
+def _var_parametric_np(x: np.ndarray, alpha: float, method: str, ewma_lambda: float) -> Tuple[float, Dict]:
+    """VaR paramétrico ('std' ou 'ewma') sobre um array float64."""
+    mu, sigma = _mu_sigma_np(x, method, ewma_lambda)
+    z = _z_phi(alpha)[0]
+    return float(-(mu + z * sigma)), _parametric_details(mu, sigma, z, method, ewma_lambda)
+
+
 def var_parametric(returns: pd.Series, alpha: float = 0.99, method: str = 'std', ewma_lambda: float = 0.94) -> Tuple[float, Dict]:
     """
     Calculates Parametric Value at Risk (VaR) assuming a normal distribution (or conditional GARCH).
@@ -43,31 +165,9 @@ def var_parametric(returns: pd.Series, alpha: float = 0.99, method: str = 'std',
         RuntimeError: If 'arch' package is not available for 'garch' method.
         ValueError: If an invalid method is specified.
     """
-    mu = float(returns.mean())
-    if method == 'std':
-        sigma = float(returns.std(ddof=1))
-    elif method == 'ewma':
-        lam = ewma_lambda
-        x = returns.fillna(0.0).values
-        var = np.var(x) if len(x) > 1 else 0.0
-        for xi in x:
-            var = lam * var + (1 - lam) * (xi ** 2)
-        sigma = float(np.sqrt(var))
-    elif method == 'garch':
-        if arch_model is None:
-            raise RuntimeError("Pacote 'arch' não disponível para método garch")
-        am = arch_model(returns.dropna() * 100, vol='GARCH', p=1, q=1, dist='normal')
-        res = am.fit(disp='off')
-        sigma = float(res.conditional_volatility.iloc[-1] / 100.0)
-    else:
-        raise ValueError("method deve ser std|ewma|garch")
-    
-    z = float(norm.ppf(1 - alpha))
-    var_value = -(mu + z * sigma)
-    details = {"mu": mu, "sigma": sigma, "z": z, "method": method}
-    if method == 'ewma':
-        details["ewma_lambda"] = ewma_lambda
-    return float(var_value), details
+    mu, sigma = _mu_sigma(returns, method, ewma_lambda)
+    z = _z_phi(alpha)[0]
+    return float(-(mu + z * sigma)), _parametric_details(mu, sigma, z, method, ewma_lambda)
 
 
 def es_parametric(returns: pd.Series, alpha: float = 0.99, method: str = 'std', ewma_lambda: float = 0.94) -> Tuple[float, Dict]:
@@ -92,15 +192,11 @@ def es_parametric(returns: pd.Series, alpha: float = 0.99, method: str = 'std',
     Raises:
         ValueError: If an invalid method is specified.
     """
-    mu = float(returns.mean())
-    if method in ('std', 'ewma', 'garch'):
-        v, d = var_parametric(returns, alpha=alpha, method=method, ewma_lambda=ewma_lambda)
-        sigma = d["sigma"]
-        z = float(norm.ppf(1 - alpha))
-        es = -(mu - sigma * norm.pdf(z) / (1 - alpha))
-        d.update({"z": z})
-        return float(es), d
-    raise ValueError("method deve ser std|ewma|garch")
+    # σ e μ uma única vez, sem recalcular o VaR (nem reajustar o GARCH)
+    mu, sigma = _mu_sigma(returns, method, ewma_lambda)
+    z, phi_z = _z_phi(alpha)
+    es = -(mu - sigma * phi_z / (1 - alpha))
+    return float(es), _parametric_details(mu, sigma, z, method, ewma_lambda)
 
 
 def var_historical(returns: pd.Series, alpha: float = 0.99) -> Tuple[float, Dict]:
@@ -118,7 +214,7 @@ def var_historical(returns: pd.Series, alpha: float = 0.99) -> Tuple[float, Dict
         Tuple[float, Dict]: A tuple containing the VaR value and a dictionary of details
                             (e.g., {'quantile': q}).
     """
-    q = returns.quantile(1 - alpha)
+    q, _ = _historical_tail(returns, alpha)
     return float(-q), {"quantile": q}
 
 
@@ -136,10 +232,11 @@ def es_historical(returns: pd.Series, alpha: float = 0.99) -> Tuple[float, Dict]
         Tuple[float, Dict]: A tuple containing the ES value and a dictionary of details
                             (e.g., {'threshold': q, 'n_tail': count}).
     """
-    q = returns.quantile(1 - alpha)
-    tail = returns[returns < q]
-    es = tail.mean()
-    return float(-es), {"threshold": q, "n_tail": len(tail)}
+    # Os retornos abaixo do quantil estão todos entre as posições até ele
+    q, head = _historical_tail(returns, alpha)
+    tail = head[head < q]
+    es = tail.mean() if tail.size else float('nan')
+    return float(-es), {"threshold": q, "n_tail": int(tail.size)}
 
 
 def var_evt(returns: pd.Series, alpha: float = 0.99, threshold_quantile: float = 0.9) -> Tuple[float, Dict]:
@@ -224,6 +321,67 @@ def es_evt(returns: pd.Series, alpha: float = 0.99, threshold_quantile: float =
     return float(es), details
 
 
+@njit(cache=True, error_model='numpy')
+def _max_drawdown_kernel(r):
+    """Drawdown máximo de `r` e as posições de início e fim, em uma passada.
+
+    Acumulado, pico e drawdown seguem `cumprod`/`cummax` do pandas: retornos NaN
+    são pulados e o pico parte do primeiro acumulado válido. O fim é o primeiro
+    mínimo; o início é o último ponto até ele com acumulado >= 99,99% do pico.
+    Sem observações válidas, o fim é -1.
+    """
+    n = r.size
+    c = 1.0
+    peak = np.nan
+    worst = np.inf
+    start = 0
+    end = -1
+    # Última posição com acumulado >= 99,99% do pico corrente: como o pico só muda
+    # ao ser superado, é o ponto que a busca para trás a partir do vale acharia
+    near = 0
+    for i in range(n):
+        x = r[i]
+        if np.isnan(x):
+            continue
+        c *= 1.0 + x
+        if not c <= peak:
+            peak = c
+            near = i
+        elif c >= peak * 0.9999:
+            near = i
+        dd = (c - peak) / peak
+        if dd < worst:
+            worst = dd
+            start = near
+            end = i
+    return worst, start, end
+
+
+def _max_drawdown_numpy(r: np.ndarray) -> Tuple[float, int, int]:
+    """Versão NumPy de `_max_drawdown_kernel`, usada quando o Numba não está disponível."""
+    valid = ~np.isnan(r)
+    cum = np.cumprod(np.where(valid, 1.0 + r, 1.0))
+    cum[~valid] = np.nan
+    # fmax ignora os NaN, como o cummax do pandas
+    peak = np.fmax.accumulate(cum)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd = (cum - peak) / peak
+    if np.isnan(dd).all():
+        return float('inf'), 0, -1
+    end = int(np.nanargmin(dd))
+    hits = np.flatnonzero(cum[:end + 1] >= peak[end] * 0.9999)
+    return float(dd[end]), int(hits[-1]) if hits.size else 0, end
+
+
+def _max_drawdown(r: np.ndarray) -> Tuple[float, int, int]:
+    """(drawdown máximo, posição de início, posição de fim) de um vetor de retornos."""
+    r = np.ascontiguousarray(r, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        worst, start, end = _max_drawdown_kernel(r)
+        return float(worst), int(start), int(end)
+    return _max_drawdown_numpy(r)
+
+
 def drawdown(returns: pd.Series) -> Dict:
     """
     Calculates the maximum drawdown and its start/end dates for a series of returns.
@@ -240,23 +398,11 @@ def drawdown(returns: pd.Series) -> Dict:
               - "start" (str): The start date of the maximum drawdown period.
               - "end" (str): The end date of the maximum drawdown period.
     """
-    cum_returns = (1 + returns).cumprod()
-    running_max = cum_returns.cummax()
-    drawdown_series = (cum_returns - running_max) / running_max
-    
-    max_drawdown = drawdown_series.min()
-    end_date = drawdown_series.idxmin()
-    
-    end_idx = cum_returns.index.get_loc(end_date)
-    target_value = running_max.iloc[end_idx]
-    
-    start_idx = 0
-    for i in range(end_idx, -1, -1):
-        if cum_returns.iloc[i] >= target_value * 0.9999:
-            start_idx = i
-            break
-    
-    start_date = cum_returns.index[start_idx]
+    max_drawdown, start_idx, end_idx = _max_drawdown(returns.to_numpy(dtype=np.float64))
+    if end_idx < 0:
+        raise ValueError("Série de retornos sem observações válidas")
+    start_date = returns.index[start_idx]
+    end_date = returns.index[end_idx]
     
     # Format dates based on index type
     def format_date(d):
@@ -48,6 +48,38 @@ def stress_test(returns_df: pd.DataFrame, assets: List[str], weights: Optional[L
     }
 
 
+def _rolling_var(returns: pd.Series, window: int, alpha: float, method: str, ewma_lambda: float, z: float) -> np.ndarray:
+    """
+    VaR de cada janela `returns[i-window:i]`, para i de `window` até o fim, sem laço por janela.
+
+    - 'historical': percentil de todas as janelas de uma vez sobre uma visão deslizante.
+    - 'std': desvio padrão móvel do pandas (O(T), ignora NaN como `Series.std`).
+    - 'ewma': os pesos do `ewm(adjust=True)` são os mesmos em toda janela, então as
+      somas ponderadas saem de dois produtos matriz-vetor; janelas com NaN, cujos
+      pesos mudam, usam o `ewm` do pandas.
+    """
+    if method not in ('historical', 'std', 'ewma'):
+        raise ValueError(f"Unsupported VaR method: {method}")
+    r = returns.to_numpy(dtype=np.float64)
+    n = len(r) - window
+    if method == 'std':
+        return returns.rolling(window, min_periods=2).std().to_numpy()[window - 1:-1] * z
+    windows = np.lib.stride_tricks.sliding_window_view(r, window)[:n]
+    if method == 'historical':
+        return -np.percentile(windows, (1 - alpha) * 100, axis=1)
+
+    w = ewma_lambda ** np.arange(window - 1, -1, -1, dtype=np.float64)
+    sw, sw2 = w.sum(), np.dot(w, w)
+    mean = windows @ w / sw
+    var = np.maximum(np.square(windows) @ w / sw - mean * mean, 0.0)
+    # Correção de viés do ewm(bias=False): (Σw)² / ((Σw)² - Σw²)
+    var *= sw * sw / (sw * sw - sw2)
+    out = np.sqrt(var) * z
+    for i in np.flatnonzero(np.isnan(windows).any(axis=1)):
+        out[i] = returns.iloc[i:i + window].ewm(alpha=1 - ewma_lambda).std().iloc[-1] * z
+    return out
+
+
 def backtest_var(returns: pd.Series, alpha: float, method: str = 'historical', ewma_lambda: float = 0.94) -> Dict:
     """
     Performs a backtest of Value at Risk (VaR) using a rolling window.
@@ -85,19 +117,9 @@ def backtest_var(returns: pd.Series, alpha: float, method: str = 'historical', e
         raise ValueError("Insufficient data for backtesting (need at least 30 observations)")
     
     window = min(250, len(returns) - 1)
+    z = norm.ppf(alpha)
     
-    var_series = []
-    for i in range(window, len(returns)):
-        window_returns = returns.iloc[i-window:i]
-        if method == 'historical':
-            var_value = -np.percentile(window_returns, (1 - alpha) * 100)
-        elif method == 'std':
-            var_value = window_returns.std() * norm.ppf(alpha)
-        elif method == 'ewma':
-            var_value = window_returns.ewm(alpha=1-ewma_lambda).std().iloc[-1] * norm.ppf(alpha)
-        else:
-            raise ValueError(f"Unsupported VaR method: {method}")
-        var_series.append(var_value)
+    var_series = _rolling_var(returns, window, alpha, method, ewma_lambda, z)
     
     actual_losses = -returns.iloc[window:]
     exceptions = (actual_losses > var_series).sum()
@@ -18,6 +18,8 @@ from typing import Dict, Iterable, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit
+
 
 def _ensure_sorted_index(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -39,10 +41,26 @@ def _ensure_sorted_index(df: pd.DataFrame) -> pd.DataFrame:
     return res
 
 
+@njit(cache=True)
+def _ema_kernel(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Recorrência da EMA (adjust=False): y[i] = alpha*x[i] + (1-alpha)*y[i-1]."""
+    y = np.empty_like(x)
+    if x.shape[0] == 0:
+        return y
+    y[0] = x[0]
+    for i in range(1, x.shape[0]):
+        y[i] = alpha * x[i] + (1.0 - alpha) * y[i - 1]
+    return y
+
+
 def sma(series: pd.Series, window: int) -> pd.Series:
     """
     Calculates the Simple Moving Average (SMA) for a given series.
 
+    Uses a cumulative-sum difference, which is O(T) with no per-window overhead.
+    Series containing NaNs fall back to pandas rolling, which keeps NaNs local
+    to the windows they fall in.
+
     Args:
         series (pd.Series): The input time series data.
         window (int): The number of periods over which to calculate the SMA.
@@ -50,13 +68,23 @@ def sma(series: pd.Series, window: int) -> pd.Series:
     Returns:
         pd.Series: A Series containing the SMA values.
     """
-    return series.rolling(window=window).mean()
+    x = series.to_numpy(dtype=float)
+    if window < 1 or np.isnan(x).any():
+        return series.rolling(window=window).mean()
+    out = np.full(x.shape[0], np.nan)
+    if window <= x.shape[0]:
+        cs = np.cumsum(np.insert(x, 0, 0.0))
+        out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    return pd.Series(out, index=series.index, name=series.name)
 
 
 def ema(series: pd.Series, window: int) -> pd.Series:
     """
     Calculates the Exponential Moving Average (EMA) for a given series.
 
+    The recursion runs in a Numba kernel when available; otherwise (or when the
+    series contains NaNs) pandas' `ewm` is used.
+
     Args:
         series (pd.Series): The input time series data.
         window (int): The number of periods over which to calculate the EMA.
@@ -64,7 +92,11 @@ def ema(series: pd.Series, window: int) -> pd.Series:
     Returns:
         pd.Series: A Series containing the EMA values.
     """
-    return series.ewm(span=window, adjust=False).mean()
+    x = series.to_numpy(dtype=float)
+    if not NUMBA_AVAILABLE or window < 1 or np.isnan(x).any():
+        return series.ewm(span=window, adjust=False).mean()
+    y = _ema_kernel(x, 2.0 / (window + 1.0))
+    return pd.Series(y, index=series.index, name=series.name)
 
 
 def moving_averages(
@@ -1,14 +1,94 @@
 """
 Módulo para gerenciar calendário de negociação, incluindo feriados e dias úteis.
 """
-from datetime import date, datetime, timedelta
-from typing import List, Set, Optional
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import os
+import threading
+import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
 import logging
 
+from backend_projeto.infrastructure.utils.jit import njit
+
 logger = logging.getLogger(__name__)
 
+# Primeiro dia coberto pela máscara de dias não úteis
+_BASE_DATE = date(2000, 1, 1)
+# Ordinal de 1970-01-01, para converter datetime64[D] em date.toordinal()
+_EPOCH_ORD = date(1970, 1, 1).toordinal()
+# Máscaras já calculadas ficam em disco e são mapeadas em memória pelos processos
+_MASK_CACHE_DIR = Path.home() / '.cache' / 'backend_projeto'
+_MASK_CACHE_VERSION = 1
+# Máscaras mantidas por mercado e data inicial: processos com horizontes diferentes
+# compartilham o diretório, então só as mais antigas além deste número são removidas
+_MASK_CACHE_KEEP = 4
+# Limite para a extensão sob demanda do horizonte (anos à frente de hoje)
+_MAX_YEARS_AHEAD = 30
+
+# Feriados nacionais fixos (mês, dia) usados no fallback
+_FIXED_HOLIDAYS = (
+    (1, 1),    # Ano Novo
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalhador
+    (9, 7),    # Independência do Brasil
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (12, 25),  # Natal
+)
+
+
+@njit(cache=True)
+def _easter_ordinals(years):
+    """Calcula o Domingo de Páscoa de vários anos (algoritmo de Meeus/Jones/Butcher).
+
+    Parâmetros:
+        years (np.ndarray): Anos (int64).
+
+    Retorna:
+        np.ndarray: Ordinais (`date.toordinal()`) de cada Domingo de Páscoa.
+    """
+    a = years % 19
+    b = years // 100
+    c = years % 100
+    d = b // 4
+    e = b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i = c // 4
+    k = c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    # Ordinal de 1º de março do ano (0001-03-01 = 60) mais o dia dentro do ano iniciado
+    # em março; a Páscoa cai sempre em março/abril
+    doy = (153 * (month - 3) + 2) // 5 + day - 1
+    return (years - 1) * 365 + years // 4 - years // 100 + years // 400 + doy + 60
+
+
+def _civil_ordinals(years: np.ndarray, month: int, day: int) -> np.ndarray:
+    """Equivalente vetorizado de `date(year, month, day).toordinal()` para vários anos.
+
+    Parâmetros:
+        years (np.ndarray): Anos (int64).
+        month (int): Mês (1-12).
+        day (int): Dia do mês.
+
+    Retorna:
+        np.ndarray: Ordinais de cada data.
+    """
+    # Conta os anos a partir de março, para o dia bissexto cair no fim do ano
+    y = years - (1 if month <= 2 else 0)
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    return (y - 1) * 365 + y // 4 - y // 100 + y // 400 + doy + 60
+
+
 class TradingCalendar:
     """
     Classe para gerenciar calendário de negociação, incluindo feriados e dias úteis.
@@ -18,103 +98,210 @@ class TradingCalendar:
     e outros feriados específicos do mercado brasileiro.
     """
     
-    def __init__(self, market: str = 'B3'):
+    def __init__(self, market: str = 'B3', start_date: date = _BASE_DATE, years_ahead: int = 1):
         """
         Inicializa o calendário para um mercado específico.
         
         Args:
             market: Código do mercado (padrão: 'B3' para Bolsa de Valores do Brasil)
+            start_date: Primeiro dia coberto pelo calendário (padrão: 2000-01-01)
+            years_ahead: Anos à frente de hoje carregados na criação (padrão: 1). Consultas
+                além disso estendem o horizonte sob demanda, até _MAX_YEARS_AHEAD anos.
         """
         self.market = market
-        self._holidays: Set[date] = set()
+        self.years_ahead = years_ahead
+        # Máscara de dias não úteis indexada por ordinal (1 = sem pregão), de start_date
+        # até o fim do horizonte; fora dela vale apenas a regra de fim de semana
+        self._base_ord = start_date.toordinal()
+        self._mask = np.zeros(0, dtype=np.uint8)
+        self._mask_len = 0
+        self._max_ord = self._horizon_end_ord(_MAX_YEARS_AHEAD)
+        self._extend_lock = threading.Lock()
         self._load_holidays()
+        # Tabelas de salto: índice do pregão mais próximo antes/depois de cada dia
+        self._prev_idx, self._next_idx = self._jump_tables(self._mask)
+    
+    @staticmethod
+    def _horizon_end_ord(years_ahead: int) -> int:
+        """Ordinal de 31/12 do ano `years_ahead` anos à frente do atual.
+
+        Fechar o horizonte no fim do ano mantém a chave do cache em disco estável
+        ao longo do ano, em vez de mudar a cada dia.
+        """
+        return date(date.today().year + years_ahead, 12, 31).toordinal()
     
     def _load_holidays(self) -> None:
         """Carrega os feriados do mercado especificado."""
+        end_ord = self._horizon_end_ord(self.years_ahead)
+        cache_path = self._mask_cache_path(end_ord)
+        if self._load_cached_mask(cache_path):
+            return
         try:
-            # Usa o pandas_market_calendars para obter os feriados da B3
-            b3 = mcal.get_calendar('B3')
-            
-            # Obtém os feriados para os próximos 5 anos
-            end_date = (datetime.now() + timedelta(days=365*5)).strftime('%Y-%m-%d')
-            schedule = b3.schedule(start_date='2000-01-01', end_date=end_date)
-            
-            # Converte para um conjunto de datas
-            trading_days = set(schedule.index.date)
-            
-            # Gera todos os dias no período e marca os não-úteis como feriados
-            all_days = pd.date_range(start='2000-01-01', end=end_date).date
-            self._holidays = {
-                day for day in all_days 
-                if day.weekday() < 5 and  # Apenas dias da semana
-                day not in trading_days   # Que não são dias de negociação
-            }
-            
-            # Adiciona feriados móveis que possam ter sido perdidos
-            self._add_moving_holidays()
-            
-            logger.info(f"Calendário de negociação carregado com {len(self._holidays)} feriados/dias não úteis")
+            self._mask = self._schedule_mask(self._base_ord, end_ord)
+            self._mask_len = len(self._mask)
+            logger.info(f"Calendário de negociação carregado com {self._count_holidays()} feriados/dias não úteis")
+            self._save_cached_mask(cache_path)
             
         except Exception as e:
             logger.error(f"Erro ao carregar calendário de negociação: {e}")
             # Fallback para feriados fixos do Brasil em caso de erro
-            self._set_default_holidays()
+            self._mask = self._fallback_mask(self._base_ord, end_ord)
+            self._mask_len = len(self._mask)
     
-    def _add_moving_holidays(self) -> None:
-        """Adiciona feriados móveis que podem não estar no calendário da B3."""
-        current_year = datetime.now().year
-        years = range(current_year - 2, current_year + 3)  # +/- 2 anos do atual
+    def _schedule_mask(self, start_ord: int, end_ord: int) -> np.ndarray:
+        """Monta a máscara de [start_ord, end_ord] a partir dos pregões da B3."""
+        # Usa o pandas_market_calendars para obter os feriados da B3
+        b3 = mcal.get_calendar('B3')
+        schedule = b3.schedule(start_date=date.fromordinal(start_ord).isoformat(),
+                               end_date=date.fromordinal(end_ord).isoformat())
         
-        for year in years:
-            # Sexta-feira Santa (2 dias antes do Domingo de Páscoa)
-            easter_sunday = self._calculate_easter_sunday(year)
-            good_friday = easter_sunday - timedelta(days=2)
-            self._holidays.add(good_friday.date())
-            
-            # Corpus Christi (60 dias após a Páscoa)
-            corpus_christi = easter_sunday + timedelta(days=60)
-            self._holidays.add(corpus_christi.date())
+        # Ordinais dos pregões direto do índice, sem criar objetos date
+        index = schedule.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        ords = index.values.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORD
+        
+        # Tudo começa como não útil; só os pregões do calendário são liberados.
+        # Sexta-feira Santa e Corpus Christi já vêm como dias sem pregão no
+        # calendário B3 do pandas_market_calendars; só o fallback precisa deles
+        mask = np.ones(end_ord - start_ord + 1, dtype=np.uint8)
+        mask[ords - start_ord] = 0
+        return mask
+    
+    def _fallback_mask(self, start_ord: int, end_ord: int) -> np.ndarray:
+        """Monta a máscara de [start_ord, end_ord] só com fins de semana e feriados nacionais."""
+        ords = np.arange(start_ord, end_ord + 1, dtype=np.int64)
+        # date.toordinal() == 1 é uma segunda-feira, logo weekday = (ordinal + 6) % 7
+        mask = ((ords + 6) % 7 >= 5).astype(np.uint8)
+        years = np.arange(date.fromordinal(start_ord).year, date.fromordinal(end_ord).year + 1, dtype=np.int64)
+        holidays = np.concatenate([self._default_holiday_ordinals(years), self._moving_holiday_ordinals(years)])
+        offs = holidays - start_ord
+        mask[offs[(offs >= 0) & (offs < len(mask))]] = 1
+        return mask
+    
+    def _mask_cache_path(self, end_ord: int) -> Path:
+        """Caminho do arquivo .npy da máscara para o mercado e horizonte dados."""
+        start = date.fromordinal(self._base_ord).isoformat()
+        end = date.fromordinal(end_ord).isoformat()
+        raw = f"{self.market}:{start}:{end}:v{_MASK_CACHE_VERSION}"
+        key = hashlib.sha1(raw.encode()).hexdigest()[:16]
+        return _MASK_CACHE_DIR / f"{self._mask_cache_prefix()}{key}.npy"
+
+    def _mask_cache_prefix(self) -> str:
+        """Prefixo comum às máscaras deste mercado e data inicial (qualquer horizonte)."""
+        start = date.fromordinal(self._base_ord).strftime('%Y%m%d')
+        market = ''.join(c if c.isalnum() else '-' for c in self.market)
+        return f"calendar_{market}_{start}_"
+    
+    def _load_cached_mask(self, path: Path) -> bool:
+        """Mapeia em memória (somente leitura) a máscara salva; retorna False se não houver."""
+        try:
+            mask = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return False
+        if mask.dtype != np.uint8 or mask.ndim != 1:
+            return False
+        self._mask = mask
+        self._mask_len = len(mask)
+        logger.info(f"Calendário de negociação carregado do cache em disco: {path}")
+        return True
+    
+    def _save_cached_mask(self, path: Path) -> None:
+        """Salva a máscara em disco; falhas de escrita apenas desativam o cache."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escreve em arquivo temporário e renomeia, para que leitores concorrentes
+            # nunca vejam um arquivo parcial
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(self._mask))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o calendário em cache ({path}): {e}")
+            return
+        self._prune_cached_masks(path)
+
+    def _prune_cached_masks(self, keep: Path) -> None:
+        """Remove as máscaras mais antigas deste mercado, mantendo as `_MASK_CACHE_KEEP` mais recentes.
+
+        Outro processo pode usar um horizonte diferente e ainda precisar da sua
+        máscara; por isso as mais recentes (inclusive `keep`) nunca são apagadas.
+        """
+        cached = []
+        for other in keep.parent.glob(f"{self._mask_cache_prefix()}*.npy"):
+            if other.name == keep.name:
+                continue
+            try:
+                cached.append((other.stat().st_mtime, other))
+            except OSError:
+                pass
+        cached.sort(reverse=True)
+        for _, stale in cached[_MASK_CACHE_KEEP - 1:]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    
+    def _ensure_covers(self, ord_: int) -> bool:
+        """Estende a máscara para frente até cobrir `ord_`, se estiver dentro do limite.
+
+        A extensão é feita sob lock e publica as novas tabelas antes de `_mask_len`,
+        de modo que leitores concorrentes nunca indexem além dos arrays. Datas
+        anteriores a `start_date` não são estendidas.
+
+        Returns:
+            bool: True se `ord_` passou a estar coberto pela máscara.
+        """
+        if ord_ < self._base_ord or ord_ > self._max_ord:
+            return False
+        with self._extend_lock:
+            end_ord = self._base_ord + self._mask_len - 1
+            if ord_ <= end_ord:
+                return True
+            # Estende pelo menos um ano para amortizar consultas sequenciais
+            new_end = min(max(ord_, end_ord + 365), self._max_ord)
+            try:
+                ext = self._schedule_mask(end_ord + 1, new_end)
+            except Exception as e:
+                logger.warning(f"Erro ao estender calendário de negociação: {e}")
+                ext = self._fallback_mask(end_ord + 1, new_end)
+            mask = np.concatenate([np.asarray(self._mask), ext])
+            self._prev_idx, self._next_idx = self._jump_tables(mask)
+            self._mask = mask
+            self._mask_len = len(mask)
+        return True
     
     @staticmethod
-    def _calculate_easter_sunday(year: int) -> datetime:
-        """Calcula o Domingo de Páscoa usando o algoritmo de Meeus/Jones/Butcher."""
-        a = year % 19
-        b = year // 100
-        c = year % 100
-        d = b // 4
-        e = b % 4
-        f = (b + 8) // 25
-        g = (b - f + 1) // 3
-        h = (19 * a + b - d - g + 15) % 30
-        i = c // 4
-        k = c % 4
-        l = (32 + 2 * e + 2 * i - h - k) % 7
-        m = (a + 11 * h + 22 * l) // 451
-        month = (h + l - 7 * m + 114) // 31
-        day = ((h + l - 7 * m + 114) % 31) + 1
-        
-        return datetime(year, month, day)
+    def _moving_holiday_ordinals(years: np.ndarray) -> np.ndarray:
+        """Ordinais dos feriados móveis (Sexta-feira Santa e Corpus Christi) dos anos dados."""
+        easter = _easter_ordinals(years)
+        # Sexta-feira Santa (2 dias antes) e Corpus Christi (60 dias após a Páscoa)
+        return np.concatenate([easter - 2, easter + 60])
     
-    def _set_default_holidays(self) -> None:
-        """Define feriados fixos do Brasil como fallback."""
-        current_year = datetime.now().year
-        years = range(current_year - 2, current_year + 3)  # +/- 2 anos do atual
-        
-        for year in years:
-            # Feriados nacionais fixos
-            fixed_holidays = [
-                date(year, 1, 1),    # Ano Novo
-                date(year, 4, 21),   # Tiradentes
-                date(year, 5, 1),    # Dia do Trabalhador
-                date(year, 9, 7),    # Independência do Brasil
-                date(year, 10, 12),  # Nossa Senhora Aparecida
-                date(year, 11, 2),   # Finados
-                date(year, 11, 15),  # Proclamação da República
-                date(year, 12, 25),  # Natal
-            ]
-            
-            for holiday in fixed_holidays:
-                self._holidays.add(holiday)
+    @staticmethod
+    def _default_holiday_ordinals(years: np.ndarray) -> np.ndarray:
+        """Ordinais dos feriados fixos do Brasil (fallback) dos anos dados."""
+        return np.concatenate([_civil_ordinals(years, m, d) for m, d in _FIXED_HOLIDAYS])
+    
+    @staticmethod
+    def _jump_tables(mask: np.ndarray):
+        """Pré-calcula, para cada dia da máscara, o pregão anterior e o seguinte.
+
+        Retorna `(prev_idx, next_idx)`: `prev_idx[i]` é o índice do último pregão em ou
+        antes de i (-1 se não houver) e `next_idx[i]` o do primeiro pregão em ou depois
+        de i (`len(mask)` se não houver).
+        """
+        n = len(mask)
+        idx = np.arange(n, dtype=np.int32)
+        trading = np.asarray(mask) == 0
+        prev_idx = np.maximum.accumulate(np.where(trading, idx, -1)).astype(np.int32)
+        next_idx = np.minimum.accumulate(np.where(trading, idx, n)[::-1])[::-1].astype(np.int32)
+        return prev_idx, next_idx
+    
+    def _count_holidays(self) -> int:
+        """Conta os dias de semana sem pregão (feriados) na máscara."""
+        weekday = (np.arange(self._mask_len) + self._base_ord + 6) % 7
+        return int(np.count_nonzero(self._mask[weekday < 5]))
     
     def is_trading_day(self, date_obj: date) -> bool:
         """
@@ -126,15 +313,20 @@ class TradingCalendar:
         Returns:
             bool: True se for dia de negociação, False caso contrário
         """
-        if isinstance(date_obj, datetime):
-            date_obj = date_obj.date()
-            
-        # Verifica se é final de semana
-        if date_obj.weekday() >= 5:  # 5 = sábado, 6 = domingo
-            return False
+        # datetime herda de date, e toordinal() ignora o horário
+        return self._is_trading_ord(date_obj.toordinal())
+    
+    def _is_trading_ord(self, ord_: int) -> bool:
+        """Versão de `is_trading_day` que recebe o ordinal da data (caminho rápido)."""
+        o = ord_ - self._base_ord
+        if o >= self._mask_len:
+            self._ensure_covers(ord_)
+        if 0 <= o < self._mask_len:
+            # Fins de semana e feriados já estão marcados na máscara
+            return not self._mask[o]
             
-        # Verifica se é feriado
-        return date_obj not in self._holidays
+        # Fora do horizonte carregado, só fins de semana são excluídos
+        return (ord_ + 6) % 7 < 5  # weekday 5 = sábado, 6 = domingo
     
     def get_trading_days(self, start_date: date, end_date: date) -> List[date]:
         """
@@ -147,13 +339,63 @@ class TradingCalendar:
         Returns:
             List[date]: Lista de dias úteis no intervalo
         """
-        if isinstance(start_date, datetime):
-            start_date = start_date.date()
-        if isinstance(end_date, datetime):
-            end_date = end_date.date()
+        ords = self.get_trading_ordinals(start_date, end_date)
+        return [date.fromordinal(int(o)) for o in ords]
+    
+    def get_trading_ordinals(self, start_date: date, end_date: date) -> np.ndarray:
+        """
+        Retorna os ordinais (`date.toordinal()`) dos dias úteis entre duas datas.
+        
+        Evita criar um objeto `date` por dia; útil em caminhos críticos que só
+        precisam comparar ou indexar datas.
+        
+        Args:
+            start_date: Data inicial (inclusiva)
+            end_date: Data final (inclusiva)
+            
+        Returns:
+            np.ndarray: Ordinais (int64) dos dias úteis no intervalo, em ordem crescente
+        """
+        ords = np.arange(start_date.toordinal(), end_date.toordinal() + 1, dtype=np.int64)
+        return ords[self.is_trading_day_batch(ords)]
+    
+    def is_trading_day_batch(self, dates) -> np.ndarray:
+        """
+        Versão vetorizada de `is_trading_day` para muitas datas de uma vez.
+        
+        Args:
+            dates: Array `datetime64`, array de ordinais inteiros (`date.toordinal()`),
+                `DatetimeIndex` ou sequência de objetos date/datetime
             
-        all_days = pd.date_range(start=start_date, end=end_date).date
-        return [day for day in all_days if self.is_trading_day(day)]
+        Returns:
+            np.ndarray: Array booleano, True nos dias de negociação
+        """
+        ords = self._to_ordinals(dates)
+        if ords.size and ords.max() - self._base_ord >= self._mask_len:
+            self._ensure_covers(int(ords.max()))
+        offs = ords - self._base_ord
+        in_range = (offs >= 0) & (offs < self._mask_len)
+        # Fora do horizonte carregado, só fins de semana são excluídos
+        out = (ords + 6) % 7 < 5
+        out[in_range] = np.asarray(self._mask)[offs[in_range]] == 0
+        return out
+    
+    @staticmethod
+    def _to_ordinals(dates) -> np.ndarray:
+        """Converte datas em ordinais int64 (`date.toordinal()`)."""
+        if isinstance(dates, pd.DatetimeIndex):
+            if dates.tz is not None:
+                dates = dates.tz_localize(None)
+            dates = dates.values
+        arr = np.asarray(dates)
+        if np.issubdtype(arr.dtype, np.datetime64):
+            return arr.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORD
+        if np.issubdtype(arr.dtype, np.integer):
+            return arr.astype(np.int64, copy=False)
+        return np.fromiter(
+            (d.toordinal() for d in arr.ravel()),
+            dtype=np.int64, count=arr.size,
+        ).reshape(arr.shape)
     
     def get_previous_trading_day(self, date_obj: date) -> date:
         """
@@ -165,14 +407,18 @@ class TradingCalendar:
         Returns:
             date: Último dia útil anterior
         """
-        if isinstance(date_obj, datetime):
-            date_obj = date_obj.date()
+        ord_ = date_obj.toordinal() - 1
+        o = ord_ - self._base_ord
+        if o >= self._mask_len:
+            self._ensure_covers(ord_)
+        if 0 <= o < self._mask_len and self._prev_idx[o] >= 0:
+            return date.fromordinal(self._base_ord + int(self._prev_idx[o]))
             
-        prev_day = date_obj - timedelta(days=1)
-        while not self.is_trading_day(prev_day):
-            prev_day -= timedelta(days=1)
+        # Fora do horizonte carregado (ou antes do primeiro pregão)
+        while not self._is_trading_ord(ord_):
+            ord_ -= 1
             
-        return prev_day
+        return date.fromordinal(ord_)
     
     def get_next_trading_day(self, date_obj: date) -> date:
         """
@@ -184,17 +430,46 @@ class TradingCalendar:
         Returns:
             date: Próximo dia útil
         """
-        if isinstance(date_obj, datetime):
-            date_obj = date_obj.date()
+        ord_ = date_obj.toordinal() + 1
+        o = ord_ - self._base_ord
+        if o >= self._mask_len:
+            self._ensure_covers(ord_)
+        if 0 <= o < self._mask_len and self._next_idx[o] < self._mask_len:
+            return date.fromordinal(self._base_ord + int(self._next_idx[o]))
             
-        next_day = date_obj + timedelta(days=1)
-        while not self.is_trading_day(next_day):
-            next_day += timedelta(days=1)
+        # Fora do horizonte carregado (ou depois do último pregão)
+        while not self._is_trading_ord(ord_):
+            ord_ += 1
             
-        return next_day
+        return date.fromordinal(ord_)
+
+_instance: Optional[TradingCalendar] = None
+_instance_lock = threading.Lock()
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """Retorna a instância global do calendário, criando-a no primeiro uso."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = TradingCalendar()
+    return _instance
+
+
+class _LazyTradingCalendar:
+    """Encaminha os acessos para a instância global, criada só quando usada."""
+
+    def __getattr__(self, name):
+        return getattr(get_trading_calendar(), name)
+
+    def __repr__(self) -> str:
+        return f"<lazy {TradingCalendar.__name__} (carregado={_instance is not None})>"
+
 
 # Instância global para uso em todo o sistema
 # This global instance ensures that the trading calendar is initialized once
 # and can be reused across different parts of the application, avoiding
-# redundant loading of holiday data.
-trading_calendar = TradingCalendar()
+# redundant loading of holiday data. It is a lazy proxy, so importing the module
+# (or any package that re-exports it) does not build the calendar.
+trading_calendar = _LazyTradingCalendar()
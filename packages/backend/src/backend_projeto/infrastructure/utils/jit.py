@@ -0,0 +1,23 @@
+"""
+Optional Numba integration.
+
+Exposes `njit` and `prange` regardless of whether Numba is installed. When it is
+missing, `njit` becomes a no-op decorator and `prange` falls back to `range`, so
+kernels still run (as plain Python). Callers that have a faster NumPy path should
+check `NUMBA_AVAILABLE` and only dispatch to the kernels when it is True.
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Decorador substituto quando o Numba não está disponível."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
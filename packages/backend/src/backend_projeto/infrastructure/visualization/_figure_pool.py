@@ -0,0 +1,113 @@
+# infrastructure/visualization/_figure_pool.py
+# Pool de figuras Matplotlib e renderização PNG compartilhados pelos módulos de gráficos
+
+import io
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# DPI padrão dos PNGs renderizados por `_render_png` (suficiente para exibição web)
+_PNG_DPI = 100
+
+# Pool de figuras reutilizáveis por layout: chave -> lista de (figura, eixos, posições)
+_FIG_POOL: Dict[tuple, List[Tuple[Figure, object, list]]] = {}
+# Figuras emprestadas: figura -> (chave, entrada do pool)
+_FIG_LEASED: Dict[Figure, Tuple[tuple, Tuple[Figure, object, list]]] = {}
+_FIG_POOL_LOCK = threading.Lock()
+_FIG_POOL_MAX_PER_KEY = 4
+
+
+def _acquire_figure(key: tuple, figsize: tuple, build_axes: Callable[[Figure], object],
+                    layout: Optional[str] = None):
+    """Empresta uma figura (e seus eixos) do pool, criando-a se necessário.
+
+    As figuras são `Figure` com canvas Agg próprio, fora do gerenciador do pyplot.
+    Devolva-as com `_release_figure` (ou use `_pooled_figure`).
+
+    Retorna:
+        Tuple[Figure, Any]: A figura e os eixos criados por `build_axes`.
+    """
+    key = (tuple(figsize), layout) + key
+    with _FIG_POOL_LOCK:
+        bucket = _FIG_POOL.get(key)
+        entry = bucket.pop() if bucket else None
+    if entry is None:
+        fig = Figure(figsize=figsize, layout=layout)
+        FigureCanvasAgg(fig)
+        axes = build_axes(fig)
+        entry = (fig, axes, [ax.get_position(original=True) for ax in np.ravel(axes)])
+    with _FIG_POOL_LOCK:
+        _FIG_LEASED[entry[0]] = (key, entry)
+    return entry[0], entry[1]
+
+
+def _release_figure(fig: Figure) -> bool:
+    """Limpa uma figura emprestada por `_acquire_figure` e a devolve ao pool.
+
+    Os eixos voltam ao estado de figura nova (conteúdo, tick_params, locator de
+    colorbar e posição de partida do layout). Figuras que ganharam eixos extras,
+    como colorbars com eixo próprio, são descartadas em vez de desfeitas.
+
+    Retorna:
+        bool: False se a figura não veio do pool.
+    """
+    with _FIG_POOL_LOCK:
+        leased = _FIG_LEASED.pop(fig, None)
+    if leased is None:
+        return False
+    key, entry = leased
+    base = list(np.ravel(entry[1]))
+    if any(ax not in base for ax in fig.axes):
+        return True
+    for ax, pos in zip(base, entry[2]):
+        ax.tick_params(which='both', reset=True)
+        ax.cla()
+        # Uma colorbar desenhada em um eixo do pool (cax=...) instala o próprio locator
+        # por cima do anterior; sem removê-lo, cada uso aninharia mais um
+        ax.set_axes_locator(None)
+        ax.set_navigate(True)
+        # set_position tira o eixo do layout automático; ele volta a participar
+        ax.set_position(pos)
+        ax.set_in_layout(True)
+    if fig.get_suptitle():
+        fig.suptitle('')
+    with _FIG_POOL_LOCK:
+        bucket = _FIG_POOL.setdefault(key, [])
+        if len(bucket) < _FIG_POOL_MAX_PER_KEY:
+            bucket.append(entry)
+    return True
+
+
+@contextmanager
+def _pooled_figure(key: tuple, figsize: tuple, build_axes: Callable[[Figure], tuple]):
+    """Versão em contexto de `_acquire_figure`/`_release_figure`.
+
+    Evita recriar figura, eixos e transformações a cada requisição.
+    """
+    fig, axes = _acquire_figure(key, figsize, build_axes)
+    try:
+        yield fig, axes
+    finally:
+        _release_figure(fig)
+
+
+def _render_png(fig, dpi: int = _PNG_DPI) -> bytes:
+    """Renderiza a figura direto pelo canvas Agg e retorna os bytes do PNG.
+
+    Evita o `bbox_inches='tight'`, que faz uma segunda renderização completa;
+    o layout deve ser fixado antes com `fig.subplots_adjust`.
+    """
+    fig.set_dpi(dpi)
+    buf = io.BytesIO()
+    fig.canvas.print_png(buf)
+    return buf.getvalue()
+
+
+def _single_axes(fig: Figure) -> tuple:
+    return (fig.add_subplot(),)
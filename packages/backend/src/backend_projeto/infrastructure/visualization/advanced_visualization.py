@@ -2,71 +2,552 @@
 # Sistema avançado de visualização financeira
 
 import io
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
 import seaborn as sns
-from typing import List, Optional, Dict, Tuple, Any
+from typing import Callable, List, Optional, Dict, Tuple, Any
 from datetime import datetime, timedelta
 import warnings
 import logging
+
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit, prange
+from backend_projeto.infrastructure.visualization._figure_pool import _acquire_figure, _release_figure
 warnings.filterwarnings('ignore')
 
 # Configurar estilo
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
+# Máximo de PNGs mantidos no cache em memória do AdvancedVisualizer
+_PNG_CACHE_MAX = 64
+
+# Máximo de matrizes de correlação mantidas em cache (FIFO)
+_CORR_CACHE_MAX = 8
+
+# A partir deste número de linhas as janelas rolantes usam o engine Numba do pandas;
+# abaixo disso a compilação (alguns segundos, uma vez por processo) não se paga
+_NUMBA_ROLLING_MIN_ROWS = 500_000
+
+# DPI padrão dos PNGs gerados: o Agg é O(pixels), e o dashboard de 20×16 pol. já sai
+# com 2000×1600 px, suficiente para exibição web
+_DEFAULT_DPI = 100
+
+# Acima deste número de ativos a matriz de correlação do dashboard não é anotada
+_CORR_ANNOT_MAX_ASSETS = 15
+
+def _fingerprint(h, obj: Any) -> None:
+    """Alimenta o hash `h` com o conteúdo de `obj` (DataFrames, Series, arrays e escalares).
+
+    Parâmetros:
+        h: Objeto hashlib incremental.
+        obj (Any): Argumento de um método de plotagem.
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(obj.shape).encode())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        # Hash vetorizado por linha (valores + índice) do próprio pandas
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=repr):
+            _fingerprint(h, k)
+            _fingerprint(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _fingerprint(h, item)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode())
+    h.update(b"|")
+
+
+def _cached_png(method: Callable[..., bytes]) -> Callable[..., bytes]:
+    """Decorador que guarda o PNG de um método de plotagem pelo conteúdo dos argumentos.
+
+    Chamadas repetidas com os mesmos dados (ex.: refresh do dashboard) devolvem os
+    bytes já renderizados sem construir nenhuma figura do Matplotlib. Como a chave
+    vem do conteúdo, um DataFrame alterado pelo chamador gera uma chave nova.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        h = hashlib.blake2b(digest_size=16)
+        _fingerprint(h, (method.__name__, self.style, self.figsize, self.default_dpi,
+                         self.compress_level, args, kwargs))
+        key = h.hexdigest()
+        cls = type(self)
+        with cls._png_cache_lock:
+            png = cls._png_cache.get(key)
+            if png is not None:
+                cls._png_cache.move_to_end(key)
+                return png
+        png = method(self, *args, **kwargs)
+        with cls._png_cache_lock:
+            cls._png_cache[key] = png
+            cls._png_cache.move_to_end(key)
+            while len(cls._png_cache) > _PNG_CACHE_MAX:
+                cls._png_cache.popitem(last=False)
+        return png
+    return wrapper
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _simulate_portfolios(mean_returns, cov, uniforms):
+    """Normaliza pesos aleatórios em carteiras e calcula retorno, volatilidade e Sharpe.
+
+    Os sorteios chegam prontos em `uniforms` (um gerador com semente fora do kernel),
+    para o resultado não depender de quantas threads o `prange` usar.
+
+    Parâmetros:
+        mean_returns (np.ndarray): Retornos médios anualizados (K,).
+        cov (np.ndarray): Covariância anualizada K×K.
+        uniforms (np.ndarray): Sorteios U(0, 1) de forma (n, K).
+
+    Retorna:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Retornos, volatilidades,
+        Sharpes e pesos (n, K).
+    """
+    n, k = uniforms.shape
+    rets = np.empty(n)
+    vols = np.empty(n)
+    sharpes = np.empty(n)
+    weights = np.empty((n, k))
+    for p in prange(n):
+        w = weights[p]
+        tot = 0.0
+        for j in range(k):
+            tot += uniforms[p, j]
+        r = 0.0
+        for j in range(k):
+            w[j] = uniforms[p, j] / tot
+            r += w[j] * mean_returns[j]
+        var = 0.0
+        for i in range(k):
+            acc = 0.0
+            for j in range(k):
+                acc += cov[i, j] * w[j]
+            var += w[i] * acc
+        v = np.sqrt(var)
+        rets[p] = r
+        vols[p] = v
+        sharpes[p] = r / v
+    return rets, vols, sharpes, weights
+
+
+def _simulate_portfolios_numpy(mean_returns: np.ndarray, cov: np.ndarray, uniforms: np.ndarray):
+    """Versão NumPy vetorizada de `_simulate_portfolios`, usada quando o Numba não está disponível."""
+    weights = uniforms / uniforms.sum(axis=1, keepdims=True)
+    rets = weights @ mean_returns
+    vols = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    return rets, vols, rets / vols, weights
+
+
+@njit(cache=True)
+def _drawdown_1pass(ret):
+    """Drawdown e drawdown máximo de uma série de retornos em uma única passada.
+
+    Mesma convenção de `cum / cum.cummax() - 1` no pandas: o pico parte do primeiro
+    acumulado e retornos NaN são pulados (drawdown NaN na posição, acumulado
+    inalterado). Sem fastmath, que removeria o teste de NaN.
+
+    Parâmetros:
+        ret (np.ndarray): Retornos simples (float64).
+
+    Retorna:
+        Tuple[np.ndarray, float]: Série de drawdowns e o drawdown máximo (<= 0).
+    """
+    n = ret.size
+    c = 1.0
+    peak = 0.0
+    mx = 0.0
+    dd = np.empty(n)
+    for i in range(n):
+        r = ret[i]
+        if r != r:
+            dd[i] = np.nan
+            continue
+        c *= 1.0 + r
+        if c > peak:
+            peak = c
+        d = c / peak - 1.0
+        dd[i] = d
+        if d < mx:
+            mx = d
+    return dd, mx
+
+
+def _drawdown_numpy(ret: np.ndarray):
+    """Versão NumPy de `_drawdown_1pass`, usada quando o Numba não está disponível."""
+    valid = ~np.isnan(ret)
+    cum = np.cumprod(np.where(valid, 1.0 + ret, 1.0))
+    cum[~valid] = np.nan
+    # fmax ignora os NaN, então o pico só considera posições válidas
+    dd = cum / np.fmax.accumulate(cum) - 1.0
+    return dd, float(min(dd[valid].min(), 0.0)) if valid.any() else 0.0
+
+
+def _drawdown(ret: np.ndarray):
+    """Drawdowns e drawdown máximo de um vetor de retornos (kernel Numba ou NumPy)."""
+    ret = np.ascontiguousarray(ret, dtype=np.float64)
+    return _drawdown_1pass(ret) if NUMBA_AVAILABLE else _drawdown_numpy(ret)
+
+
+def _drawdown_frame(returns: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """Aplica `_drawdown` por coluna e devolve (drawdowns, drawdown máximo por coluna)."""
+    values = returns.to_numpy(dtype=float)
+    dd = np.empty_like(values)
+    max_dd = np.empty(values.shape[1])
+    for j in range(values.shape[1]):
+        dd[:, j], max_dd[j] = _drawdown(values[:, j])
+    return (pd.DataFrame(dd, index=returns.index, columns=returns.columns),
+            pd.Series(max_dd, index=returns.columns))
+
+
+@njit(cache=True)
+def _rolling_corr_1pass(x, y, window):
+    """Correlação de Pearson rolante em O(N) com somas acumuladas (x, y, x², y², xy).
+
+    Cada passo soma o ponto que entra e subtrai o que sai da janela. Como no
+    `rolling(window).corr` do pandas, uma janela com algum par NaN vale NaN. Sem
+    fastmath, que removeria os testes de NaN.
+
+    Parâmetros:
+        x (np.ndarray): Primeira série (float64, de preferência centrada).
+        y (np.ndarray): Segunda série, alinhada a `x`.
+        window (int): Tamanho da janela.
+
+    Retorna:
+        np.ndarray: Correlações (NaN nas primeiras `window - 1` posições).
+    """
+    n = x.size
+    out = np.full(n, np.nan)
+    sx = sy = sxx = syy = sxy = 0.0
+    bad = 0
+    for i in range(n):
+        xi, yi = x[i], y[i]
+        if xi != xi or yi != yi:
+            bad += 1
+        else:
+            sx += xi
+            sy += yi
+            sxx += xi * xi
+            syy += yi * yi
+            sxy += xi * yi
+        if i >= window:
+            xj, yj = x[i - window], y[i - window]
+            if xj != xj or yj != yj:
+                bad -= 1
+            else:
+                sx -= xj
+                sy -= yj
+                sxx -= xj * xj
+                syy -= yj * yj
+                sxy -= xj * yj
+        if i >= window - 1 and bad == 0:
+            den = (window * sxx - sx * sx) * (window * syy - sy * sy)
+            if den > 0.0:
+                out[i] = (window * sxy - sx * sy) / np.sqrt(den)
+    return out
+
+
+def _rolling_corr(a: pd.Series, b: pd.Series, window: int) -> pd.Series:
+    """`a.rolling(window).corr(b)`, pelo kernel Numba quando disponível.
+
+    As séries são centradas antes do kernel: retornos diários têm média pequena, mas
+    isso reduz o cancelamento nas somas x² e xy acumuladas ao longo da série.
+    """
+    if not NUMBA_AVAILABLE:
+        return a.rolling(window=window).corr(b)
+    a, b = a.align(b)
+    x = a.to_numpy(dtype=float)
+    y = b.to_numpy(dtype=float)
+    x = np.ascontiguousarray(x - np.nanmean(x)) if len(x) else x
+    y = np.ascontiguousarray(y - np.nanmean(y)) if len(y) else y
+    return pd.Series(_rolling_corr_1pass(x, y, window), index=a.index)
+
+
+def _risk_metric_columns(returns: pd.DataFrame,
+                         max_drawdowns: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Volatilidade, Sharpe, drawdown máximo e VaR 95% de cada coluna, sem passar por dicts por ativo.
+
+    Cada métrica é uma única redução sobre o bloco inteiro; NaN são ignorados por
+    coluna, como no `dropna()` por ativo.
+
+    Parâmetros:
+        returns (pd.DataFrame): Retornos diários, um ativo por coluna.
+        max_drawdowns (Optional[np.ndarray]): Drawdowns máximos já calculados (evita
+            uma segunda passada quando o chamador também plota os drawdowns).
+
+    Retorna:
+        Dict[str, np.ndarray]: Arrays alinhados às colunas de `returns`.
+    """
+    std = returns.std().to_numpy()
+    if max_drawdowns is None:
+        max_drawdowns = _drawdown_frame(returns)[1].to_numpy()
+    return {
+        'Volatility': std * np.sqrt(252),
+        'Sharpe': returns.mean().to_numpy() / std * np.sqrt(252),
+        'Max DD': max_drawdowns,
+        'VaR 95%': returns.quantile(0.05).to_numpy(),
+    }
+
+
+def _rolling_engine(n_rows: int) -> str:
+    """Escolhe o engine das agregações rolantes do pandas pelo tamanho da série."""
+    return 'numba' if NUMBA_AVAILABLE and n_rows >= _NUMBA_ROLLING_MIN_ROWS else 'cython'
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Seleciona `n_out` pontos de (x, y) pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto; em cada bucket intermediário escolhe o ponto
+    que forma o maior triângulo com o ponto já escolhido e a média do próximo bucket,
+    preservando picos e vales visíveis.
+
+    Parâmetros:
+        x (np.ndarray): Abscissas crescentes (float).
+        y (np.ndarray): Ordenadas (float, sem NaN).
+        n_out (int): Número de pontos desejado (>= 3).
+
+    Retorna:
+        np.ndarray: Índices dos pontos escolhidos, em ordem crescente.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bordas dos n_out - 2 buckets internos (o primeiro e o último ponto ficam fora)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Média do bucket seguinte (ou o último ponto, no bucket final)
+        nlo, nhi = hi, (edges[b + 2] if b + 2 < len(edges) else n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[b + 1] = a
+    return idx
+
+
+def _dashboard_axes(fig: Figure) -> Tuple[Any, ...]:
+    """Cria os 7 painéis do dashboard completo na grade 4×4 de `fig`."""
+    gs = fig.add_gridspec(4, 4, hspace=0.05, wspace=0.05)
+    return tuple(fig.add_subplot(gs[cell]) for cell in (
+        (0, slice(None, 2)), (0, slice(2, None)),
+        (1, slice(None, 2)), (1, slice(2, None)),
+        (2, slice(None, 2)), (2, slice(2, None)),
+        (3, slice(None)),
+    ))
+
+
 class AdvancedVisualizer:
     """Sistema avançado de visualização financeira com múltiplos tipos de gráficos."""
     
-    def __init__(self, style: str = 'seaborn-v0_8', figsize: Tuple[int, int] = (12, 8)):
+    # Cache LRU de PNGs compartilhado entre instâncias (os endpoints criam uma por requisição)
+    _png_cache: "OrderedDict[str, bytes]" = OrderedDict()
+    _png_cache_lock = threading.Lock()
+    # Matrizes de correlação por conteúdo dos retornos, reaproveitadas entre gráficos
+    _corr_cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+    _corr_cache_lock = threading.Lock()
+    # Maior PNG já gerado: o buffer de saída é pré-alocado com esse tamanho
+    _buf_hint = 256 * 1024
+    
+    def __init__(self, style: str = 'seaborn-v0_8', figsize: Tuple[int, int] = (12, 8),
+                 compress_level: int = 3, dpi: int = _DEFAULT_DPI):
+        """
+        Args:
+            style (str): Estilo do Matplotlib.
+            figsize (Tuple[int, int]): Tamanho padrão das figuras.
+            compress_level (int): Nível zlib do PNG (0-9). Gráficos têm grandes áreas de cor
+                sólida, então níveis baixos codificam bem mais rápido com quase o mesmo tamanho;
+                use 6+ para exportação.
+            dpi (int): Resolução padrão dos PNGs. 100 basta para a web; aumente para impressão.
+        """
         self.style = style
         self.figsize = figsize
+        self.compress_level = compress_level
+        self.default_dpi = dpi
+        # Buffer de saída reaproveitado entre os gráficos desta instância
+        self._buf = io.BytesIO()
         plt.style.use(style)
         
-    def _save_plot(self, fig, dpi: int = 150) -> bytes:
-        """Salva figura como bytes PNG."""
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png", dpi=dpi, bbox_inches='tight', 
-                   facecolor='white', edgecolor='none')
+    def _save_plot(self, fig, dpi: Optional[int] = None) -> bytes:
+        """Salva figura como bytes PNG (no `default_dpi` da instância, salvo `dpi` explícito)."""
+        dpi = dpi or self.default_dpi
+        buf = self._buf
+        if len(buf.getbuffer()) < self._buf_hint:
+            # Pré-aloca de uma vez para o libpng não crescer o buffer a cada bloco
+            buf.seek(self._buf_hint - 1)
+            buf.write(b'\0')
         buf.seek(0)
-        plt.close(fig)
-        return buf.read()
+        # Sem bbox_inches='tight': o layout já vem do constrained_layout, e o recorte
+        # exigiria uma renderização extra só para medir as caixas dos artistas
+        fig.savefig(buf, format="png", dpi=dpi,
+                   facecolor='white', edgecolor='none',
+                   pil_kwargs={'compress_level': self.compress_level, 'optimize': False})
+        self._release_fig(fig)
+        size = buf.tell()
+        type(self)._buf_hint = max(self._buf_hint, size)
+        with buf.getbuffer() as view:
+            return bytes(view[:size])
+    
+    def _acquire_fig(self, nrows: int = 1, ncols: int = 1, figsize: Optional[Tuple[float, float]] = None,
+                     build: Optional[Callable[[Figure], Any]] = None, **kwargs):
+        """Retorna (fig, axes) como `plt.subplots`, reaproveitando uma figura do pool compartilhado.
+
+        As figuras usam constrained_layout e voltam ao pool em `_release_fig`. `build`
+        substitui `fig.subplots` para layouts em grade (ex.: o dashboard).
+        """
+        key = (self.style, nrows, ncols, build, repr(sorted(kwargs.items())))
+        if build is None:
+            def build(fig):
+                return fig.subplots(nrows, ncols, **kwargs)
+        return _acquire_figure(key, tuple(figsize or self.figsize), build, layout='constrained')
+    
+    def _release_fig(self, fig) -> None:
+        """Devolve a figura ao pool (figuras de fora do pool são só fechadas)."""
+        if not _release_figure(fig):
+            plt.close(fig)
+    
+    def _xy(self, fig, series: pd.Series) -> Tuple[Any, np.ndarray]:
+        """Retorna (x, y) da série para plotar, reduzida por LTTB quando é mais longa que a largura em pixels.
+
+        O alvo é 2 pontos por pixel horizontal da figura no DPI de saída: visualmente
+        idêntico, mas o Agg desenha O(pixels) segmentos em vez de O(N).
+        """
+        target = int(fig.get_size_inches()[0] * self.default_dpi * 2)
+        if len(series) <= target:
+            return series.index, series.values
+        series = series.dropna()
+        keep = _lttb_indices(self._x_numeric(series.index), series.to_numpy(dtype=float), target)
+        return series.index[keep], series.values[keep]
+    
+    def _xy_frame(self, fig, frame: pd.DataFrame) -> Tuple[Any, np.ndarray]:
+        """Versão de `_xy` para várias colunas plotadas juntas (`ax.plot(x, Y)` com Y 2-D).
+
+        As linhas compartilham o eixo x, então os pontos mantidos são a união dos
+        escolhidos pelo LTTB em cada coluna; NaN ficam no lugar e interrompem a linha.
+        """
+        target = int(fig.get_size_inches()[0] * self.default_dpi * 2)
+        if len(frame) <= target:
+            return frame.index, frame.to_numpy(dtype=float)
+        x = self._x_numeric(frame.index)
+        values = frame.to_numpy(dtype=float)
+        keep = []
+        for j in range(values.shape[1]):
+            valid = np.flatnonzero(~np.isnan(values[:, j]))
+            keep.append(valid[_lttb_indices(x[valid], values[valid, j], target)])
+        keep = np.unique(np.concatenate(keep))
+        return frame.index[keep], values[keep]
+    
+    @staticmethod
+    def _x_numeric(index: pd.Index) -> np.ndarray:
+        """Converte o índice em abscissas float (datas viram números do Matplotlib)."""
+        x = mdates.date2num(index) if isinstance(index, pd.DatetimeIndex) else index
+        return np.asarray(x, dtype=float)
+    
+    def _corr(self, data: pd.DataFrame) -> pd.DataFrame:
+        """`data.corr()` com cache pelo conteúdo de `data`.
+
+        O heatmap e o dashboard costumam receber os mesmos retornos; o hash é O(N·K),
+        enquanto a correlação é O(N·K²). A matriz devolvida é compartilhada e não deve
+        ser alterada pelo chamador.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        _fingerprint(h, data)
+        key = h.hexdigest()
+        cls = type(self)
+        with cls._corr_cache_lock:
+            corr = cls._corr_cache.get(key)
+        if corr is None:
+            corr = data.corr()
+            with cls._corr_cache_lock:
+                cls._corr_cache[key] = corr
+                while len(cls._corr_cache) > _CORR_CACHE_MAX:
+                    cls._corr_cache.popitem(last=False)
+        return corr
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Descarta todos os PNGs e matrizes de correlação em cache."""
+        with cls._png_cache_lock:
+            cls._png_cache.clear()
+        with cls._corr_cache_lock:
+            cls._corr_cache.clear()
     
     # ==================== GRÁFICOS DE PREÇOS ====================
     
+    @_cached_png
     def plot_candlestick(self, prices: pd.DataFrame, asset: str, 
-                        volume: Optional[pd.Series] = None) -> bytes:
-        """Gráfico de candlestick com volume."""
+                        volume: Optional[pd.Series] = None, simulate: bool = False) -> bytes:
+        """Gráfico de candlestick com volume.
+
+        Se `prices` só tem fechamentos, `simulate=True` aproxima o OHLC a partir deles
+        (abertura = fechamento anterior, sombras com ruído de semente fixa) e o volume
+        ausente vira uma barra constante; sem `simulate`, exige colunas OHLC reais.
+        """
         if asset not in prices.columns:
             raise ValueError(f"Ativo '{asset}' não encontrado")
         
         # Simular OHLC se só tivermos Close
         if 'Open' not in prices.columns:
-            # Usar close como aproximação
-            ohlc = prices[[asset]].copy()
-            ohlc['Open'] = ohlc[asset].shift(1).fillna(ohlc[asset])
-            ohlc['High'] = ohlc[asset] * (1 + np.random.normal(0, 0.01, len(ohlc)))
-            ohlc['Low'] = ohlc[asset] * (1 - np.random.normal(0, 0.01, len(ohlc)))
-            ohlc['Close'] = ohlc[asset]
+            if not simulate:
+                raise ValueError("Dados OHLC (Open/High/Low/Close) ausentes; use simulate=True para aproximá-los pelo fechamento")
+            # Usar close como aproximação; semente fixa para o gráfico ser reproduzível
+            close = prices[asset].to_numpy(dtype=float)
+            opens = np.concatenate([close[:1], close[:-1]])
+            noise = np.abs(np.random.default_rng(0).normal(0, 0.01, (2, len(close))))
+            ohlc = pd.DataFrame({
+                'Open': opens,
+                'High': np.maximum(opens, close) * (1 + noise[0]),
+                'Low': np.minimum(opens, close) * (1 - noise[1]),
+                'Close': close,
+            }, index=prices.index)
         else:
             ohlc = prices[['Open', 'High', 'Low', 'Close']]
         
-        fig, axes = plt.subplots(2, 1, figsize=(14, 10), 
+        fig, axes = self._acquire_fig(2, 1, figsize=(14, 10), 
                                 gridspec_kw={'height_ratios': [3, 1]})
         
-        # Candlestick
+        # Candlestick: todas as velas e pavios em duas coleções, sem um Artist por dia
         ax1 = axes[0]
-        for i, (date, row) in enumerate(ohlc.iterrows()):
-            color = 'green' if row['Close'] >= row['Open'] else 'red'
-            # Corpo da vela
-            ax1.bar(date, row['Close'] - row['Open'], bottom=row['Open'], 
-                   color=color, alpha=0.7, width=0.8)
-            # Pavios
-            ax1.plot([date, date], [row['Low'], row['High']], color='black', linewidth=1)
+        opens = ohlc['Open'].to_numpy(dtype=float)
+        closes = ohlc['Close'].to_numpy(dtype=float)
+        highs = ohlc['High'].to_numpy(dtype=float)
+        lows = ohlc['Low'].to_numpy(dtype=float)
+        dates = mdates.date2num(ohlc.index)
+        half = 0.4
+        # Corpo da vela: retângulos (N, 4, 2)
+        verts = np.stack([
+            np.column_stack([dates - half, opens]),
+            np.column_stack([dates - half, closes]),
+            np.column_stack([dates + half, closes]),
+            np.column_stack([dates + half, opens]),
+        ], axis=1)
+        colors = np.where(closes >= opens, 'green', 'red')
+        # Pavios: segmentos (N, 2, 2) de Low a High
+        wicks = np.stack([np.column_stack([dates, lows]), np.column_stack([dates, highs])], axis=1)
+        ax1.add_collection(LineCollection(wicks, colors='black', linewidths=1))
+        ax1.add_collection(PolyCollection(verts, facecolors=colors, edgecolors=colors, alpha=0.7))
+        ax1.xaxis_date()
+        ax1.autoscale_view()
         
         ax1.set_title(f'{asset} - Candlestick Chart', fontsize=16, fontweight='bold')
         ax1.set_ylabel('Preço', fontsize=12)
@@ -77,8 +558,8 @@ class AdvancedVisualizer:
         if volume is not None:
             ax2.bar(volume.index, volume.values, alpha=0.6, color='blue')
         else:
-            # Volume simulado
-            vol_sim = np.random.exponential(1000000, len(ohlc))
+            # Sem volume informado: barra constante, sem sorteio
+            vol_sim = np.full(len(ohlc), np.nanmean(ohlc['Close'].to_numpy(dtype=float)) * 1000)
             ax2.bar(ohlc.index, vol_sim, alpha=0.6, color='blue')
         
         ax2.set_ylabel('Volume', fontsize=12)
@@ -92,25 +573,22 @@ class AdvancedVisualizer:
         
         return self._save_plot(fig)
     
+    @_cached_png
     def plot_price_comparison(self, prices: pd.DataFrame, assets: List[str], 
                             normalize: bool = True) -> bytes:
         """Comparação de preços de múltiplos ativos."""
-        fig, ax = plt.subplots(figsize=(14, 8))
-        
+        fig, ax = self._acquire_fig(figsize=(14, 8))
+        
+        # Todas as colunas em uma única chamada ax.plot(x, Y) com Y 2-D
+        cols = [asset for asset in assets if asset in prices.columns]
+        data = prices[cols]
+        if normalize:
+            # Normalizar para base 100 (primeiro preço válido de cada ativo)
+            data = data / data.bfill().iloc[0] * 100
+        labels = [f"{asset} (Normalizado)" if normalize else asset for asset in cols]
         colors = plt.cm.Set3(np.linspace(0, 1, len(assets)))
-        
-        for i, asset in enumerate(assets):
-            if asset in prices.columns:
-                series = prices[asset].dropna()
-                if normalize:
-                    # Normalizar para base 100
-                    series = (series / series.iloc[0]) * 100
-                    label = f"{asset} (Normalizado)"
-                else:
-                    label = asset
-                
-                ax.plot(series.index, series.values, label=label, 
-                       linewidth=2, color=colors[i], alpha=0.8)
+        ax.set_prop_cycle(color=[c for c, asset in zip(colors, assets) if asset in prices.columns])
+        ax.plot(*self._xy_frame(fig, data), label=labels, linewidth=2, alpha=0.8)
         
         ax.set_title('Comparação de Preços', fontsize=16, fontweight='bold')
         ax.set_ylabel('Preço' + (' (Base 100)' if normalize else ''), fontsize=12)
@@ -127,15 +605,16 @@ class AdvancedVisualizer:
     
     # ==================== GRÁFICOS DE RISCO ====================
     
+    @_cached_png
     def plot_var_evolution(self, returns: pd.Series, var_values: pd.Series, 
                           alpha: float = 0.95) -> bytes:
         """Evolução do VaR ao longo do tempo."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), 
+        fig, (ax1, ax2) = self._acquire_fig(2, 1, figsize=(14, 10), 
                                       gridspec_kw={'height_ratios': [2, 1]})
         
         # Retornos
-        ax1.plot(returns.index, returns.values, alpha=0.7, color='blue', linewidth=1)
-        ax1.fill_between(returns.index, -var_values.values, 0, 
+        ax1.plot(*self._xy(fig, returns), alpha=0.7, color='blue', linewidth=1)
+        ax1.fill_between(*self._xy(fig, pd.Series(-var_values.values, index=returns.index)), 0, 
                         alpha=0.3, color='red', label=f'VaR {alpha*100}%')
         ax1.axhline(0, color='black', linestyle='--', alpha=0.5)
         ax1.set_title(f'Evolução do VaR {alpha*100}%', fontsize=16, fontweight='bold')
@@ -144,27 +623,28 @@ class AdvancedVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # VaR
-        ax2.plot(var_values.index, var_values.values, color='red', linewidth=2)
+        ax2.plot(*self._xy(fig, var_values), color='red', linewidth=2)
         ax2.set_ylabel('VaR', fontsize=12)
         ax2.set_xlabel('Data', fontsize=12)
         ax2.grid(True, alpha=0.3)
         
         return self._save_plot(fig)
     
+    @_cached_png
     def plot_drawdown(self, returns: pd.Series, title: str = "Drawdown Analysis") -> bytes:
         """Análise de drawdown."""
         # Calcular drawdown
         cumulative = (1 + returns).cumprod()
-        running_max = cumulative.expanding().max()
+        running_max = cumulative.cummax()
         drawdown = (cumulative / running_max) - 1
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), 
+        fig, (ax1, ax2) = self._acquire_fig(2, 1, figsize=(14, 10), 
                                       gridspec_kw={'height_ratios': [2, 1]})
         
         # Performance
-        ax1.plot(cumulative.index, cumulative.values, label='Cumulative Return', 
+        ax1.plot(*self._xy(fig, cumulative), label='Cumulative Return', 
                 linewidth=2, color='blue')
-        ax1.plot(running_max.index, running_max.values, label='Peak', 
+        ax1.plot(*self._xy(fig, running_max), label='Peak', 
                 linewidth=2, color='green', linestyle='--')
         ax1.set_title('Performance e Drawdown', fontsize=16, fontweight='bold')
         ax1.set_ylabel('Cumulative Return', fontsize=12)
@@ -172,8 +652,8 @@ class AdvancedVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # Drawdown
-        ax2.fill_between(drawdown.index, drawdown.values, 0, 
-                        alpha=0.7, color='red', label='Drawdown')
+        ax2.fill_between(*self._xy(fig, drawdown), 0, 
+                        alpha=0.7, color='red', label='Drawdown', rasterized=True)
         ax2.set_ylabel('Drawdown', fontsize=12)
         ax2.set_xlabel('Data', fontsize=12)
         ax2.legend()
@@ -187,44 +667,35 @@ class AdvancedVisualizer:
         
         return self._save_plot(fig)
     
+    @_cached_png
     def plot_risk_metrics(self, returns: pd.DataFrame, assets: List[str]) -> bytes:
         """Métricas de risco comparativas."""
-        metrics = {}
-        for asset in assets:
-            if asset in returns.columns:
-                ret = returns[asset].dropna()
-                metrics[asset] = {
-                    'Volatility': ret.std() * np.sqrt(252),
-                    'Sharpe': ret.mean() / ret.std() * np.sqrt(252),
-                    'Max DD': ((1 + ret).cumprod() / (1 + ret).cumprod().expanding().max() - 1).min(),
-                    'VaR 95%': ret.quantile(0.05)
-                }
-        
-        df_metrics = pd.DataFrame(metrics).T
+        cols = [asset for asset in assets if asset in returns.columns]
+        metrics = _risk_metric_columns(returns[cols])
         
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig, axes = self._acquire_fig(2, 2, figsize=(16, 12))
         fig.suptitle('Métricas de Risco Comparativas', fontsize=16, fontweight='bold')
         
         # Volatilidade
-        axes[0,0].bar(df_metrics.index, df_metrics['Volatility'], color='skyblue')
+        axes[0,0].bar(cols, metrics['Volatility'], color='skyblue')
         axes[0,0].set_title('Volatilidade Anualizada')
         axes[0,0].set_ylabel('Volatilidade')
         axes[0,0].tick_params(axis='x', rotation=45)
         
         # Sharpe Ratio
-        axes[0,1].bar(df_metrics.index, df_metrics['Sharpe'], color='lightgreen')
+        axes[0,1].bar(cols, metrics['Sharpe'], color='lightgreen')
         axes[0,1].set_title('Sharpe Ratio')
         axes[0,1].set_ylabel('Sharpe Ratio')
         axes[0,1].tick_params(axis='x', rotation=45)
         
         # Max Drawdown
-        axes[1,0].bar(df_metrics.index, df_metrics['Max DD'], color='salmon')
+        axes[1,0].bar(cols, metrics['Max DD'], color='salmon')
         axes[1,0].set_title('Maximum Drawdown')
         axes[1,0].set_ylabel('Max Drawdown')
         axes[1,0].tick_params(axis='x', rotation=45)
         
         # VaR
-        axes[1,1].bar(df_metrics.index, df_metrics['VaR 95%'], color='orange')
+        axes[1,1].bar(cols, metrics['VaR 95%'], color='orange')
         axes[1,1].set_title('VaR 95%')
         axes[1,1].set_ylabel('VaR 95%')
         axes[1,1].tick_params(axis='x', rotation=45)
@@ -236,6 +707,7 @@ class AdvancedVisualizer:
     
     # ==================== GRÁFICOS DE CORRELAÇÃO ====================
     
+    @_cached_png
     def plot_correlation_heatmap(self, returns: pd.DataFrame, 
                                 assets: Optional[List[str]] = None, 
                                 window: Optional[int] = None) -> bytes:
@@ -252,9 +724,9 @@ class AdvancedVisualizer:
             asset1_returns = data[assets[0]]
             asset2_returns = data[assets[1]]
             
-            rolling_corr = asset1_returns.rolling(window=window).corr(asset2_returns)
+            rolling_corr = _rolling_corr(asset1_returns, asset2_returns, window)
             
-            fig, ax = plt.subplots(figsize=(14, 6))
+            fig, ax = self._acquire_fig(figsize=(14, 6))
             ax.plot(rolling_corr.index, rolling_corr.values, linewidth=2, color='blue')
             ax.axhline(0, color='black', linestyle='--', alpha=0.5)
             ax.set_title(f'Correlação Rolante {assets[0]} vs {assets[1]} (Janela: {window} dias)', 
@@ -265,27 +737,28 @@ class AdvancedVisualizer:
             
             return self._save_plot(fig)
         else:
-            corr_matrix = data.corr()
+            corr_matrix = self._corr(data)
             
-            fig, ax = plt.subplots(figsize=(10, 8))
+            fig, ax = self._acquire_fig(figsize=(10, 8))
             mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
             
-            sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm', 
+            sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm', ax=ax,
                        center=0, square=True, linewidths=0.5, cbar_kws={"shrink": 0.8})
             
             ax.set_title('Matriz de Correlação', fontsize=16, fontweight='bold')
             
             return self._save_plot(fig)
     
+    @_cached_png
     def plot_rolling_correlation(self, returns: pd.DataFrame, 
                                  asset1: str, asset2: str, window: int = 30) -> bytes:
         """Correlação rolante entre dois ativos."""
         if asset1 not in returns.columns or asset2 not in returns.columns:
             raise ValueError("Ativos não encontrados nos dados")
         
-        rolling_corr = returns[asset1].rolling(window=window).corr(returns[asset2])
+        rolling_corr = _rolling_corr(returns[asset1], returns[asset2], window)
         
-        fig, ax = plt.subplots(figsize=(14, 6))
+        fig, ax = self._acquire_fig(figsize=(14, 6))
         ax.plot(rolling_corr.index, rolling_corr.values, linewidth=2, color='blue')
         ax.axhline(0, color='black', linestyle='--', alpha=0.5)
         ax.set_title(f'Correlação Rolante {asset1} vs {asset2} (Janela: {window} dias)', 
@@ -296,9 +769,10 @@ class AdvancedVisualizer:
         
         return self._save_plot(fig)
 
+    @_cached_png
     def plot_rolling_beta(self, rolling_beta_series: pd.Series, asset: str, benchmark: str, window: int) -> bytes:
         """Plota o beta rolante."""
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = self._acquire_fig(figsize=self.figsize)
         
         ax.plot(rolling_beta_series.index, rolling_beta_series.values, linewidth=2, color='blue', label=f'Beta Rolante ({asset} vs {benchmark})')
         ax.axhline(1.0, color='red', linestyle='--', linewidth=1.5, label='Beta = 1.0')
@@ -312,18 +786,17 @@ class AdvancedVisualizer:
         
         return self._save_plot(fig)
 
+    @_cached_png
     def plot_underwater(self, returns: pd.Series, asset: str) -> bytes:
         """Gera um gráfico de drawdown (underwater plot)."""
-        cumulative_returns = (1 + returns).cumprod()
-        peak = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns / peak) - 1
+        dd, max_dd = _drawdown(returns.to_numpy(dtype=float))
+        drawdown = pd.Series(dd, index=returns.index)
 
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = self._acquire_fig(figsize=self.figsize)
         
-        ax.fill_between(drawdown.index, drawdown, 0, color='red', alpha=0.3)
-        ax.plot(drawdown.index, drawdown, color='red', alpha=0.8, linewidth=1.5)
-        
-        max_dd = drawdown.min()
+        dd_x, dd_y = self._xy(fig, drawdown)
+        ax.fill_between(dd_x, dd_y, 0, color='red', alpha=0.3, rasterized=True)
+        ax.plot(dd_x, dd_y, color='red', alpha=0.8, linewidth=1.5)
         
         ax.set_title(f'Underwater Plot (Drawdown) - {asset}', fontsize=16, fontweight='bold')
         ax.set_ylabel('Drawdown', fontsize=12)
@@ -337,10 +810,11 @@ class AdvancedVisualizer:
     
     # ==================== GRÁFICOS DE DISTRIBUIÇÃO ====================
     
+    @_cached_png
     def plot_return_distribution(self, returns: pd.DataFrame, 
                                 assets: List[str]) -> bytes:
         """Distribuição de retornos."""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig, axes = self._acquire_fig(2, 2, figsize=(16, 12))
         fig.suptitle('Distribuição de Retornos', fontsize=16, fontweight='bold')
         
         colors = plt.cm.Set3(np.linspace(0, 1, len(assets)))
@@ -349,9 +823,11 @@ class AdvancedVisualizer:
             if asset in returns.columns:
                 ret = returns[asset].dropna()
                 
-                # Histograma
+                # Histograma: 'stepfilled' desenha um único polígono em vez de 50
+                # retângulos; rasterized mantém o preenchimento como imagem em PDF/SVG
                 ax = axes[i//2, i%2]
-                ax.hist(ret, bins=50, alpha=0.7, color=colors[i], density=True)
+                ax.hist(ret, bins=50, alpha=0.7, color=colors[i], density=True,
+                        histtype='stepfilled', rasterized=True)
                 ax.axvline(ret.mean(), color='red', linestyle='--', 
                           label=f'Média: {ret.mean():.4f}')
                 ax.axvline(ret.median(), color='green', linestyle='--', 
@@ -364,14 +840,16 @@ class AdvancedVisualizer:
         
         return self._save_plot(fig)
     
+    @_cached_png
     def plot_qq_plot(self, returns: pd.Series, asset: str) -> bytes:
         """Q-Q plot para verificar normalidade."""
         from scipy import stats
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        fig, (ax1, ax2) = self._acquire_fig(1, 2, figsize=(14, 6))
         
         # Histograma com curva normal
-        ax1.hist(returns, bins=50, density=True, alpha=0.7, color='skyblue')
+        ax1.hist(returns, bins=50, density=True, alpha=0.7, color='skyblue',
+                 histtype='stepfilled', rasterized=True)
         mu, sigma = returns.mean(), returns.std()
         x = np.linspace(returns.min(), returns.max(), 100)
         ax1.plot(x, stats.norm.pdf(x, mu, sigma), 'r-', linewidth=2, 
@@ -391,17 +869,26 @@ class AdvancedVisualizer:
     
     # ==================== GRÁFICOS DE PERFORMANCE ====================
     
+    @_cached_png
     def plot_performance_metrics(self, returns: pd.DataFrame, 
                                 benchmark: Optional[pd.Series] = None) -> bytes:
         """Métricas de performance comparativas."""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        # Séries derivadas calculadas uma vez para todas as colunas
+        cumulative = (1 + returns).cumprod()
+        drawdowns, _ = _drawdown_frame(returns)
+        engine = _rolling_engine(len(returns))
+        rolling_252 = returns.rolling(252)
+        rolling_sharpes = rolling_252.mean(engine=engine) / rolling_252.std(engine=engine) * np.sqrt(252)
+        rolling_vols = returns.rolling(30).std(engine=engine) * np.sqrt(252)
+        
+        labels = [str(col) for col in returns.columns]
+        
+        fig, axes = self._acquire_fig(2, 2, figsize=(16, 12))
         fig.suptitle('Análise de Performance', fontsize=16, fontweight='bold')
         
-        # Retornos acumulados
+        # Retornos acumulados (uma chamada para todas as colunas: y 2-D, uma linha por coluna)
         ax1 = axes[0, 0]
-        cumulative = (1 + returns).cumprod()
-        for col in cumulative.columns:
-            ax1.plot(cumulative.index, cumulative[col], label=col, linewidth=2)
+        ax1.plot(cumulative.index, cumulative.to_numpy(), label=labels, linewidth=2)
         if benchmark is not None:
             bench_cum = (1 + benchmark).cumprod()
             ax1.plot(bench_cum.index, bench_cum.values, label='Benchmark', 
@@ -413,9 +900,7 @@ class AdvancedVisualizer:
         
         # Rolling Sharpe
         ax2 = axes[0, 1]
-        for col in returns.columns:
-            rolling_sharpe = returns[col].rolling(252).mean() / returns[col].rolling(252).std() * np.sqrt(252)
-            ax2.plot(rolling_sharpe.index, rolling_sharpe.values, label=col, linewidth=2)
+        ax2.plot(rolling_sharpes.index, rolling_sharpes.to_numpy(), label=labels, linewidth=2)
         ax2.set_title('Sharpe Ratio Rolante (252 dias)')
         ax2.set_ylabel('Sharpe Ratio')
         ax2.legend()
@@ -423,9 +908,7 @@ class AdvancedVisualizer:
         
         # Rolling Volatility
         ax3 = axes[1, 0]
-        for col in returns.columns:
-            rolling_vol = returns[col].rolling(30).std() * np.sqrt(252)
-            ax3.plot(rolling_vol.index, rolling_vol.values, label=col, linewidth=2)
+        ax3.plot(rolling_vols.index, rolling_vols.to_numpy(), label=labels, linewidth=2)
         ax3.set_title('Volatilidade Rolante (30 dias)')
         ax3.set_ylabel('Volatilidade Anualizada')
         ax3.legend()
@@ -434,10 +917,8 @@ class AdvancedVisualizer:
         # Drawdown
         ax4 = axes[1, 1]
         for col in returns.columns:
-            cum_ret = (1 + returns[col]).cumprod()
-            running_max = cum_ret.expanding().max()
-            drawdown = (cum_ret / running_max) - 1
-            ax4.fill_between(drawdown.index, drawdown.values, 0, alpha=0.7, label=col)
+            ax4.fill_between(drawdowns.index, drawdowns[col].values, 0, alpha=0.7, label=col,
+                             rasterized=True)
         ax4.set_title('Drawdown')
         ax4.set_ylabel('Drawdown')
         ax4.legend()
@@ -447,6 +928,7 @@ class AdvancedVisualizer:
     
     # ==================== GRÁFICOS DE OTIMIZAÇÃO ====================
     
+    @_cached_png
     def plot_efficient_frontier_advanced(self, returns: pd.DataFrame, 
                                        assets: List[str], n_portfolios: int = 1000) -> bytes:
         """Fronteira eficiente avançada com múltiplas métricas."""
@@ -459,29 +941,17 @@ class AdvancedVisualizer:
         
         # Gerar portfólios aleatórios
         np.random.seed(42)
-        portfolio_returns = []
-        portfolio_volatilities = []
-        portfolio_sharpes = []
-        portfolio_weights = []
-        
-        for _ in range(n_portfolios):
-            weights = np.random.random(len(assets))
-            weights /= np.sum(weights)
-            
-            portfolio_return = np.sum(weights * mean_returns)
-            portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-            sharpe_ratio = portfolio_return / portfolio_volatility
-            
-            portfolio_returns.append(portfolio_return)
-            portfolio_volatilities.append(portfolio_volatility)
-            portfolio_sharpes.append(sharpe_ratio)
-            portfolio_weights.append(weights)
+        uniforms = np.random.random((n_portfolios, len(assets)))
+        simulate = _simulate_portfolios if NUMBA_AVAILABLE else _simulate_portfolios_numpy
+        (portfolio_returns, portfolio_volatilities,
+         portfolio_sharpes, portfolio_weights) = simulate(
+            mean_returns.to_numpy(dtype=float), cov_matrix.to_numpy(dtype=float), uniforms)
         
         # Encontrar portfólio ótimo
         max_sharpe_idx = np.argmax(portfolio_sharpes)
         min_vol_idx = np.argmin(portfolio_volatilities)
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
+        fig, (ax1, ax2) = self._acquire_fig(1, 2, figsize=(16, 8))
         
         # Fronteira eficiente
         scatter = ax1.scatter(portfolio_volatilities, portfolio_returns, 
@@ -495,7 +965,7 @@ class AdvancedVisualizer:
         ax1.set_title('Fronteira Eficiente')
         ax1.legend()
         ax1.grid(True, alpha=0.3)
-        plt.colorbar(scatter, ax=ax1, label='Sharpe Ratio')
+        fig.colorbar(scatter, ax=ax1, label='Sharpe Ratio')
         
         # Alocação do portfólio ótimo
         optimal_weights = portfolio_weights[max_sharpe_idx]
@@ -506,18 +976,26 @@ class AdvancedVisualizer:
     
     # ==================== DASHBOARD COMPLETO ====================
     
+    @_cached_png
     def plot_comprehensive_dashboard(self, prices: pd.DataFrame, returns: pd.DataFrame, 
-                                   assets: List[str], benchmark: Optional[pd.Series] = None) -> bytes:
-        """Dashboard completo com múltiplas visualizações."""
-        fig = plt.figure(figsize=(20, 16))
-        gs = fig.add_gridspec(4, 4, hspace=0.3, wspace=0.3)
+                                   assets: List[str], benchmark: Optional[pd.Series] = None,
+                                   dpi: Optional[int] = None) -> bytes:
+        """Dashboard completo com múltiplas visualizações.
+
+        `dpi` sobrepõe o `default_dpi` da instância só para este gráfico.
+        """
+        # Séries derivadas calculadas uma vez e reaproveitadas pelos painéis
+        asset_returns = returns[assets]
+        cumulative = (1 + asset_returns).cumprod()
+        drawdowns, max_drawdowns = _drawdown_frame(asset_returns)
+        rolling_vols = asset_returns.rolling(30).std(engine=_rolling_engine(len(asset_returns))) * np.sqrt(252)
+        
+        fig, (ax1, ax2, ax3, ax4, ax5, ax6, ax7) = self._acquire_fig(figsize=(20, 16), build=_dashboard_axes)
         
         # 1. Preços normalizados
-        ax1 = fig.add_subplot(gs[0, :2])
-        for asset in assets:
-            if asset in prices.columns:
-                norm_price = (prices[asset] / prices[asset].iloc[0]) * 100
-                ax1.plot(norm_price.index, norm_price.values, label=asset, linewidth=2)
+        cols = [asset for asset in assets if asset in prices.columns]
+        norm_prices = prices[cols] / prices[cols].iloc[0] * 100
+        ax1.plot(norm_prices.index, norm_prices.to_numpy(), label=cols, linewidth=2)
         if benchmark is not None:
             norm_bench = (benchmark / benchmark.iloc[0]) * 100
             ax1.plot(norm_bench.index, norm_bench.values, label='Benchmark', 
@@ -527,50 +1005,30 @@ class AdvancedVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # 2. Retornos acumulados
-        ax2 = fig.add_subplot(gs[0, 2:])
-        cumulative = (1 + returns[assets]).cumprod()
-        for asset in assets:
-            if asset in cumulative.columns:
-                ax2.plot(cumulative.index, cumulative[asset], label=asset, linewidth=2)
+        ax2.plot(cumulative.index, cumulative.to_numpy(), label=list(assets), linewidth=2)
         ax2.set_title('Retornos Acumulados', fontweight='bold')
         ax2.legend()
         ax2.grid(True, alpha=0.3)
         
         # 3. Volatilidade rolante
-        ax3 = fig.add_subplot(gs[1, :2])
-        for asset in assets:
-            if asset in returns.columns:
-                rolling_vol = returns[asset].rolling(30).std() * np.sqrt(252)
-                ax3.plot(rolling_vol.index, rolling_vol.values, label=asset, linewidth=2)
+        ax3.plot(rolling_vols.index, rolling_vols.to_numpy(), label=list(assets), linewidth=2)
         ax3.set_title('Volatilidade Rolante (30 dias)', fontweight='bold')
         ax3.set_ylabel('Volatilidade Anualizada')
         ax3.legend()
         ax3.grid(True, alpha=0.3)
         
         # 4. Correlação
-        ax4 = fig.add_subplot(gs[1, 2:])
-        corr_matrix = returns[assets].corr()
-        im = ax4.imshow(corr_matrix, cmap='coolwarm', vmin=-1, vmax=1)
-        ax4.set_xticks(range(len(assets)))
-        ax4.set_yticks(range(len(assets)))
-        ax4.set_xticklabels(assets, rotation=45)
-        ax4.set_yticklabels(assets)
+        corr_matrix = self._corr(asset_returns)
+        # Anotações só até _CORR_ANNOT_MAX_ASSETS ativos: acima disso viram ruído e custam N² textos
+        sns.heatmap(corr_matrix, ax=ax4, cmap='coolwarm', vmin=-1, vmax=1,
+                    annot=len(assets) <= _CORR_ANNOT_MAX_ASSETS, fmt='.2f', cbar=True, square=True)
+        ax4.tick_params(axis='x', rotation=45)
         ax4.set_title('Matriz de Correlação', fontweight='bold')
         
-        # Adicionar valores na matriz
-        for i in range(len(assets)):
-            for j in range(len(assets)):
-                text = ax4.text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
-                              ha="center", va="center", color="black", fontweight='bold')
-        
-        plt.colorbar(im, ax=ax4)
-        
         # 5. Distribuição de retornos
-        ax5 = fig.add_subplot(gs[2, :2])
         for asset in assets:
-            if asset in returns.columns:
-                ret = returns[asset].dropna()
-                ax5.hist(ret, bins=50, alpha=0.6, label=asset, density=True)
+            ax5.hist(asset_returns[asset].dropna(), bins=50, alpha=0.6, label=asset, density=True,
+                     histtype='stepfilled', rasterized=True)
         ax5.set_title('Distribuição de Retornos', fontweight='bold')
         ax5.set_xlabel('Retorno')
         ax5.set_ylabel('Densidade')
@@ -578,39 +1036,22 @@ class AdvancedVisualizer:
         ax5.grid(True, alpha=0.3)
         
         # 6. Drawdown
-        ax6 = fig.add_subplot(gs[2, 2:])
         for asset in assets:
-            if asset in returns.columns:
-                cum_ret = (1 + returns[asset]).cumprod()
-                running_max = cum_ret.expanding().max()
-                drawdown = (cum_ret / running_max) - 1
-                ax6.fill_between(drawdown.index, drawdown.values, 0, alpha=0.7, label=asset)
+            ax6.fill_between(drawdowns.index, drawdowns[asset].values, 0, alpha=0.7, label=asset,
+                             rasterized=True)
         ax6.set_title('Drawdown', fontweight='bold')
         ax6.set_ylabel('Drawdown')
         ax6.legend()
         ax6.grid(True, alpha=0.3)
         
         # 7. Métricas de risco
-        ax7 = fig.add_subplot(gs[3, :])
-        metrics_data = []
-        for asset in assets:
-            if asset in returns.columns:
-                ret = returns[asset].dropna()
-                metrics_data.append({
-                    'Asset': asset,
-                    'Volatility': ret.std() * np.sqrt(252),
-                    'Sharpe': ret.mean() / ret.std() * np.sqrt(252),
-                    'Max DD': ((1 + ret).cumprod() / (1 + ret).cumprod().expanding().max() - 1).min(),
-                    'VaR 95%': ret.quantile(0.05)
-                })
-        
-        metrics_df = pd.DataFrame(metrics_data)
+        metrics = _risk_metric_columns(asset_returns, max_drawdowns.to_numpy())
         x = np.arange(len(assets))
         width = 0.2
         
-        ax7.bar(x - width, metrics_df['Volatility'], width, label='Volatilidade', alpha=0.8)
-        ax7.bar(x, metrics_df['Sharpe'], width, label='Sharpe Ratio', alpha=0.8)
-        ax7.bar(x + width, -metrics_df['Max DD'], width, label='Max Drawdown', alpha=0.8)
+        ax7.bar(x - width, metrics['Volatility'], width, label='Volatilidade', alpha=0.8)
+        ax7.bar(x, metrics['Sharpe'], width, label='Sharpe Ratio', alpha=0.8)
+        ax7.bar(x + width, -metrics['Max DD'], width, label='Max Drawdown', alpha=0.8)
         
         ax7.set_xlabel('Ativos')
         ax7.set_ylabel('Valores')
@@ -620,8 +1061,9 @@ class AdvancedVisualizer:
         ax7.legend()
         ax7.grid(True, alpha=0.3)
         
-        return self._save_plot(fig)
+        return self._save_plot(fig, dpi=dpi)
 
+    @_cached_png
     def plot_asset_allocation(self, weights: Dict[str, float], title: str = "Alocação de Ativos") -> bytes:
         """Gera um gráfico de pizza (pie chart) da alocação de ativos.
 
@@ -636,13 +1078,14 @@ class AdvancedVisualizer:
         labels = list(weights.keys())
         sizes = list(weights.values())
 
-        fig, ax = plt.subplots(figsize=(10, 7))
+        fig, ax = self._acquire_fig(figsize=(10, 7))
         ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, pctdistance=0.85)
         ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
         ax.set_title(title, fontsize=16, fontweight='bold')
 
         return self._save_plot(fig)
 
+    @_cached_png
     def plot_cumulative_performance(self, prices: pd.DataFrame, assets: List[str], benchmarks: Optional[List[str]] = None, title: str = "Performance Acumulada") -> bytes:
         """Gera um gráfico de linha da performance acumulada de ativos/portfólio vs. benchmarks.
 
@@ -655,20 +1098,20 @@ class AdvancedVisualizer:
         Retorna:
             bytes: Imagem PNG do gráfico em bytes.
         """
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = self._acquire_fig(figsize=self.figsize)
 
         # Calcular retornos acumulados para ativos
         for asset in assets:
             if asset in prices.columns:
                 cumulative_returns = (1 + prices[asset].pct_change().fillna(0)).cumprod()
-                ax.plot(cumulative_returns.index, cumulative_returns.values, label=asset, linewidth=2)
+                ax.plot(*self._xy(fig, cumulative_returns), label=asset, linewidth=2)
 
         # Calcular retornos acumulados para benchmarks
         if benchmarks:
             for benchmark in benchmarks:
                 if benchmark in prices.columns: # Assumindo que benchmarks também estão no DataFrame de preços
                     cumulative_returns_bench = (1 + prices[benchmark].pct_change().fillna(0)).cumprod()
-                    ax.plot(cumulative_returns_bench.index, cumulative_returns_bench.values, label=f"{benchmark} (Benchmark)", linestyle='--', linewidth=2)
+                    ax.plot(*self._xy(fig, cumulative_returns_bench), label=f"{benchmark} (Benchmark)", linestyle='--', linewidth=2)
                 else:
                     logging.warning(f"Benchmark {benchmark} não encontrado no DataFrame de preços.")
 
@@ -686,6 +1129,7 @@ class AdvancedVisualizer:
 
         return self._save_plot(fig)
 
+    @_cached_png
     def plot_risk_contribution(self, risk_attribution_data: Dict[str, Any], title: str = "Contribuição de Risco por Ativo") -> bytes:
         """Gera um gráfico de barras da contribuição de risco de cada ativo para o portfólio.
 
@@ -704,7 +1148,7 @@ class AdvancedVisualizer:
         if not assets or not contribution_vol: # contribution_var pode ser NaN
             raise ValueError("Dados insuficientes para gerar o gráfico de contribuição de risco.")
 
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = self._acquire_fig(figsize=self.figsize)
 
         # Usar contribution_vol para o gráfico, pois é sempre disponível
         # Para VaR, a contribuição pode ser NaN se o método for inadequado ou dados insuficientes
@@ -721,11 +1165,10 @@ class AdvancedVisualizer:
         # for i, v in enumerate(contribution_vol):
         #     ax.text(v + 0.05, i, f'{v:.2%}', color='blue', va='center') # Não mostrado diretamente neste exemplo, mas possível
 
-        fig.tight_layout()
         return self._save_plot(fig)
 
 
 # Funções de conveniência
-def create_advanced_visualizer(style: str = 'seaborn-v0_8') -> AdvancedVisualizer:
+def create_advanced_visualizer(style: str = 'seaborn-v0_8', dpi: int = _DEFAULT_DPI) -> AdvancedVisualizer:
     """Cria uma instância do visualizador avançado."""
-    return AdvancedVisualizer(style=style)
+    return AdvancedVisualizer(style=style, dpi=dpi)
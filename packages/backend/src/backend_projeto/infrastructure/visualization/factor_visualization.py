@@ -1,10 +1,17 @@
-import io
 from typing import List, Optional, Dict, Tuple
 
 import pandas as pd
 import matplotlib
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+
+from backend_projeto.infrastructure.visualization._figure_pool import (
+    _pooled_figure,
+    _render_png,
+    _single_axes,
+)
+
+# DPI dos PNGs de fatores
+_FACTOR_DPI = 150
 
 
 def plot_ff_factors(factors: pd.DataFrame, title: str = "Fama-French Factors (Monthly)") -> bytes:
@@ -18,20 +25,18 @@ def plot_ff_factors(factors: pd.DataFrame, title: str = "Fama-French Factors (Mo
     if not allowed:
         raise ValueError("Nenhum fator válido encontrado para plotagem")
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    for c in allowed:
-        ax.plot(factors.index, factors[c], label=c)
-    ax.set_title(title)
-    ax.set_xlabel("Data (mês)")
-    ax.set_ylabel("Retorno mensal (decimal)")
-    ax.grid(True, alpha=0.3)
-    ax.legend(loc="best")
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    return buf.read()
+    # Figura e eixos reaproveitados entre chamadas
+    with _pooled_figure(('ff_factors',), (12, 6), _single_axes) as (fig, (ax,)):
+        for c in allowed:
+            ax.plot(factors.index, factors[c], label=c)
+        ax.set_title(title)
+        ax.set_xlabel("Data (mês)")
+        ax.set_ylabel("Retorno mensal (decimal)")
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc="best")
+        # Margens fixas: tight_layout partiria das margens deixadas pelo uso anterior da figura
+        fig.subplots_adjust(left=0.08, right=0.98, top=0.93, bottom=0.1)
+        return _render_png(fig, _FACTOR_DPI)
 
 
 def plot_ff_betas(betas: Dict[str, float], model: str = "FF3", title: Optional[str] = None) -> bytes:
@@ -50,16 +55,12 @@ def plot_ff_betas(betas: Dict[str, float], model: str = "FF3", title: Optional[s
         labels = ["MKT", "SMB", "HML", "RMW", "CMA"]
     vals = [betas.get(k, 0.0) for k in order]
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.bar(labels, vals, color=["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f"][0:len(labels)])
-    ax.axhline(0, color='black', linewidth=0.8)
-    ax.set_ylabel("Beta")
-    ax.set_title(title or f"Fama-French {model} Betas")
-    for i, v in enumerate(vals):
-        ax.text(i, v + (0.01 if v >= 0 else -0.01), f"{v:.2f}", ha='center', va='bottom' if v>=0 else 'top', fontsize=9)
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    return buf.read()
+    with _pooled_figure(('ff_betas',), (8, 5), _single_axes) as (fig, (ax,)):
+        ax.bar(labels, vals, color=["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f"][0:len(labels)])
+        ax.axhline(0, color='black', linewidth=0.8)
+        ax.set_ylabel("Beta")
+        ax.set_title(title or f"Fama-French {model} Betas")
+        for i, v in enumerate(vals):
+            ax.text(i, v + (0.01 if v >= 0 else -0.01), f"{v:.2f}", ha='center', va='bottom' if v>=0 else 'top', fontsize=9)
+        fig.subplots_adjust(left=0.1, right=0.98, top=0.92, bottom=0.08)
+        return _render_png(fig, _FACTOR_DPI)
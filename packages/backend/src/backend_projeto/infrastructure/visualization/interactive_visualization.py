@@ -2,54 +2,117 @@
 # Visualizações interativas usando Plotly
 
 import io
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from typing import List, Optional, Dict, Any
-import json
+
+from backend_projeto.domain.financial_math import _annualize_mean_cov
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE
+from backend_projeto.infrastructure.visualization.advanced_visualization import (
+    _drawdown,
+    _drawdown_frame,
+    _lttb_indices,
+    _simulate_portfolios,
+    _simulate_portfolios_numpy,
+)
 
 try:
     import plotly.graph_objects as go
     from plotly.subplots import make_subplots
     import plotly.express as px
-    from plotly.utils import PlotlyJSONEncoder
+    import plotly.io as pio
     PLOTLY_AVAILABLE = True
 except ImportError:
     PLOTLY_AVAILABLE = False
     print("Plotly não disponível. Instale com: pip install plotly")
 
+# orjson serializa os arrays NumPy em C; sem ele o Plotly usa o PlotlyJSONEncoder
+try:
+    import orjson  # noqa: F401
+    _JSON_ENGINE = 'orjson'
+except ImportError:
+    _JSON_ENGINE = 'json'
+
+# Pontos máximos por traço de série temporal; acima disso a série é reduzida por LTTB.
+# O gráfico tem ~1-2 mil px de largura, então a redução é visualmente imperceptível
+_MAX_TRACE_POINTS = 2000
+
+
+def _downsample(index: pd.Index, values: np.ndarray,
+                max_points: int = _MAX_TRACE_POINTS) -> tuple:
+    """Reduz a série (index, values) a `max_points` pontos pelo LTTB, ignorando NaN.
+
+    Séries curtas voltam inalteradas. O LTTB usa a posição como abscissa (os pontos
+    são pregões consecutivos), então picos e vales visíveis são preservados.
+    """
+    if len(values) <= max_points:
+        return index, values
+    valid = np.flatnonzero(~np.isnan(values))
+    keep = valid[_lttb_indices(valid.astype(float), values[valid], max_points)]
+    return index[keep], values[keep]
+
+
+@lru_cache(maxsize=None)
+def _template_json(name: str) -> Dict[str, Any]:
+    """JSON do template Plotly `name`, montado uma única vez por processo.
+
+    Atribuir `template=...` a um layout valida o template inteiro a cada figura
+    (~20 ms); o dicionário é compartilhado entre as figuras e não deve ser alterado.
+    """
+    return pio.templates[name].to_plotly_json()
+
+
 class InteractiveVisualizer:
     """Sistema de visualização interativa usando Plotly."""
     
+    # Template aplicado a todas as figuras na serialização
+    template = 'plotly_white'
+    
     def __init__(self):
         if not PLOTLY_AVAILABLE:
             raise ImportError("Plotly é necessário para visualizações interativas")
     
     def _save_plot(self, fig) -> bytes:
-        """Converte figura Plotly para bytes JSON."""
-        json_str = json.dumps(fig, cls=PlotlyJSONEncoder)
-        return json_str.encode('utf-8')
+        """Converte figura Plotly para bytes JSON, com o template da classe já resolvido.
+
+        As figuras são montadas só com propriedades válidas, então a validação recursiva
+        do schema é dispensada (`validate=False`).
+        """
+        fig_dict = fig.to_dict()
+        fig_dict['layout']['template'] = _template_json(self.template)
+        return pio.to_json(fig_dict, validate=False, engine=_JSON_ENGINE).encode('utf-8')
     
-    def plot_interactive_candlestick(self, prices: pd.DataFrame, asset: str) -> bytes:
-        """Gráfico de candlestick interativo."""
+    def plot_interactive_candlestick(self, prices: pd.DataFrame, asset: str,
+                                     simulate: bool = False) -> bytes:
+        """Gráfico de candlestick interativo.
+
+        Se `prices` só tem fechamentos, `simulate=True` aproxima o OHLC a partir deles
+        (abertura = fechamento anterior, sombras com ruído de semente fixa); sem
+        `simulate`, exige colunas OHLC reais.
+        """
         if asset not in prices.columns:
             raise ValueError(f"Ativo '{asset}' não encontrado")
         
-        # Simular OHLC se necessário
+        # Simular OHLC se só tivermos Close
         if 'Open' not in prices.columns:
-            ohlc_data = prices[[asset]].copy()
-            ohlc_data['Open'] = ohlc_data[asset].shift(1).fillna(ohlc_data[asset])
-            ohlc_data['High'] = ohlc_data[asset] * (1 + np.random.normal(0, 0.01, len(ohlc_data)))
-            ohlc_data['Low'] = ohlc_data[asset] * (1 - np.random.normal(0, 0.01, len(ohlc_data)))
-            ohlc_data['Close'] = ohlc_data[asset]
+            if not simulate:
+                raise ValueError("Dados OHLC (Open/High/Low/Close) ausentes; use simulate=True para aproximá-los pelo fechamento")
+            # Semente fixa para o gráfico ser reproduzível; abs() garante Low <= corpo <= High
+            close = prices[asset].to_numpy(dtype=float)
+            opens = np.concatenate([close[:1], close[:-1]])
+            noise = np.abs(np.random.default_rng(0).normal(0, 0.01, (2, len(close))))
+            high = np.maximum(opens, close) * (1 + noise[0])
+            low = np.minimum(opens, close) * (1 - noise[1])
         else:
-            ohlc_data = prices[['Open', 'High', 'Low', 'Close']]
+            opens, high, low, close = prices[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=float).T
         
         fig = go.Figure(data=go.Candlestick(
-            x=ohlc_data.index,
-            open=ohlc_data['Open'],
-            high=ohlc_data['High'],
-            low=ohlc_data['Low'],
-            close=ohlc_data['Close'],
+            x=prices.index,
+            open=opens,
+            high=high,
+            low=low,
+            close=close,
             name=asset
         ))
         
@@ -57,7 +120,6 @@ class InteractiveVisualizer:
             title=f'{asset} - Candlestick Chart',
             xaxis_title='Data',
             yaxis_title='Preço',
-            template='plotly_white',
             height=600
         )
         
@@ -75,60 +137,57 @@ class InteractiveVisualizer:
                    [{"secondary_y": False}, {"secondary_y": False}]]
         )
         
+        # Séries derivadas calculadas uma vez para todos os ativos; os laços abaixo só
+        # adicionam os traços
+        asset_returns = returns[assets]
+        cumulative = (1 + asset_returns).cumprod()
+        rolling_vols = asset_returns.rolling(30).std() * np.sqrt(252)
+        drawdowns, _ = _drawdown_frame(asset_returns)
+        
+        # Séries longas são reduzidas por LTTB antes de entrar no JSON
         # Retornos acumulados
-        cumulative = (1 + returns[assets]).cumprod()
         for asset in assets:
-            if asset in cumulative.columns:
-                fig.add_trace(
-                    go.Scatter(x=cumulative.index, y=cumulative[asset], 
-                             name=asset, line=dict(width=2)),
-                    row=1, col=1
-                )
+            x, y = _downsample(cumulative.index, cumulative[asset].to_numpy(dtype=float))
+            fig.add_trace(
+                go.Scatter(x=x, y=y, name=asset, line=dict(width=2)),
+                row=1, col=1
+            )
         
         if benchmark is not None:
             bench_cum = (1 + benchmark).cumprod()
+            x, y = _downsample(bench_cum.index, bench_cum.to_numpy(dtype=float))
             fig.add_trace(
-                go.Scatter(x=bench_cum.index, y=bench_cum.values, 
-                          name='Benchmark', line=dict(width=2, dash='dash')),
+                go.Scatter(x=x, y=y, name='Benchmark', line=dict(width=2, dash='dash')),
                 row=1, col=1
             )
         
         # Volatilidade rolante
         for asset in assets:
-            if asset in returns.columns:
-                rolling_vol = returns[asset].rolling(30).std() * np.sqrt(252)
-                fig.add_trace(
-                    go.Scatter(x=rolling_vol.index, y=rolling_vol.values, 
-                              name=f'{asset} Vol', line=dict(width=2)),
-                    row=1, col=2
-                )
+            x, y = _downsample(rolling_vols.index, rolling_vols[asset].to_numpy(dtype=float))
+            fig.add_trace(
+                go.Scatter(x=x, y=y, name=f'{asset} Vol', line=dict(width=2)),
+                row=1, col=2
+            )
         
         # Drawdown
         for asset in assets:
-            if asset in returns.columns:
-                cum_ret = (1 + returns[asset]).cumprod()
-                running_max = cum_ret.expanding().max()
-                drawdown = (cum_ret / running_max) - 1
-                fig.add_trace(
-                    go.Scatter(x=drawdown.index, y=drawdown.values, 
-                             name=f'{asset} DD', fill='tonexty'),
-                    row=2, col=1
-                )
+            x, y = _downsample(drawdowns.index, drawdowns[asset].to_numpy(dtype=float))
+            fig.add_trace(
+                go.Scatter(x=x, y=y, name=f'{asset} DD', fill='tonexty'),
+                row=2, col=1
+            )
         
         # Distribuição de retornos
         for asset in assets:
-            if asset in returns.columns:
-                ret = returns[asset].dropna()
-                fig.add_trace(
-                    go.Histogram(x=ret, name=f'{asset} Dist', opacity=0.7),
-                    row=2, col=2
-                )
+            fig.add_trace(
+                go.Histogram(x=asset_returns[asset].dropna().to_numpy(), name=f'{asset} Dist', opacity=0.7),
+                row=2, col=2
+            )
         
         fig.update_layout(
             title='Análise Interativa de Portfólio',
             height=800,
-            showlegend=True,
-            template='plotly_white'
+            showlegend=True
         )
         
         return self._save_plot(fig)
@@ -138,26 +197,14 @@ class InteractiveVisualizer:
         """Fronteira eficiente interativa."""
         # Calcular retornos e covariância
         ret_data = returns[assets].dropna()
-        mean_returns = ret_data.mean() * 252
-        cov_matrix = ret_data.cov() * 252
-        
-        # Gerar portfólios aleatórios
-        np.random.seed(42)
-        portfolio_returns = []
-        portfolio_volatilities = []
-        portfolio_sharpes = []
-        
-        for _ in range(n_portfolios):
-            weights = np.random.random(len(assets))
-            weights /= np.sum(weights)
-            
-            portfolio_return = np.sum(weights * mean_returns)
-            portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-            sharpe_ratio = portfolio_return / portfolio_volatility
-            
-            portfolio_returns.append(portfolio_return)
-            portfolio_volatilities.append(portfolio_volatility)
-            portfolio_sharpes.append(sharpe_ratio)
+        mean_returns, cov_matrix = _annualize_mean_cov(ret_data, 252)
+        
+        # Gerar portfólios aleatórios: todos os pesos em uma matriz (n_portfolios, K).
+        # O RandomState com semente 42 gera os mesmos pesos do antigo laço por carteira
+        uniforms = np.random.RandomState(42).random_sample((n_portfolios, len(assets)))
+        simulate = _simulate_portfolios if NUMBA_AVAILABLE else _simulate_portfolios_numpy
+        portfolio_returns, portfolio_volatilities, portfolio_sharpes, _ = simulate(
+            mean_returns, cov_matrix, uniforms)
         
         # Encontrar portfólio ótimo
         max_sharpe_idx = np.argmax(portfolio_sharpes)
@@ -211,7 +258,6 @@ class InteractiveVisualizer:
             title='Fronteira Eficiente Interativa',
             xaxis_title='Volatilidade',
             yaxis_title='Retorno Esperado',
-            template='plotly_white',
             height=600
         )
         
@@ -220,21 +266,24 @@ class InteractiveVisualizer:
     def plot_interactive_risk_metrics(self, returns: pd.DataFrame, 
                                     assets: List[str]) -> bytes:
         """Métricas de risco interativas."""
-        metrics_data = []
-        for asset in assets:
-            if asset in returns.columns:
-                ret = returns[asset].dropna()
-                metrics_data.append({
-                    'Asset': asset,
-                    'Volatility': ret.std() * np.sqrt(252),
-                    'Sharpe': ret.mean() / ret.std() * np.sqrt(252),
-                    'Max_DD': ((1 + ret).cumprod() / (1 + ret).cumprod().expanding().max() - 1).min(),
-                    'VaR_95': ret.quantile(0.05),
-                    'Skewness': ret.skew(),
-                    'Kurtosis': ret.kurtosis()
-                })
-        
-        df_metrics = pd.DataFrame(metrics_data)
+        from scipy import stats
+        
+        metrics = ['Volatility', 'Sharpe', 'Max_DD', 'VaR_95', 'Skewness', 'Kurtosis']
+        present = [asset for asset in assets if asset in returns.columns]
+        # Um array por métrica, preenchido por posição do ativo
+        values = {metric: np.empty(len(present)) for metric in metrics}
+        for i, asset in enumerate(present):
+            ret = returns[asset].dropna().to_numpy(dtype=float)
+            # Momentos em uma passada; bias=False dá a assimetria e a curtose
+            # (excesso) ajustadas, as mesmas do pandas
+            desc = stats.describe(ret, bias=False)
+            std = np.sqrt(desc.variance)
+            values['Volatility'][i] = std * np.sqrt(252)
+            values['Sharpe'][i] = desc.mean / std * np.sqrt(252)
+            values['Max_DD'][i] = _drawdown(ret)[1]
+            values['VaR_95'][i] = np.quantile(ret, 0.05)
+            values['Skewness'][i] = desc.skewness
+            values['Kurtosis'][i] = desc.kurtosis
         
         fig = make_subplots(
             rows=2, cols=3,
@@ -244,20 +293,18 @@ class InteractiveVisualizer:
                    [{"type": "bar"}, {"type": "bar"}, {"type": "bar"}]]
         )
         
-        metrics = ['Volatility', 'Sharpe', 'Max_DD', 'VaR_95', 'Skewness', 'Kurtosis']
         positions = [(1,1), (1,2), (1,3), (2,1), (2,2), (2,3)]
         
-        for i, (metric, pos) in enumerate(zip(metrics, positions)):
+        for metric, pos in zip(metrics, positions):
             fig.add_trace(
-                go.Bar(x=df_metrics['Asset'], y=df_metrics[metric], 
+                go.Bar(x=present, y=values[metric], 
                       name=metric, showlegend=False),
                 row=pos[0], col=pos[1]
             )
         
         fig.update_layout(
             title='Métricas de Risco Interativas',
-            height=800,
-            template='plotly_white'
+            height=800
         )
         
         return self._save_plot(fig)
@@ -281,7 +328,6 @@ class InteractiveVisualizer:
         
         fig.update_layout(
             title='Matriz de Correlação Interativa',
-            template='plotly_white',
             height=600
         )
         
@@ -295,37 +341,37 @@ class InteractiveVisualizer:
         mu = returns.mean()
         sigma = returns.std()
         
-        # Simulações
-        np.random.seed(42)
-        simulations = []
-        for _ in range(n_simulations):
-            random_walk = np.random.normal(mu, sigma, n_days)
-            price_path = (1 + random_walk).cumprod()
-            simulations.append(price_path)
-        
-        simulations = np.array(simulations)
+        # Simulações: todas as trajetórias em um único sorteio (n_simulations, n_days).
+        # O RandomState com semente 42 preenche a matriz na mesma ordem do antigo laço
+        # por simulação, então as trajetórias são as mesmas
+        rng = np.random.RandomState(42)
+        simulations = np.cumprod(1 + rng.normal(mu, sigma, (n_simulations, n_days)), axis=1)
+        # Arrays de dtype fixo em vez de listas; float32 basta para as curvas e encurta
+        # o JSON (~40% menos bytes nas trajetórias)
+        days = np.arange(n_days, dtype=np.int32)
         
         fig = go.Figure()
         
-        # Adicionar algumas trajetórias
-        for i in range(min(100, n_simulations)):
-            fig.add_trace(go.Scatter(
-                x=list(range(n_days)),
-                y=simulations[i],
-                mode='lines',
-                line=dict(width=1, color='lightblue'),
-                showlegend=False,
-                opacity=0.3
-            ))
+        # Até 100 trajetórias em um único traço WebGL, separadas por NaN (null no JSON)
+        n_paths = min(100, n_simulations)
+        fig.add_trace(go.Scattergl(
+            x=np.tile(np.append(days, np.nan).astype(np.float32), n_paths),
+            y=np.column_stack([simulations[:n_paths], np.full(n_paths, np.nan)]).astype(np.float32).ravel(),
+            mode='lines',
+            line=dict(width=1, color='lightblue'),
+            showlegend=False,
+            opacity=0.3
+        ))
         
         # Percentis
         percentiles = [5, 25, 50, 75, 95]
         colors = ['red', 'orange', 'green', 'orange', 'red']
+        bands = np.percentile(simulations, percentiles, axis=0).astype(np.float32)
         
-        for p, color in zip(percentiles, colors):
+        for p, band, color in zip(percentiles, bands, colors):
             fig.add_trace(go.Scatter(
-                x=list(range(n_days)),
-                y=np.percentile(simulations, p, axis=0),
+                x=days,
+                y=band,
                 mode='lines',
                 line=dict(width=2, color=color),
                 name=f'{p}th Percentile',
@@ -336,7 +382,6 @@ class InteractiveVisualizer:
             title=f'Simulação Monte Carlo ({n_simulations} simulações)',
             xaxis_title='Dias',
             yaxis_title='Preço Normalizado',
-            template='plotly_white',
             height=600
         )
         
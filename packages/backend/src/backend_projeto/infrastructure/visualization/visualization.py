@@ -1,17 +1,253 @@
 # visualization.py
 
 import io
+import math
+import threading
 import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use("Agg")  # backend não interativo para geração de imagens
-import matplotlib.pyplot as plt
-from typing import List, Optional
+from matplotlib.figure import Figure
+from matplotlib.transforms import nonsingular
+from PIL import Image
+from cachetools import TTLCache
+from typing import List, Optional, Tuple
 
-from backend_projeto.infrastructure.utils.config import Settings
+from backend_projeto.infrastructure.utils.config import Settings, settings
 from backend_projeto.infrastructure.data_handling import YFinanceProvider
+from backend_projeto.infrastructure.utils.jit import NUMBA_AVAILABLE, njit, prange
+from backend_projeto.infrastructure.visualization._figure_pool import _pooled_figure
 from backend_projeto.domain.financial_math import _returns_from_prices, _annualize_mean_cov
 
+# DPI padrão da imagem da fronteira eficiente: 10×6 pol. saem com 1000×600 px,
+# suficiente para exibição web
+_FRONTIER_DPI = 100
+
+# Formatos de saída aceitos: nome -> (formato do Pillow, opções do codificador)
+_IMAGE_FORMATS = {
+    'png': ('PNG', {'optimize': False, 'compress_level': 1}),
+    # WebP sem perdas: ~25-35% menor que o PNG para gráficos de áreas de cor sólida
+    'webp': ('WEBP', {'lossless': True, 'method': 1}),
+}
+
+# Buffer de saída reaproveitado por thread entre as chamadas
+_OUT_BUF = threading.local()
+
+# Tamanho mínimo de cada lote da amostragem NumPy da fronteira
+_FRONTIER_MIN_BLOCK = 1024
+# Teto de elementos (linhas × ativos) por lote: ~32 MB em float64. Com limites muito
+# apertados a taxa de aceitação observada pode ser ínfima e pediria lotes de vários GB
+_FRONTIER_MAX_BLOCK_ELEMS = 1 << 22
+
+# Resolução horizontal do hexbin da fronteira
+_FRONTIER_GRIDSIZE = 60
+
+# μ e fator de Cholesky por (ativos, período), compartilhados entre requisições.
+# Só é usado quando ENABLE_CACHE está ativo
+_FRONTIER_MOMENTS_CACHE: TTLCache = TTLCache(maxsize=64, ttl=settings.CACHE_TTL_SECONDS)
+_FRONTIER_MOMENTS_CACHE_LOCK = threading.Lock()
+
+
+def _frontier_axes(fig: Figure) -> tuple:
+    """Cria os eixos do gráfico da fronteira e o eixo fixo da barra de cores."""
+    gs = fig.add_gridspec(1, 2, width_ratios=[40, 1], wspace=0.05,
+                          left=0.08, right=0.92, top=0.92, bottom=0.1)
+    return (fig.add_subplot(gs[0]), fig.add_subplot(gs[1]))
+
+
+def _hexbin_cell_means(x: np.ndarray, y: np.ndarray, c: np.ndarray,
+                       gridsize: int, extent: tuple) -> tuple:
+    """Agrega os pontos nas células do hexbin do Matplotlib e tira a média de `c` por célula.
+
+    Reproduz a grade de `Axes.hexbin` (duas redes deslocadas, com o mesmo
+    preenchimento em x) para a mesma `extent`. Com `C=` o hexbin distribui os
+    valores pelas células em um laço Python por ponto; passando só o centro de
+    cada célula ocupada com a média já calculada, o desenho é o mesmo e o laço
+    cai para uma iteração por célula.
+
+    Retorna:
+        tuple: Coordenadas x e y dos centros das células ocupadas e a média de `c` em cada uma.
+    """
+    xmin, xmax, ymin, ymax = extent
+    nx = gridsize
+    ny = int(nx / math.sqrt(3))
+    padding = 1.e-9 * (xmax - xmin)
+    xmin -= padding
+    xmax += padding
+    sx = (xmax - xmin) / nx
+    sy = (ymax - ymin) / ny
+    ix = (x - xmin) / sx
+    iy = (y - ymin) / sy
+    ix1, iy1 = np.round(ix), np.round(iy)
+    ix2, iy2 = np.floor(ix) + 0.5, np.floor(iy) + 0.5
+    # Cada ponto fica no centro mais próximo entre as duas redes (y pesa 3× na métrica)
+    on1 = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2 < (ix - ix2) ** 2 + 3.0 * (iy - iy2) ** 2
+    centers = np.column_stack([np.where(on1, ix1, ix2), np.where(on1, iy1, iy2)])
+    cells, inverse = np.unique(centers, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    means = np.bincount(inverse, weights=c) / np.bincount(inverse)
+    return cells[:, 0] * sx + xmin, cells[:, 1] * sy + ymin, means
+
+
+def _encode_image(fig: Figure, dpi: int, fmt: str = 'png') -> bytes:
+    """Renderiza a figura no canvas Agg e codifica o buffer RGBA com o Pillow (PNG ou WebP sem perdas)."""
+    if fmt not in _IMAGE_FORMATS:
+        raise ValueError(f"Formato de imagem não suportado: {fmt!r}; use um de {sorted(_IMAGE_FORMATS)}")
+    pil_format, options = _IMAGE_FORMATS[fmt]
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    out = getattr(_OUT_BUF, 'buf', None)
+    if out is None:
+        out = _OUT_BUF.buf = io.BytesIO()
+    out.seek(0)
+    out.truncate()
+    Image.fromarray(rgba).save(out, format=pil_format, **options)
+    return out.getvalue()
+
+
+def _frontier_cholesky(cov: np.ndarray) -> np.ndarray:
+    """Fator de Cholesky inferior L (Σ = L·Lᵀ) da covariância, em float64 C-contíguo.
+
+    Se Σ não for numericamente positiva definida, os autovalores são truncados
+    em um piso pequeno antes da fatoração.
+    """
+    n = cov.shape[0]
+    try:
+        L = np.linalg.cholesky(cov + 1e-12 * np.eye(n))
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh(cov)
+        floor = 1e-12 * max(float(vals.max()), 1.0)
+        L = np.linalg.cholesky((vecs * np.maximum(vals, floor)) @ vecs.T)
+    return np.ascontiguousarray(L, dtype=np.float64)
+
+
+@njit(parallel=True, cache=True)
+def _sample_frontier(mu, L, n_samples, max_weight, rf):
+    """Amostra carteiras Dirichlet(1, ..., 1) e calcula retorno, volatilidade e Sharpe.
+
+    Cada amostra é independente (paralelo sobre as amostras); pesos acima de
+    `max_weight` são rejeitados e sorteados de novo. A volatilidade é
+    ||Lᵀw||₂, um produto triangular em vez de wᵀΣw.
+
+    Todo o cálculo é em float32: o resultado só vira cores e pixels no gráfico,
+    e metade da largura por valor dobra as lanes SIMD por instrução.
+
+    Parâmetros:
+        mu (np.ndarray): Retornos esperados anualizados (n,), float32.
+        L (np.ndarray): Fator de Cholesky inferior da covariância anualizada (n×n), float32.
+        n_samples (int): Número de carteiras.
+        max_weight (float): Peso máximo por ativo.
+        rf (float): Taxa livre de risco.
+
+    Retorna:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Retornos, volatilidades e Sharpes (float32).
+    """
+    n = mu.shape[0]
+    max_weight = np.float32(max_weight)
+    rf = np.float32(rf)
+    eps = np.float32(1e-12)
+    R = np.empty(n_samples, dtype=np.float32)
+    V = np.empty(n_samples, dtype=np.float32)
+    S = np.empty(n_samples, dtype=np.float32)
+    # Pesos em um único buffer (n_samples, n) linha-major: cada amostra lê uma linha contígua
+    W = np.empty((n_samples, n), dtype=np.float32)
+    Y = np.empty((n_samples, n), dtype=np.float32)
+    for s in prange(n_samples):
+        w = W[s]
+        y = Y[s]
+        while True:
+            # Dirichlet(1, ..., 1) = exponenciais normalizadas
+            tot = np.float32(0.0)
+            for j in range(n):
+                w[j] = np.float32(np.random.exponential(1.0))
+                tot += w[j]
+            wmax = np.float32(0.0)
+            for j in range(n):
+                w[j] /= tot
+                if w[j] > wmax:
+                    wmax = w[j]
+            if wmax <= max_weight:
+                break
+        ret = np.float32(0.0)
+        for j in range(n):
+            ret += w[j] * mu[j]
+        # y = Lᵀw percorrendo L por linhas (só o triângulo inferior)
+        y[:] = 0.0
+        for i in range(n):
+            wi = w[i]
+            for j in range(i + 1):
+                y[j] += L[i, j] * wi
+        var = np.float32(0.0)
+        for j in range(n):
+            var += y[j] * y[j]
+        vol = np.sqrt(var)
+        R[s] = ret
+        V[s] = vol
+        S[s] = (ret - rf) / (vol + eps)
+    return R, V, S
+
+
+def _sample_frontier_numpy(mu: np.ndarray, L: np.ndarray, n_samples: int, max_weight: float, rf: float):
+    """Versão NumPy de `_sample_frontier`, usada quando o Numba não está disponível.
+
+    Sorteia as carteiras em lotes (m, K) e descarta por máscara as que excedem
+    `max_weight`. Cada lote é dimensionado pela taxa de aceitação observada até
+    ali (com folga de 20% e no mínimo `_FRONTIER_MIN_BLOCK` linhas), então limites
+    apertados não degeneram em muitos lotes pequenos; `_FRONTIER_MAX_BLOCK_ELEMS`
+    limita a memória de cada lote.
+    """
+    n = len(mu)
+    max_block = max(_FRONTIER_MAX_BLOCK_ELEMS // n, _FRONTIER_MIN_BLOCK)
+    batches = []
+    missing = n_samples
+    drawn = accepted = 0
+    while missing > 0:
+        rate = accepted / drawn if accepted else 0.5
+        block = min(max(int(1.2 * missing / rate), _FRONTIER_MIN_BLOCK), max_block)
+        # Dirichlet(1, ..., 1) = exponenciais normalizadas
+        W = np.random.standard_exponential((block, n))
+        W /= W.sum(axis=1, keepdims=True)
+        W = W[W.max(axis=1) <= max_weight]  # respeitar limite por ativo
+        drawn += block
+        accepted += len(W)
+        batches.append(W[:missing])
+        missing -= len(batches[-1])
+    W = np.concatenate(batches)
+    R = W @ mu
+    V = np.linalg.norm(W @ L, axis=1)
+    return R, V, (R - rf) / (V + 1e-12)
+
+
+def _frontier_moments(loader: YFinanceProvider, config: Settings, assets: List[str],
+                      start_date: str, end_date: str) -> Tuple[np.ndarray, np.ndarray]:
+    """μ anualizado e fator de Cholesky da covariância anualizada dos `assets` no período.
+
+    Com ENABLE_CACHE, o par fica em `_FRONTIER_MOMENTS_CACHE` e uma nova requisição
+    para os mesmos ativos e datas não busca preços nem refaz a covariância. Os
+    arrays retornados são compartilhados e não devem ser alterados.
+    """
+    key = (tuple(assets), start_date, end_date, config.DIAS_UTEIS_ANO)
+    if config.ENABLE_CACHE:
+        with _FRONTIER_MOMENTS_CACHE_LOCK:
+            cached = _FRONTIER_MOMENTS_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    prices = loader.fetch_stock_prices(assets, start_date, end_date)
+    rets = _returns_from_prices(prices)[assets].dropna()
+    if rets.shape[1] < 2:
+        raise ValueError("São necessários pelo menos 2 ativos para a fronteira eficiente")
+
+    mu, cov = _annualize_mean_cov(rets, config.DIAS_UTEIS_ANO)
+    moments = (np.ascontiguousarray(mu, dtype=np.float64),
+               _frontier_cholesky(np.asarray(cov, dtype=np.float64)))
+
+    if config.ENABLE_CACHE:
+        with _FRONTIER_MOMENTS_CACHE_LOCK:
+            _FRONTIER_MOMENTS_CACHE[key] = moments
+    return moments
+
 
 def efficient_frontier_image(
     loader: YFinanceProvider,
@@ -23,54 +259,37 @@ def efficient_frontier_image(
     long_only: bool = True,
     max_weight: Optional[float] = None,
     rf: float = 0.0,
+    dpi: int = _FRONTIER_DPI,
+    fmt: str = 'png',
 ) -> bytes:
     """Gera um gráfico (PNG) da fronteira eficiente por amostragem aleatória de carteiras.
 
+    `dpi` controla a resolução (100 basta para a web) e `fmt='webp'` troca o PNG
+    por WebP sem perdas, menor para o mesmo gráfico.
+
     Observação: implementação suporta apenas *long_only* no momento.
     """
     if not long_only:
         raise ValueError("A visualização suporta apenas long_only=True no momento.")
 
-    prices = loader.fetch_stock_prices(assets, start_date, end_date)
-    rets = _returns_from_prices(prices)[assets].dropna()
-    if rets.shape[1] < 2:
-        raise ValueError("São necessários pelo menos 2 ativos para a fronteira eficiente")
-
-    mu, cov = _annualize_mean_cov(rets, config.DIAS_UTEIS_ANO)
+    mu, L = _frontier_moments(loader, config, assets, start_date, end_date)
     n = len(assets)
 
-    R = []
-    V = []
-    S = []
-
-    i = 0
     maxw = 1.0 if max_weight is None else float(max_weight)
-    while i < n_samples:
-        # amostra Dirichlet para pesos positivos que somam 1
-        w = np.random.dirichlet(np.ones(n))
-        if max_weight is not None and (w.max() > maxw):
-            continue  # respeitar limite por ativo
-        ret = float(w @ mu)
-        vol = float(np.sqrt(max(w @ cov @ w, 0.0)))
-        sharpe = (ret - rf) / (vol + 1e-12)
-        R.append(ret)
-        V.append(vol)
-        S.append(sharpe)
-        i += 1
-
-    R = np.array(R)
-    V = np.array(V)
-    S = np.array(S)
+    if maxw * n < 1.0:
+        # Nenhuma carteira que soma 1 respeitaria o limite; a amostragem nunca terminaria
+        raise ValueError("max_weight muito baixo: max_weight * número de ativos deve ser >= 1")
+
+    if NUMBA_AVAILABLE:
+        # O kernel roda em float32; as entradas são convertidas uma única vez
+        R, V, S = _sample_frontier(mu.astype(np.float32), L.astype(np.float32),
+                                   int(n_samples), maxw, float(rf))
+    else:
+        R, V, S = _sample_frontier_numpy(mu, L, int(n_samples), maxw, float(rf))
 
     best = int(np.argmax(S))
 
-    plt.figure(figsize=(10, 6)) # Aumentar um pouco o tamanho para melhor visualização
-    sc = plt.scatter(V, R, c=S, cmap="viridis", s=12, alpha=0.85, label="Portfólios Simulados")
-    plt.colorbar(sc, label="Sharpe Ratio")
-    
     # Portfólio de Máximo Sharpe (Tangência)
-    plt.scatter([V[best]], [R[best]], color="red", marker="*", s=200, label="Max Sharpe Portfólio")
-    
     # Capital Market Line (CML)
     # A CML conecta o risk-free rate ao portfólio de tangência
     # Equação da CML: E(Rp) = Rf + (E(Rm) - Rf) / Std(Rm) * Std(Rp)
@@ -80,21 +299,31 @@ def efficient_frontier_image(
     vol_tangency = V[best]
     ret_tangency = R[best]
 
-    # Gerar pontos para a linha CML
-    x_cml = np.linspace(0, max(V) * 1.1, 100) # Vai de 0 até um pouco além da volatilidade máxima
+    # A CML é uma reta: bastam os extremos, de 0 até um pouco além da volatilidade máxima
+    x_cml = np.array([0.0, float(V.max()) * 1.1])
     y_cml = rf + sharpe_tangency * x_cml
-    
-    plt.plot(x_cml, y_cml, color='green', linestyle='--', linewidth=2, label="Capital Market Line (CML)")
-    
-    plt.xlabel("Volatilidade (Desvio Padrão Anualizado)")
-    plt.ylabel("Retorno Anualizado")
-    plt.title("Fronteira Eficiente e Capital Market Line", fontsize=14, fontweight='bold')
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", dpi=150)
-    plt.close()
-    buf.seek(0)
-    return buf.read()
+
+    # Figura e eixos reaproveitados entre chamadas (tamanho maior para melhor visualização)
+    with _pooled_figure(('frontier',), (10, 6), _frontier_axes) as (fig, (ax, cax)):
+        # Hexbin com o Sharpe médio por célula: mesma informação do scatter, mas com
+        # O(gridsize²) polígonos em vez de um marcador por carteira. As médias são
+        # agregadas antes, então o hexbin só recebe um ponto por célula ocupada
+        extent = (*nonsingular(float(V.min()), float(V.max()), expander=0.1),
+                  *nonsingular(float(R.min()), float(R.max()), expander=0.1))
+        hx, hy, hc = _hexbin_cell_means(V.astype(np.float64), R.astype(np.float64),
+                                        S.astype(np.float64), _FRONTIER_GRIDSIZE, extent)
+        hb = ax.hexbin(hx, hy, C=hc, gridsize=_FRONTIER_GRIDSIZE, extent=extent,
+                       reduce_C_function=np.mean, cmap="viridis", mincnt=1,
+                       label="Portfólios Simulados")
+        fig.colorbar(hb, cax=cax, label="Sharpe Ratio")
+        
+        ax.scatter([vol_tangency], [ret_tangency], color="red", marker="*", s=200, label="Max Sharpe Portfólio", zorder=3)
+        ax.plot(x_cml, y_cml, color='green', linestyle='--', linewidth=2, label="Capital Market Line (CML)")
+        
+        ax.set_xlabel("Volatilidade (Desvio Padrão Anualizado)")
+        ax.set_ylabel("Retorno Anualizado")
+        ax.set_title("Fronteira Eficiente e Capital Market Line", fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+
+        return _encode_image(fig, dpi, fmt)
@@ -0,0 +1,313 @@
+"""
+Testes unitários para o AdvancedVisualizer.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from backend_projeto.infrastructure.visualization.advanced_visualization import (
+    AdvancedVisualizer,
+    _simulate_portfolios,
+    _simulate_portfolios_numpy,
+    _lttb_indices,
+    _drawdown_1pass,
+    _drawdown_numpy,
+    _risk_metric_columns,
+    _rolling_corr,
+)
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+# Fixtures
+@pytest.fixture
+def returns():
+    idx = pd.bdate_range('2023-01-02', periods=300)
+    rng = np.random.default_rng(5)
+    return pd.DataFrame(rng.normal(0.0005, 0.015, (len(idx), 3)), index=idx,
+                        columns=['PETR4.SA', 'VALE3.SA', 'ITUB4.SA'])
+
+@pytest.fixture
+def prices(returns):
+    return 100 * (1 + returns).cumprod()
+
+@pytest.fixture
+def visualizer():
+    AdvancedVisualizer.clear_cache()
+    yield AdvancedVisualizer()
+    AdvancedVisualizer.clear_cache()
+
+# Testes para o cache de PNGs
+class TestPngCache:
+    def test_repeated_call_skips_rendering(self, visualizer, returns):
+        with patch.object(AdvancedVisualizer, '_save_plot', wraps=visualizer._save_plot) as save:
+            first = visualizer.plot_drawdown(returns['PETR4.SA'])
+            # Nova instância, mesmo conteúdo: o cache é compartilhado
+            second = AdvancedVisualizer().plot_drawdown(returns['PETR4.SA'].copy())
+
+        assert first[:8] == PNG_MAGIC
+        assert second == first
+        assert save.call_count == 1
+
+    def test_changed_data_or_arguments_rerender(self, visualizer, returns):
+        with patch.object(AdvancedVisualizer, '_save_plot', wraps=visualizer._save_plot) as save:
+            visualizer.plot_drawdown(returns['PETR4.SA'])
+            changed = returns['PETR4.SA'].copy()
+            changed.iloc[150] += 0.01
+            visualizer.plot_drawdown(changed)
+            visualizer.plot_drawdown(returns['PETR4.SA'], title="Outro título")
+
+        assert save.call_count == 3
+
+    def test_correlation_is_shared_between_heatmap_and_dashboard(self, visualizer, prices, returns):
+        assets = list(returns.columns)
+        with patch.object(pd.DataFrame, 'corr', autospec=True, side_effect=pd.DataFrame.corr) as corr:
+            visualizer.plot_correlation_heatmap(returns, assets)
+            visualizer.plot_comprehensive_dashboard(prices, returns, assets)
+            changed = returns.copy()
+            changed.iloc[0, 0] += 0.01
+            visualizer.plot_correlation_heatmap(changed, assets)
+
+        assert corr.call_count == 2
+
+# Testes para os gráficos de preço
+class TestPriceCharts:
+    def test_candlestick_draws_one_collection_per_layer(self, visualizer, prices):
+        captured = {}
+
+        def capture(fig, dpi=150):
+            captured['axes'] = fig.axes
+            return PNG_MAGIC
+
+        with patch.object(AdvancedVisualizer, '_save_plot', side_effect=capture):
+            visualizer.plot_candlestick(prices, 'PETR4.SA', simulate=True)
+
+        ax = captured['axes'][0]
+        assert len(ax.patches) == 0 and len(ax.lines) == 0
+        wicks, bodies = ax.collections
+        assert len(wicks.get_segments()) == len(bodies.get_paths()) == len(prices)
+        assert ax.get_ylim()[0] <= prices['PETR4.SA'].min() <= prices['PETR4.SA'].max() <= ax.get_ylim()[1]
+
+    def test_candlestick_requires_ohlc_unless_simulated(self, visualizer, prices):
+        with pytest.raises(ValueError, match="simulate=True"):
+            visualizer.plot_candlestick(prices, 'PETR4.SA')
+
+        first = visualizer.plot_candlestick(prices, 'PETR4.SA', simulate=True)
+        AdvancedVisualizer.clear_cache()
+        assert visualizer.plot_candlestick(prices, 'PETR4.SA', simulate=True) == first
+
+    def test_price_comparison_plots_all_assets_in_one_call(self, visualizer, prices):
+        captured = {}
+
+        def capture(fig, dpi=150):
+            captured['axes'] = fig.axes
+            return PNG_MAGIC
+
+        staggered = prices.copy()
+        staggered.iloc[:20, 1] = np.nan
+        with patch.object(AdvancedVisualizer, '_save_plot', side_effect=capture):
+            visualizer.plot_price_comparison(staggered, ['PETR4.SA', 'VALE3.SA', 'BBDC4.SA'])
+
+        ax = captured['axes'][0]
+        assert [line.get_label() for line in ax.lines] == ['PETR4.SA (Normalizado)', 'VALE3.SA (Normalizado)']
+        # Cada ativo parte de 100 no seu primeiro preço válido
+        vale = ax.lines[1].get_ydata()
+        assert np.isnan(vale[:20]).all() and vale[20] == pytest.approx(100.0)
+
+# Testes para a redução de séries longas
+class TestDownsampling:
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        x = np.arange(20000, dtype=float)
+        y = np.sin(x / 500.0)
+        y[7321] = 5.0
+        y[15002] = -5.0
+
+        keep = _lttb_indices(x, y, 1000)
+
+        assert len(keep) == 1000 and keep[0] == 0 and keep[-1] == len(x) - 1
+        assert np.all(np.diff(keep) > 0)
+        assert 7321 in keep and 15002 in keep
+
+    def test_short_series_are_plotted_untouched(self, visualizer, returns):
+        fig, _ = visualizer._acquire_fig(figsize=(14, 8))
+        x, y = visualizer._xy(fig, returns['PETR4.SA'])
+        assert len(x) == len(y) == len(returns)
+
+    def test_long_frames_keep_shared_x_for_all_columns(self, visualizer):
+        idx = pd.bdate_range('1990-01-01', periods=20000)
+        frame = pd.DataFrame(np.sin(np.arange(len(idx))[:, None] / [500.0, 300.0]), index=idx)
+        frame.iloc[7321, 0] = 5.0
+        frame.iloc[15002, 1] = -5.0
+        fig, _ = visualizer._acquire_fig(figsize=(4, 3))
+        x, y = visualizer._xy_frame(fig, frame)
+        visualizer._release_fig(fig)
+
+        # Os picos de cada coluna sobrevivem na união dos pontos
+        assert y.shape == (len(x), 2) and 800 <= len(x) <= 1600
+        assert idx[7321] in x and idx[15002] in x
+        assert 5.0 in y[:, 0] and -5.0 in y[:, 1]
+
+# Testes para o drawdown
+class TestDrawdown:
+    @pytest.mark.parametrize("kernel", [_drawdown_1pass, _drawdown_numpy])
+    def test_matches_pandas_and_skips_nan(self, kernel, returns):
+        ret = returns['PETR4.SA'].copy()
+        ret.iloc[1] = -0.05
+        ret.iloc[[0, 40, 41]] = np.nan
+        cum = (1 + ret).cumprod()
+        expected = cum / cum.cummax() - 1
+
+        dd, max_dd = kernel(ret.to_numpy())
+
+        np.testing.assert_allclose(dd, expected.to_numpy(), equal_nan=True)
+        assert max_dd == pytest.approx(expected.min())
+
+# Testes para as métricas de risco
+class TestRiskMetrics:
+    def test_columns_match_per_asset_dropna(self, returns):
+        rets = returns.copy()
+        rets.iloc[:30, 0] = np.nan
+
+        metrics = _risk_metric_columns(rets)
+
+        for j, asset in enumerate(rets.columns):
+            ret = rets[asset].dropna()
+            cum = (1 + ret).cumprod()
+            assert metrics['Volatility'][j] == pytest.approx(ret.std() * np.sqrt(252))
+            assert metrics['Sharpe'][j] == pytest.approx(ret.mean() / ret.std() * np.sqrt(252))
+            assert metrics['Max DD'][j] == pytest.approx((cum / cum.cummax() - 1).min())
+            assert metrics['VaR 95%'][j] == pytest.approx(ret.quantile(0.05))
+
+# Testes para a correlação rolante
+class TestRollingCorrelation:
+    @pytest.mark.parametrize("window", [5, 30])
+    def test_matches_pandas_including_nan_windows(self, returns, window):
+        a, b = returns['PETR4.SA'].copy(), returns['VALE3.SA'] + 0.5 * returns['PETR4.SA']
+        a.iloc[[10, 100]] = np.nan
+        b.iloc[200] = np.nan
+
+        result = _rolling_corr(a, b, window)
+        expected = a.rolling(window).corr(b)
+
+        pd.testing.assert_index_equal(result.index, expected.index)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+# Testes para o dashboard
+class TestDashboard:
+    def test_correlation_annotations_are_skipped_for_large_universes(self, visualizer):
+        idx = pd.bdate_range('2023-01-02', periods=120)
+        rng = np.random.default_rng(9)
+        captured = []
+
+        def capture(fig, dpi=150):
+            captured.append(fig.axes)
+            return PNG_MAGIC
+
+        with patch.object(AdvancedVisualizer, '_save_plot', side_effect=capture):
+            for n in (3, 20):
+                assets = [f'A{i}' for i in range(n)]
+                rets = pd.DataFrame(rng.normal(0, 0.01, (len(idx), n)), index=idx, columns=assets)
+                visualizer.plot_comprehensive_dashboard(100 * (1 + rets).cumprod(), rets, assets)
+
+        corr_small, corr_large = captured[0][3], captured[1][3]
+        assert corr_small.get_title() == corr_large.get_title() == 'Matriz de Correlação'
+        assert len(corr_small.texts) == 9
+        assert len(corr_large.texts) == 0
+
+    def test_default_and_explicit_dpi(self, visualizer, prices, returns):
+        assets = list(returns.columns)
+        default = visualizer.plot_comprehensive_dashboard(prices, returns, assets)
+        small = visualizer.plot_comprehensive_dashboard(prices, returns, assets, dpi=50)
+
+        # Largura e altura no cabeçalho IHDR: 20×16 pol. a 100 DPI
+        assert int.from_bytes(default[16:20], 'big') == 2000
+        assert int.from_bytes(default[20:24], 'big') == 1600
+        assert int.from_bytes(small[16:20], 'big') == 1000
+
+# Testes para a fronteira eficiente
+class TestEfficientFrontier:
+    @pytest.mark.parametrize("simulate", [_simulate_portfolios, _simulate_portfolios_numpy])
+    def test_simulated_portfolios_match_quadratic_form(self, simulate, returns):
+        mean = returns.mean().to_numpy() * 252
+        cov = returns.cov().to_numpy() * 252
+        uniforms = np.random.default_rng(3).random((500, 3))
+
+        rets, vols, sharpes, weights = simulate(mean, cov, uniforms)
+
+        expected_w = uniforms / uniforms.sum(axis=1, keepdims=True)
+        np.testing.assert_allclose(weights, expected_w)
+        np.testing.assert_allclose(rets, expected_w @ mean)
+        np.testing.assert_allclose(vols, np.sqrt(np.einsum('ij,jk,ik->i', expected_w, cov, expected_w)))
+        np.testing.assert_allclose(sharpes, rets / vols)
+
+# Testes para a serialização do PNG
+class TestSavePlot:
+    def test_output_buffer_is_reused_without_stale_bytes(self, visualizer, returns):
+        big = visualizer.plot_performance_metrics(returns)
+        small = visualizer.plot_drawdown(returns['PETR4.SA'])
+
+        # Pré-alocado pelo maior PNG, mas cada gráfico devolve só os próprios bytes
+        assert small[:8] == PNG_MAGIC and small.endswith(b'IEND\xaeB`\x82')
+        assert len(visualizer._buf.getbuffer()) >= len(big) > len(small)
+
+# Testes para o pool de figuras
+class TestFigurePool:
+    def test_figures_are_reused_and_render_identically(self, visualizer, returns):
+        first = visualizer.plot_drawdown(returns['PETR4.SA'])
+        fig, _ = visualizer._acquire_fig(figsize=(14, 8))
+        visualizer._release_fig(fig)
+        AdvancedVisualizer.clear_cache()
+
+        with patch('backend_projeto.infrastructure.visualization._figure_pool.Figure') as new_figure:
+            second = visualizer.plot_drawdown(returns['PETR4.SA'])
+
+        new_figure.assert_not_called()
+        assert second == first
+
+    def test_release_drops_colorbars_and_suptitle(self, visualizer, returns):
+        visualizer.plot_efficient_frontier_advanced(returns, list(returns.columns), n_portfolios=200)
+        fig, (ax1, ax2) = visualizer._acquire_fig(1, 2, figsize=(16, 8))
+
+        # Figuras que ganharam colorbar são descartadas em vez de reaproveitadas
+        assert fig.axes == [ax1, ax2]
+        assert not ax1.collections and not ax2.patches
+        visualizer._release_fig(fig)
+
+        visualizer.plot_risk_metrics(returns, list(returns.columns))
+        fig, axes = visualizer._acquire_fig(2, 2, figsize=(16, 12))
+        assert fig.get_suptitle() == ''
+        assert all(not ax.get_title() and ax.get_in_layout() for ax in axes.flat)
+        visualizer._release_fig(fig)
+
+# Testes para os gráficos de performance
+class TestPerformanceCharts:
+    def test_performance_metrics_plots_one_line_per_column(self, visualizer, returns):
+        captured = {}
+
+        def capture(fig, dpi=150):
+            captured['axes'] = fig.axes
+            return PNG_MAGIC
+
+        with patch.object(AdvancedVisualizer, '_save_plot', side_effect=capture):
+            visualizer.plot_performance_metrics(returns)
+
+        cum_ax, sharpe_ax, vol_ax, _ = captured['axes']
+        for ax in (cum_ax, sharpe_ax, vol_ax):
+            assert [line.get_label() for line in ax.lines] == list(returns.columns)
+        np.testing.assert_allclose(cum_ax.lines[1].get_ydata(), (1 + returns['VALE3.SA']).cumprod().to_numpy())
+
+# Testes para os gráficos de distribuição
+class TestDistributionCharts:
+    def test_histograms_are_single_rasterized_polygons(self, visualizer, returns):
+        captured = {}
+
+        def capture(fig, dpi=150):
+            captured['axes'] = fig.axes
+            return PNG_MAGIC
+
+        with patch.object(AdvancedVisualizer, '_save_plot', side_effect=capture):
+            visualizer.plot_return_distribution(returns, list(returns.columns))
+
+        for ax in captured['axes'][:3]:
+            (hist,) = ax.patches
+            assert hist.get_rasterized()
@@ -7,7 +7,8 @@ import pandas as pd
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
-from backend_projeto.domain.optimization import OptimizationEngine
+from backend_projeto.domain.optimization import OptimizationEngine, _MOMENTS_CACHE
+from backend_projeto.domain.financial_math import _annualize_mean_cov
 from backend_projeto.domain.simulation import MonteCarloEngine
 from backend_projeto.infrastructure.data_handling import YFinanceProvider
 from backend_projeto.infrastructure.utils.config import Settings
@@ -53,6 +54,17 @@ class TestOptimizationEngine:
         assert all(asset in result.columns for asset in assets)
         mock_loader.fetch_stock_prices.assert_called_once_with(assets, start_date, end_date)
 
+    def test_annualize_mean_cov_matches_pandas(self):
+        rng = np.random.default_rng(11)
+        rets = pd.DataFrame(rng.normal(0.0005, 0.02, (500, 4)))
+        mu, cov = _annualize_mean_cov(rets, 252)
+        np.testing.assert_allclose(mu, rets.mean().to_numpy() * 252)
+        np.testing.assert_allclose(cov, rets.cov().to_numpy() * 252, rtol=1e-10)
+
+        # Com lacunas, cai na covariância por pares completos do pandas
+        rets.iloc[3, 1] = np.nan
+        np.testing.assert_allclose(_annualize_mean_cov(rets, 252)[1], rets.cov().to_numpy() * 252)
+
     def test_optimize_markowitz_invalid_assets(self, optimization_engine):
         # Teste com menos de 2 ativos
         # Mock load_prices to return a single asset DataFrame
@@ -99,6 +111,59 @@ class TestOptimizationEngine:
         assert all(0 <= w <= 1 for w in result['weights'].values())
         assert abs(sum(result['weights'].values()) - 1.0) < 1e-6
 
+    def test_optimize_markowitz_min_var_analytic_and_cached(self, optimization_engine, mock_loader):
+        # Configuração
+        idx = pd.date_range('2023-01-01', periods=250, freq='B')
+        rng = np.random.default_rng(1)
+        prices = pd.DataFrame({
+            'PETR4.SA': 10 * np.cumprod(1 + rng.normal(0, 0.02, len(idx))),
+            'VALE3.SA': 70 * np.cumprod(1 + rng.normal(0, 0.015, len(idx))),
+            'ITUB4.SA': 25 * np.cumprod(1 + rng.normal(0, 0.01, len(idx))),
+        }, index=idx)
+        mock_loader.fetch_stock_prices.return_value = prices
+        optimization_engine.config.ENABLE_CACHE = True
+        _MOMENTS_CACHE.clear()
+        assets = ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA']
+
+        # Execução
+        min_var = optimization_engine.optimize_markowitz(assets, '2023-01-01', '2023-12-31', objective='min_var', long_only=False)
+        optimization_engine.optimize_markowitz(assets, '2023-01-01', '2023-12-31', objective='max_return')
+        _MOMENTS_CACHE.clear()
+
+        # Verificação
+        cov = optimization_engine._markowitz_moments(assets, '2023-01-01', '2023-12-31', True)['cov']
+        expected = np.linalg.solve(cov, np.ones(len(assets)))
+        expected /= expected.sum()
+        assert min_var['success']
+        for i, a in enumerate(assets):
+            assert min_var['weights'][a] == pytest.approx(expected[i], abs=1e-10)
+        assert mock_loader.fetch_stock_prices.call_count == 2
+
+    def test_capm_metrics_matches_lstsq(self, optimization_engine, mock_loader):
+        # Configuração
+        idx = pd.date_range('2023-01-01', periods=120, freq='B')
+        rng = np.random.default_rng(0)
+        bench = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, len(idx))), index=idx)
+        prices = pd.DataFrame({
+            'PETR4.SA': 10 * np.cumprod(1 + rng.normal(0, 0.02, len(idx))),
+            'VALE3.SA': 70 * np.cumprod(1 + rng.normal(0, 0.015, len(idx))),
+        }, index=idx)
+        mock_loader.fetch_stock_prices.return_value = prices
+        mock_loader.fetch_benchmark_data.return_value = bench
+
+        # Execução
+        result = optimization_engine.capm_metrics(['PETR4.SA', 'VALE3.SA'], '2023-01-01', '2023-06-30', '^BVSP')
+
+        # Verificação
+        rets = prices.join(bench.rename('BENCH'), how='inner').pct_change().dropna()
+        X = np.column_stack([np.ones(len(rets)), rets['BENCH'].values])
+        for asset in ['PETR4.SA', 'VALE3.SA']:
+            expected, *_ = np.linalg.lstsq(X, rets[asset].values, rcond=None)
+            metrics = result['metrics'][asset]
+            assert metrics['alpha'] == pytest.approx(expected[0], abs=1e-10)
+            assert metrics['beta'] == pytest.approx(expected[1], abs=1e-10)
+            assert 0.0 <= metrics['r2'] <= 1.0
+
 # Testes para MonteCarloEngine
 class TestMonteCarloEngine:
     def test_portfolio_returns(self, monte_carlo_engine):
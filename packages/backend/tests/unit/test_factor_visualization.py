@@ -0,0 +1,35 @@
+"""
+Testes unitários para os gráficos de fatores em factor_visualization.py.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend_projeto.infrastructure.visualization.factor_visualization import (
+    plot_ff_factors,
+    plot_ff_betas,
+)
+
+# Fixtures
+@pytest.fixture
+def factors():
+    idx = pd.date_range('2015-01-31', periods=120, freq='M')
+    rng = np.random.default_rng(5)
+    return pd.DataFrame(rng.normal(0.0, 0.03, (len(idx), 5)), index=idx,
+                        columns=['MKT_RF', 'SMB', 'HML', 'RMW', 'CMA'])
+
+# Testes para os gráficos de fatores
+class TestFactorCharts:
+    def test_factors_render_identically_on_reused_figure(self, factors):
+        first = plot_ff_factors(factors)
+        assert first[:8] == b'\x89PNG\r\n\x1a\n'
+        assert plot_ff_factors(factors) == first
+
+    def test_betas_render_identically_on_reused_figure(self):
+        betas = {'beta_mkt': 1.1, 'beta_smb': -0.2, 'beta_hml': 0.3}
+        first = plot_ff_betas(betas)
+        assert plot_ff_betas(betas) == first
+
+    def test_factors_require_known_columns(self, factors):
+        with pytest.raises(ValueError, match="Nenhum fator"):
+            plot_ff_factors(factors.rename(columns=str.lower))
@@ -0,0 +1,153 @@
+"""
+Testes unitários para o InteractiveVisualizer.
+"""
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from plotly.utils import PlotlyJSONEncoder
+
+from backend_projeto.infrastructure.visualization.interactive_visualization import InteractiveVisualizer
+
+# Fixtures
+@pytest.fixture
+def returns():
+    idx = pd.bdate_range('2023-01-02', periods=300)
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(rng.normal(0.0005, 0.015, (len(idx), 3)), index=idx,
+                        columns=['PETR4.SA', 'VALE3.SA', 'ITUB4.SA'])
+
+@pytest.fixture
+def visualizer():
+    return InteractiveVisualizer()
+
+def capture_figure():
+    """Intercepta a figura passada a `_save_plot` e a serializa normalmente."""
+    captured = {}
+    save = InteractiveVisualizer._save_plot
+
+    def side_effect(self, fig):
+        captured['fig'] = fig
+        return save(self, fig)
+
+    return captured, patch.object(InteractiveVisualizer, '_save_plot', autospec=True, side_effect=side_effect)
+
+# Testes para a serialização
+class TestSavePlot:
+    def test_json_matches_plotly_encoder(self, visualizer, returns):
+        captured, patcher = capture_figure()
+        with patcher:
+            payload = visualizer.plot_interactive_portfolio_analysis(returns, list(returns.columns))
+
+        # O template só é resolvido na serialização
+        expected = json.dumps(captured['fig'].update_layout(template='plotly_white'), cls=PlotlyJSONEncoder)
+        assert json.loads(payload) == json.loads(expected)
+
+# Testes para o candlestick
+class TestCandlestick:
+    def test_simulated_ohlc_is_deterministic_and_brackets_body(self, visualizer, returns):
+        prices = (1 + returns).cumprod() * 20
+        with pytest.raises(ValueError, match="simulate=True"):
+            visualizer.plot_interactive_candlestick(prices, 'PETR4.SA')
+
+        payload = visualizer.plot_interactive_candlestick(prices, 'PETR4.SA', simulate=True)
+        assert visualizer.plot_interactive_candlestick(prices, 'PETR4.SA', simulate=True) == payload
+
+        candle = json.loads(payload)['data'][0]
+        o, h, l, c = (np.array(candle[k], dtype=float) for k in ('open', 'high', 'low', 'close'))
+        np.testing.assert_allclose(c, prices['PETR4.SA'])
+        np.testing.assert_allclose(o[1:], c[:-1])
+        assert (h >= np.maximum(o, c)).all() and (l <= np.minimum(o, c)).all()
+
+# Testes para a análise de portfólio
+class TestPortfolioAnalysis:
+    def test_precomputed_panels_match_per_asset_series(self, visualizer, returns):
+        rets = returns.copy()
+        rets.iloc[[0, 50], 1] = np.nan
+        fig = json.loads(visualizer.plot_interactive_portfolio_analysis(rets, list(rets.columns)))
+
+        traces = {trace['name']: trace for trace in fig['data']}
+        for asset in rets.columns:
+            cum = (1 + rets[asset]).cumprod()
+            drawdown = cum / cum.expanding().max() - 1
+            vol = rets[asset].rolling(30).std() * np.sqrt(252)
+            np.testing.assert_allclose(np.array(traces[asset]['y'], dtype=float), cum, equal_nan=True)
+            np.testing.assert_allclose(np.array(traces[f'{asset} DD']['y'], dtype=float), drawdown, equal_nan=True)
+            np.testing.assert_allclose(np.array(traces[f'{asset} Vol']['y'], dtype=float), vol, equal_nan=True)
+            assert len(traces[f'{asset} Dist']['x']) == rets[asset].notna().sum()
+
+    def test_long_series_are_downsampled(self, visualizer):
+        idx = pd.bdate_range('2000-01-03', periods=6000)
+        rng = np.random.default_rng(3)
+        rets = pd.DataFrame(rng.normal(0.0003, 0.01, (len(idx), 2)), index=idx, columns=['A', 'B'])
+        rets.iloc[4000, 0] = -0.3
+        fig = json.loads(visualizer.plot_interactive_portfolio_analysis(rets, ['A', 'B']))
+
+        traces = {trace['name']: trace for trace in fig['data']}
+        cum = (1 + rets['A']).cumprod()
+        y = np.array(traces['A']['y'], dtype=float)
+        assert len(y) == len(traces['A']['x']) == 2000
+        assert y[0] == pytest.approx(cum.iloc[0]) and y[-1] == pytest.approx(cum.iloc[-1])
+        # O LTTB mantém o tombo de -30%
+        assert min(traces['A DD']['y']) < -0.25
+        # O histograma continua com todos os retornos
+        assert len(traces['A Dist']['x']) == len(rets)
+
+# Testes para as métricas de risco
+class TestRiskMetrics:
+    def test_metrics_match_pandas(self, visualizer, returns):
+        rets = returns.copy()
+        rets.iloc[:10, 0] = np.nan
+        fig = json.loads(visualizer.plot_interactive_risk_metrics(rets, list(rets.columns)))
+
+        bars = {trace['name']: trace['y'] for trace in fig['data']}
+        for j, asset in enumerate(rets.columns):
+            ret = rets[asset].dropna()
+            cum = (1 + ret).cumprod()
+            assert bars['Volatility'][j] == pytest.approx(ret.std() * np.sqrt(252))
+            assert bars['Sharpe'][j] == pytest.approx(ret.mean() / ret.std() * np.sqrt(252))
+            assert bars['Max_DD'][j] == pytest.approx((cum / cum.expanding().max() - 1).min())
+            assert bars['VaR_95'][j] == pytest.approx(ret.quantile(0.05))
+            assert bars['Skewness'][j] == pytest.approx(ret.skew())
+            assert bars['Kurtosis'][j] == pytest.approx(ret.kurtosis())
+
+# Testes para a simulação Monte Carlo
+class TestMonteCarlo:
+    def test_paths_match_per_simulation_draws(self, visualizer, returns):
+        ret = returns['PETR4.SA']
+        fig = json.loads(visualizer.plot_interactive_monte_carlo(ret, n_simulations=150, n_days=20))
+
+        rng = np.random.RandomState(42)
+        expected = np.array([(1 + rng.normal(ret.mean(), ret.std(), 20)).cumprod() for _ in range(150)])
+
+        paths, *bands = fig['data']
+        assert paths['type'] == 'scattergl' and len(bands) == 5
+        # 100 trajetórias de 20 dias, cada uma seguida de um separador null
+        y = np.array(paths['y'], dtype=float).reshape(100, 21)
+        assert np.isnan(y[:, -1]).all()
+        # Trajetórias e percentis vão em float32
+        np.testing.assert_allclose(y[:, :-1], expected[:100], rtol=1e-6)
+        np.testing.assert_allclose(bands[2]['y'], np.median(expected, axis=0), rtol=1e-6)
+
+# Testes para a fronteira eficiente
+class TestEfficientFrontier:
+    def test_batched_portfolios_match_per_portfolio_loop(self, visualizer, returns):
+        assets = list(returns.columns)
+        fig = json.loads(visualizer.plot_interactive_efficient_frontier(returns, assets, n_portfolios=300))
+
+        mean, cov = returns.mean().to_numpy() * 252, returns.cov().to_numpy() * 252
+        rng = np.random.RandomState(42)
+        rets, vols = [], []
+        for _ in range(300):
+            w = rng.random_sample(3)
+            w /= w.sum()
+            rets.append(w @ mean)
+            vols.append(np.sqrt(w @ cov @ w))
+
+        cloud, best, min_vol = fig['data']
+        np.testing.assert_allclose(cloud['y'], rets, rtol=1e-9)
+        np.testing.assert_allclose(cloud['x'], vols, rtol=1e-9)
+        assert best['x'] == pytest.approx([vols[int(np.argmax(np.divide(rets, vols)))]])
+        assert min_vol['x'] == pytest.approx([min(vols)])
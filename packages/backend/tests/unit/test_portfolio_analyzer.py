@@ -7,7 +7,7 @@ import numpy as np
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timedelta
 
-from backend_projeto.domain.analysis import PortfolioAnalyzer
+from backend_projeto.domain.analysis import PortfolioAnalyzer, calculate_rolling_beta
 from backend_projeto.infrastructure.data_handling import YFinanceProvider
 from backend_projeto.infrastructure.utils.config import Settings
 
@@ -304,6 +304,27 @@ class TestPortfolioAnalyzerEdgeCases:
                 config=mock_config
             )
 
+# Testes para o beta rolante
+class TestRollingBeta:
+    @pytest.mark.parametrize('numba', [True, False])
+    def test_matches_pandas_rolling_cov_over_var(self, numba):
+        """Testa o beta por somas acumuladas contra o rolling do pandas, com lacunas."""
+        idx = pd.bdate_range('2023-01-02', periods=200)
+        rng = np.random.default_rng(3)
+        bench = pd.Series(rng.normal(0.0005, 0.01, len(idx)), index=idx)
+        asset = 1.3 * bench + pd.Series(rng.normal(0, 0.005, len(idx)), index=idx)
+        asset.iloc[[40, 120]] = np.nan
+        bench.iloc[150] = np.nan
+
+        with patch('backend_projeto.domain.portfolio_analyzer.NUMBA_AVAILABLE', numba):
+            beta = calculate_rolling_beta(asset, bench.iloc[5:], window=30)
+
+        a, b = asset.align(bench.iloc[5:], join='inner')
+        expected = (a.rolling(30).cov(b) / b.rolling(30).var()).dropna()
+        assert beta.index.equals(expected.index)
+        np.testing.assert_allclose(beta.to_numpy(), expected.to_numpy(), rtol=1e-8)
+        assert calculate_rolling_beta(asset.iloc[:10], bench.iloc[:10], window=30).empty
+
 # Testes de integração (usando dados reais)
 class TestPortfolioAnalyzerIntegration:
     @pytest.mark.skip(reason="Integration test requires live data and may fail with insufficient data")
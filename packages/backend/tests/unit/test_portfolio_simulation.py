@@ -0,0 +1,72 @@
+"""
+Testes unitários para o PortfolioSimulator.
+"""
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import date
+from unittest.mock import MagicMock
+
+from backend_projeto.application.portfolio_simulation import PortfolioSimulator
+from backend_projeto.infrastructure.data_handling import YFinanceProvider
+from backend_projeto.infrastructure.utils.config import Settings
+
+# Fixtures
+@pytest.fixture
+def sample_prices():
+    """Retorna preços diários de exemplo para dois ativos."""
+    idx = pd.bdate_range('2023-01-02', periods=120)
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'PETR4.SA': 25 * np.cumprod(1 + rng.normal(0, 0.01, len(idx))),
+        'VALE3.SA': 70 * np.cumprod(1 + rng.normal(0, 0.01, len(idx))),
+    }, index=idx)
+
+@pytest.fixture
+def simulator(sample_prices):
+    loader = MagicMock(spec=YFinanceProvider)
+    loader.fetch_stock_prices.return_value = sample_prices
+    return PortfolioSimulator(data_loader=loader, config=Settings())
+
+@pytest.fixture
+def sample_orders():
+    return [
+        {'asset': 'PETR4.SA', 'type': 'BUY', 'quantity': 100, 'date': '2023-01-07'},
+        {'asset': 'VALE3.SA', 'type': 'BUY', 'quantity': 20, 'date': '2023-02-01', 'price': 69.0},
+        {'asset': 'PETR4.SA', 'type': 'SELL', 'quantity': 40, 'date': '2023-03-15'},
+    ]
+
+# Testes para PortfolioSimulator
+class TestPortfolioSimulator:
+    def test_positions_and_value(self, simulator, sample_prices, sample_orders):
+        portfolio_value, positions, metrics = simulator.simulate_portfolio(
+            10000.0, date(2023, 1, 1), date(2023, 6, 30), sample_orders
+        )
+
+        # Ordem de sábado executa no pregão seguinte
+        assert positions.loc['2023-01-06', 'PETR4.SA'] == 0
+        assert positions.loc['2023-01-09', 'PETR4.SA'] == 100
+        assert positions['PETR4.SA'].iloc[-1] == 60
+        assert positions['VALE3.SA'].iloc[-1] == 20
+
+        buy_petr = 100 * sample_prices.loc['2023-01-09', 'PETR4.SA']
+        sell_petr = 40 * sample_prices.loc['2023-03-15', 'PETR4.SA']
+        cash = 10000.0 - buy_petr - 20 * 69.0 + sell_petr
+        expected_last = cash + (positions.iloc[-1] * sample_prices.iloc[-1]).sum()
+        assert portfolio_value.iloc[-1] == pytest.approx(expected_last, rel=1e-6)
+
+        assert metrics['max_drawdown'] <= 0
+        assert set(metrics) >= {'total_return', 'annualized_return', 'volatility', 'sharpe_ratio'}
+
+    def test_insufficient_funds(self, simulator):
+        orders = [{'asset': 'PETR4.SA', 'type': 'BUY', 'quantity': 1e6, 'date': '2023-01-09'}]
+        with pytest.raises(ValueError, match="Fundos insuficientes"):
+            simulator.simulate_portfolio(10000.0, date(2023, 1, 1), date(2023, 6, 30), orders)
+
+    def test_insufficient_position(self, simulator):
+        orders = [
+            {'asset': 'PETR4.SA', 'type': 'BUY', 'quantity': 10, 'date': '2023-01-09'},
+            {'asset': 'PETR4.SA', 'type': 'SELL', 'quantity': 11, 'date': '2023-01-10'},
+        ]
+        with pytest.raises(ValueError, match="Posição insuficiente em PETR4.SA"):
+            simulator.simulate_portfolio(10000.0, date(2023, 1, 1), date(2023, 6, 30), orders)
@@ -81,6 +81,79 @@ class TestRiskEngine:
         # Verifica se a soma dos pesos é aproximadamente 1
         assert abs(sum(weights) - 1.0) < 1e-10
 
+    def test_compute_returns_matches_pandas_pct_change(self, sample_prices):
+        """Testa os retornos em NumPy contra o pct_change do pandas (índice fora de ordem, lacunas e preço zero)."""
+        from backend_projeto.domain.risk_engine import compute_returns
+        from backend_projeto.domain.financial_math import _returns_from_prices
+
+        prices = sample_prices.copy()
+        prices.iloc[[3, 4], 0] = np.nan
+        prices.iloc[10, 1] = 0.0
+        prices = prices.iloc[::-1]
+
+        # Preenchimento para frente do fill_method='pad' padrão, escrito de forma explícita
+        raw = prices.sort_index().ffill().pct_change(fill_method=None)
+        pd.testing.assert_frame_equal(_returns_from_prices(prices), raw.dropna(how='all'))
+        expected = raw.dropna(how='all').replace([np.inf, -np.inf], np.nan).dropna(how='all')
+        pd.testing.assert_frame_equal(compute_returns(prices), expected)
+
+    def test_monthly_returns_match_resampled_pct_change(self, sample_prices):
+        """Testa os retornos mensais em NumPy contra resample + pct_change do pandas."""
+        from backend_projeto.domain.fama_french import _monthly_returns_from_prices
+
+        prices = sample_prices.iloc[::-1]
+        expected = sample_prices.resample('M').last().pct_change(fill_method=None).dropna(how='all')
+        pd.testing.assert_frame_equal(_monthly_returns_from_prices(prices), expected, check_freq=False)
+
+    def test_ff3_batched_ols_matches_statsmodels(self):
+        """Testa a regressão FF3 em lote (uma QR por padrão de NaN) contra o OLS do statsmodels."""
+        import statsmodels.api as sm
+        from backend_projeto.domain.fama_french import ff3_metrics
+
+        rng = np.random.default_rng(3)
+        days = pd.bdate_range('2018-01-01', '2023-12-31')
+        prices = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0.0004, 0.01, (len(days), 3)), axis=0),
+                              index=days, columns=['A', 'B', 'C'])
+        prices.loc[:'2018-06-30', 'C'] = np.nan
+        months = prices.resample('M').last().index
+        factors = pd.DataFrame(rng.normal(0.0, 0.04, (len(months), 3)), index=months,
+                               columns=['MKT_RF', 'SMB', 'HML'])
+        rf = pd.Series(0.004, index=months)
+
+        result = ff3_metrics(prices, factors, rf, ['A', 'B', 'C'])['results']
+        monthly = prices.resample('M').last().pct_change(fill_method=None)
+        assert list(result) == ['A', 'B', 'C']
+        for a in ['A', 'B', 'C']:
+            y = (monthly[a] - rf).dropna()
+            res = sm.OLS(y.values, sm.add_constant(factors.loc[y.index]).values).fit(method='qr')
+            assert result[a]['n_obs'] == int(res.nobs)
+            np.testing.assert_allclose(
+                [result[a][k] for k in ('alpha', 'beta_mkt', 'beta_smb', 'beta_hml')], res.params, rtol=1e-8)
+            np.testing.assert_allclose(result[a]['tstats'], res.tvalues, rtol=1e-8)
+            np.testing.assert_allclose(result[a]['pvalues'], res.pvalues, rtol=1e-6)
+            assert result[a]['r2'] == pytest.approx(res.rsquared, rel=1e-10)
+
+    @pytest.mark.parametrize('numba', [True, False])
+    def test_portfolio_returns_renormalizes_over_available_assets(self, numba, sample_prices):
+        """Testa a renormalização dos pesos nas datas com ativos sem retorno."""
+        from backend_projeto.domain import risk_engine as module
+
+        rets = sample_prices.pct_change().iloc[1:]
+        rets.iloc[[0, 5], 0] = np.nan
+        rets.iloc[5, 1:] = np.nan
+        weights = [0.5, 0.3, 0.2]
+
+        with patch.object(module, 'NUMBA_AVAILABLE', numba):
+            port = module.portfolio_returns(rets, list(rets.columns), weights)
+
+        w = pd.Series(np.array(weights) / sum(weights), index=rets.columns)
+        w_masked = rets.notna().mul(w, axis=1)
+        w_norm = w_masked.div(w_masked.sum(axis=1).replace(0.0, np.nan), axis=0).fillna(0.0)
+        expected = (rets.fillna(0.0) * w_norm).sum(axis=1)
+        assert port.name == 'portfolio'
+        pd.testing.assert_series_equal(port, expected, check_names=False)
+        assert port.iloc[5] == 0.0
+
     @patch('backend_projeto.domain.risk_engine.var_historical')
     def test_compute_var_historical(self, mock_var, risk_engine, sample_prices):
         """Testa o cálculo do VaR pelo método histórico."""
@@ -161,6 +234,156 @@ class TestRiskEngine:
         assert 'std' in result['comparison']
         assert 'ewma' in result['comparison']
 
+# Testes para as métricas de risco
+class TestRiskMetrics:
+    @pytest.mark.parametrize('numba', [True, False])
+    def test_ewma_var_matches_python_recurrence(self, numba, sample_prices):
+        """Testa a variância EWMA (kernel e forma fechada) contra a recorrência em Python."""
+        from backend_projeto.domain import risk_metrics
+
+        returns = sample_prices['PETR4.SA'].pct_change()
+        x = returns.fillna(0.0).to_numpy()
+        var = np.mean(x[:30] ** 2)
+        for xi in x:
+            var = 0.94 * var + 0.06 * xi ** 2
+
+        with patch.object(risk_metrics, 'NUMBA_AVAILABLE', numba):
+            _, details = risk_metrics.var_parametric(returns, alpha=0.99, method='ewma', ewma_lambda=0.94)
+        assert details['sigma'] == pytest.approx(np.sqrt(var), rel=1e-12)
+
+    def test_as_weights_normalizes_and_validates(self):
+        """Testa a normalização única de pesos usada por portfolio_returns e IVaR/MVaR."""
+        from backend_projeto.domain.analysis import _as_weights
+
+        np.testing.assert_allclose(_as_weights(['A', 'B', 'C', 'D'], None), np.full(4, 0.25))
+        np.testing.assert_allclose(_as_weights(['A', 'B'], []), [0.5, 0.5])
+        np.testing.assert_allclose(_as_weights(['A', 'B'], np.array([3.0, 1.0])), [0.75, 0.25])
+        with pytest.raises(ValueError, match="Tamanho"):
+            _as_weights(['A', 'B'], [1.0])
+        with pytest.raises(ValueError, match="zero"):
+            _as_weights(['A', 'B'], [1.0, -1.0])
+
+    def test_std_var_matches_pandas_moments(self, sample_prices):
+        """Testa o VaR paramétrico em NumPy contra média/desvio do pandas, com NaN na série."""
+        from scipy.stats import norm
+        from backend_projeto.domain.risk_metrics import var_parametric
+
+        returns = sample_prices['ITUB4.SA'].pct_change()
+        returns.iloc[10] = np.nan
+        var, details = var_parametric(returns, alpha=0.95, method='std')
+        assert details['mu'] == pytest.approx(returns.mean(), rel=1e-12)
+        assert details['sigma'] == pytest.approx(returns.std(ddof=1), rel=1e-12)
+        assert var == pytest.approx(-(returns.mean() + norm.ppf(0.05) * returns.std(ddof=1)), rel=1e-12)
+
+    @pytest.mark.parametrize('numba', [True, False])
+    def test_drawdown_matches_pandas_reference(self, numba, sample_prices):
+        """Testa o drawdown em uma passada contra cumprod/cummax/idxmin do pandas."""
+        from backend_projeto.domain import risk_metrics
+
+        returns = sample_prices['PETR4.SA'].pct_change()
+        returns.iloc[40] = np.nan
+        cum = (1 + returns).cumprod()
+        peak = cum.cummax()
+        dd = (cum - peak) / peak
+        end = dd.idxmin()
+        end_idx = cum.index.get_loc(end)
+        before = cum.iloc[:end_idx + 1]
+        start = before[before >= peak.iloc[end_idx] * 0.9999].index[-1]
+
+        with patch.object(risk_metrics, 'NUMBA_AVAILABLE', numba):
+            result = risk_metrics.drawdown(returns)
+        assert result['max_drawdown'] == pytest.approx(dd.min(), rel=1e-12)
+        assert result['end'] == end.strftime('%Y-%m-%d')
+        assert result['start'] == start.strftime('%Y-%m-%d')
+
+    @pytest.mark.parametrize('alpha', [0.9, 0.95, 0.99, 0.999])
+    def test_historical_var_es_match_pandas_quantile(self, alpha, sample_prices):
+        """Testa VaR/ES históricos por np.partition contra o quantil interpolado do pandas."""
+        from backend_projeto.domain.risk_metrics import var_historical, es_historical
+
+        returns = sample_prices['VALE3.SA'].pct_change()
+        q = returns.quantile(1 - alpha)
+        tail = returns[returns < q]
+
+        var, details = var_historical(returns, alpha)
+        assert var == pytest.approx(-q, rel=1e-12) and details['quantile'] == pytest.approx(q, rel=1e-12)
+        es, details = es_historical(returns, alpha)
+        assert es == pytest.approx(-tail.mean(), rel=1e-12)
+        assert details['n_tail'] == len(tail)
+
+    @pytest.mark.parametrize('method', ['historical', 'std', 'ewma'])
+    def test_incremental_and_marginal_var_match_recomputed_portfolios(self, method, sample_prices):
+        """Testa IVaR/MVaR (atualizações de posto 1 e momentos pré-calculados) contra carteiras remontadas."""
+        from backend_projeto.domain.covariance import incremental_var, marginal_var
+        from backend_projeto.domain.risk_metrics import var_historical, var_parametric
+
+        rets = sample_prices.pct_change().iloc[1:]
+        assets = list(rets.columns)
+        weights = [0.5, 0.3, 0.2]
+
+        def var_of(w, cols):
+            port = pd.Series(rets[cols].to_numpy() @ (np.asarray(w) / np.sum(w)))
+            if method == 'historical':
+                return var_historical(port, 0.99)[0]
+            return var_parametric(port, 0.99, method=method)[0]
+
+        base = var_of(weights, assets)
+        ivar = incremental_var(rets, assets, weights, alpha=0.99, method=method, delta=0.05)
+        mvar = marginal_var(rets, assets, weights, alpha=0.99, method=method)
+        assert ivar['base_var'] == pytest.approx(base, rel=1e-9)
+        for i, a in enumerate(assets):
+            bumped = list(weights)
+            bumped[i] += 0.05
+            rest = [j for j in range(len(assets)) if j != i]
+            assert ivar['ivar'][a] == pytest.approx(var_of(bumped, assets) - base, rel=1e-7, abs=1e-12)
+            assert mvar['mvar'][a] == pytest.approx(
+                var_of([weights[j] for j in rest], [assets[j] for j in rest]) - base, rel=1e-7, abs=1e-12)
+
+    @pytest.mark.parametrize('method', ['historical', 'std', 'ewma'])
+    def test_rolling_backtest_var_matches_window_loop(self, method, sample_prices):
+        """Testa o VaR móvel vetorizado do backtest contra o cálculo janela a janela."""
+        from scipy.stats import norm
+        from backend_projeto.domain.stress_testing import _rolling_var
+
+        returns = sample_prices['VALE3.SA'].pct_change().iloc[1:]
+        returns.iloc[50] = np.nan
+        window, z = 40, norm.ppf(0.95)
+        expected = []
+        for i in range(window, len(returns)):
+            w = returns.iloc[i - window:i]
+            if method == 'historical':
+                expected.append(-np.percentile(w, 5.0))
+            elif method == 'std':
+                expected.append(w.std() * z)
+            else:
+                expected.append(w.ewm(alpha=1 - 0.94).std().iloc[-1] * z)
+
+        result = _rolling_var(returns, window, 0.95, method, 0.94, z)
+        np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-14)
+
+    def test_risk_attribution_contributions_sum_to_volatility(self, sample_prices):
+        """Testa a atribuição de risco vetorizada: Σ contribuições = vol da carteira (Euler)."""
+        from backend_projeto.domain.covariance import risk_attribution
+
+        rets = sample_prices.pct_change().iloc[1:]
+        result = risk_attribution(rets, list(rets.columns), [2.0, 1.0, 1.0])
+        assert result['weights'] == pytest.approx([0.5, 0.25, 0.25])
+        assert sum(result['contribution_vol']) == pytest.approx(result['portfolio_vol'], rel=1e-12)
+
+    def test_historical_mvar_kernel_matches_numpy_path(self, sample_prices):
+        """Testa o kernel paralelo de MVaR histórico contra o laço em NumPy."""
+        from backend_projeto.domain import covariance
+
+        rets = sample_prices.pct_change().iloc[1:]
+        assets = list(rets.columns)
+        results = {}
+        for numba in (True, False):
+            with patch.object(covariance, 'NUMBA_AVAILABLE', numba):
+                results[numba] = covariance.marginal_var(rets, assets, [0.5, 0.3, 0.2], alpha=0.95)
+        assert results[True]['base_var'] == results[False]['base_var']
+        for a in assets:
+            assert results[True]['mvar'][a] == pytest.approx(results[False]['mvar'][a], rel=1e-9, abs=1e-12)
+
 # Testes para erros e casos extremos
 class TestRiskEngineEdgeCases:
     def test_empty_assets(self, risk_engine):
@@ -0,0 +1,121 @@
+"""
+Testes unitários para o TradingCalendar.
+"""
+import os
+import sys
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from datetime import date, datetime, timedelta
+
+from backend_projeto.domain.trading_calendar import TradingCalendar, _easter_ordinals
+
+# Fixtures
+@pytest.fixture(scope="module")
+def calendar(tmp_path_factory):
+    # Não grava a máscara no ~/.cache real durante os testes
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sys.modules[TradingCalendar.__module__], '_MASK_CACHE_DIR',
+                   tmp_path_factory.mktemp('calendar_cache'))
+        yield TradingCalendar()
+
+# Testes para TradingCalendar
+class TestTradingCalendar:
+    def test_easter_ordinals(self):
+        years = np.array([2000, 2019, 2024, 2025, 2038], dtype=np.int64)
+        easter = [date.fromordinal(int(o)) for o in _easter_ordinals(years)]
+        assert easter == [date(2000, 4, 23), date(2019, 4, 21), date(2024, 3, 31), date(2025, 4, 20), date(2038, 4, 25)]
+
+    def test_weekends_and_holidays(self, calendar):
+        assert calendar.is_trading_day(date(2024, 3, 28))
+        assert not calendar.is_trading_day(date(2024, 3, 29))  # Sexta-feira Santa
+        assert not calendar.is_trading_day(date(2024, 3, 30))  # Sábado
+        assert not calendar.is_trading_day(datetime(2024, 12, 25, 10, 30))  # Natal
+
+    def test_b3_schedule_covers_moving_holidays(self, calendar):
+        # O calendário B3 já traz Sexta-feira Santa e Corpus Christi como dias sem pregão
+        easter = _easter_ordinals(np.arange(2000, 2030, dtype=np.int64))
+        for o in np.concatenate([easter - 2, easter + 60]):
+            assert not calendar.is_trading_day(date.fromordinal(int(o)))
+
+    def test_outside_loaded_range_uses_weekday_rule(self, calendar):
+        assert calendar.is_trading_day(date(1999, 12, 31))
+        assert not calendar.is_trading_day(date(1999, 12, 25))  # Sábado
+
+    def test_previous_and_next_trading_day(self, calendar):
+        assert calendar.get_previous_trading_day(date(2024, 4, 1)) == date(2024, 3, 28)
+        assert calendar.get_next_trading_day(date(2024, 3, 28)) == date(2024, 4, 1)
+
+    def test_get_trading_days(self, calendar):
+        days = calendar.get_trading_days(date(2024, 3, 27), date(2024, 4, 2))
+        assert days == [date(2024, 3, 27), date(2024, 3, 28), date(2024, 4, 1), date(2024, 4, 2)]
+
+    def test_get_trading_ordinals_spans_loaded_range(self, calendar):
+        ords = calendar.get_trading_ordinals(date(1999, 12, 30), date(2000, 1, 4))
+        assert [date.fromordinal(int(o)) for o in ords] == [date(1999, 12, 30), date(1999, 12, 31), date(2000, 1, 3), date(2000, 1, 4)]
+        assert len(calendar.get_trading_ordinals(date(2024, 1, 5), date(2024, 1, 2))) == 0
+
+    def test_mask_is_cached_on_disk(self, tmp_path, monkeypatch):
+        # O pacote reexporta a instância global com o mesmo nome do módulo
+        module = sys.modules[TradingCalendar.__module__]
+        monkeypatch.setattr(module, '_MASK_CACHE_DIR', tmp_path)
+        built = TradingCalendar()
+        assert len(list(tmp_path.glob('calendar_*.npy'))) == 1
+
+        cached = TradingCalendar()
+        assert isinstance(cached._mask, np.memmap)
+        assert np.array_equal(built._mask, cached._mask)
+
+    def test_disk_cache_key_is_stable_and_old_masks_are_pruned(self, tmp_path, monkeypatch):
+        module = sys.modules[TradingCalendar.__module__]
+        monkeypatch.setattr(module, '_MASK_CACHE_DIR', tmp_path)
+        cal = TradingCalendar()
+        path = cal._mask_cache_path(cal._horizon_end_ord(cal.years_ahead))
+        assert date.fromordinal(cal._horizon_end_ord(1)) == date(date.today().year + 1, 12, 31)
+
+        # Máscaras de outros horizontes do mesmo mercado, da mais nova para a mais antiga
+        others = [tmp_path / f"{cal._mask_cache_prefix()}{i:016x}.npy" for i in range(module._MASK_CACHE_KEEP + 1)]
+        for age, other in enumerate(others, start=1):
+            np.save(other, np.zeros(3, dtype=np.uint8))
+            os.utime(other, (path.stat().st_mtime - age,) * 2)
+        other_market = tmp_path / "calendar_NYSE_20000101_0123456789abcdef.npy"
+        np.save(other_market, np.zeros(3, dtype=np.uint8))
+        cal._save_cached_mask(path)
+
+        kept = [path, *others[:module._MASK_CACHE_KEEP - 1], other_market]
+        assert sorted(p.name for p in tmp_path.glob('calendar_*.npy')) == sorted(p.name for p in kept)
+
+    def test_global_calendar_is_lazy(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys.modules[TradingCalendar.__module__], '_MASK_CACHE_DIR', tmp_path)
+        from backend_projeto.domain.trading_calendar import trading_calendar, get_trading_calendar
+        assert trading_calendar.is_trading_day(date(2024, 3, 28))
+        assert trading_calendar._mask is get_trading_calendar()._mask
+
+    def test_is_trading_day_batch_matches_scalar(self, calendar):
+        days = pd.date_range('1999-12-20', '2000-01-10')
+        expected = [calendar.is_trading_day(d.date()) for d in days]
+        assert calendar.is_trading_day_batch(days).tolist() == expected
+        assert calendar.is_trading_day_batch([d.toordinal() for d in days.date]).tolist() == expected
+
+    def test_horizon_extends_on_demand(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys.modules[TradingCalendar.__module__], '_MASK_CACHE_DIR', tmp_path)
+        cal = TradingCalendar(start_date=date(2024, 1, 1), years_ahead=0)
+        loaded = cal._mask_len
+        target = date.today() + timedelta(days=3 * 365)
+
+        assert cal.get_next_trading_day(target) > target
+        assert cal._mask_len > loaded
+        assert cal._base_ord + cal._mask_len - 1 >= target.toordinal()
+
+    def test_fallback_covers_full_span(self, tmp_path, monkeypatch):
+        module = sys.modules[TradingCalendar.__module__]
+        monkeypatch.setattr(module, '_MASK_CACHE_DIR', tmp_path)
+        monkeypatch.setattr(module.mcal, 'get_calendar', MagicMock(side_effect=RuntimeError("offline")))
+        cal = TradingCalendar()
+
+        assert not cal.is_trading_day(date(2005, 4, 21))  # Tiradentes
+        assert not cal.is_trading_day(date(2005, 3, 25))  # Sexta-feira Santa
+        assert not cal.is_trading_day(date(2005, 5, 26))  # Corpus Christi
+        assert cal.is_trading_day(date(2005, 3, 24))
+        assert not list(tmp_path.glob('calendar_*.npy'))
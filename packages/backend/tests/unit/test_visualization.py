@@ -0,0 +1,153 @@
+"""
+Testes unitários para a fronteira eficiente em visualization.py.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+
+from backend_projeto.infrastructure.data_handling import YFinanceProvider
+from backend_projeto.infrastructure.utils.config import Settings
+from backend_projeto.infrastructure.visualization.visualization import (
+    efficient_frontier_image,
+    _sample_frontier,
+    _sample_frontier_numpy,
+    _frontier_cholesky,
+    _hexbin_cell_means,
+    _FRONTIER_MOMENTS_CACHE,
+    _FRONTIER_MAX_BLOCK_ELEMS,
+    _frontier_axes,
+)
+from backend_projeto.infrastructure.visualization._figure_pool import _pooled_figure
+
+# Fixtures
+@pytest.fixture
+def moments():
+    mu = np.array([0.10, 0.14, 0.08, 0.12])
+    vols = np.array([0.20, 0.30, 0.15, 0.25])
+    corr = np.full((4, 4), 0.3) + 0.7 * np.eye(4)
+    return mu, corr * np.outer(vols, vols)
+
+@pytest.fixture
+def loader():
+    idx = pd.bdate_range('2023-01-02', periods=250)
+    rng = np.random.default_rng(11)
+    prices = pd.DataFrame(
+        100 * np.cumprod(1 + rng.normal(0.0004, 0.01, (len(idx), 3)), axis=0),
+        index=idx, columns=['PETR4.SA', 'VALE3.SA', 'ITUB4.SA'],
+    )
+    mock = MagicMock(spec=YFinanceProvider)
+    mock.fetch_stock_prices.return_value = prices
+    return mock
+
+# Testes para a amostragem da fronteira
+class TestFrontierSampling:
+    @pytest.mark.parametrize("sampler", [_sample_frontier, _sample_frontier_numpy], ids=["numba", "numpy"])
+    def test_sampled_stats_are_consistent(self, sampler, moments):
+        mu, cov = moments
+        L = _frontier_cholesky(cov)
+        if sampler is not _sample_frontier_numpy:
+            mu, L = mu.astype(np.float32), L.astype(np.float32)
+        R, V, S = sampler(mu, L, 2000, 0.5, 0.02)
+
+        assert R.shape == V.shape == S.shape == (2000,)
+        # Carteiras long-only ficam entre o menor e o maior retorno dos ativos
+        assert R.min() >= mu.min() - 1e-6 and R.max() <= mu.max() + 1e-6
+        assert np.all(V > 0) and V.max() <= np.sqrt(cov.diagonal()).max() + 1e-6
+        np.testing.assert_allclose(S, (R - 0.02) / (V + 1e-12), rtol=1e-5)
+
+    def test_numpy_sampler_caps_block_size_for_tight_max_weight(self, moments, monkeypatch):
+        mu, cov = moments
+        L = _frontier_cholesky(cov)
+        draw = np.random.standard_exponential
+        sizes = []
+
+        def recording_draw(size):
+            sizes.append(size[0])
+            return draw(size)
+
+        monkeypatch.setattr(np.random, 'standard_exponential', recording_draw)
+        # Com 4 ativos e peso máximo 0.26 só ~0,006% das carteiras são aceitas
+        R, V, S = _sample_frontier_numpy(mu, L, 300, 0.26, 0.0)
+
+        assert R.shape == V.shape == S.shape == (300,)
+        assert max(sizes) * len(mu) <= _FRONTIER_MAX_BLOCK_ELEMS
+        assert abs(R - mu.mean()).max() < 0.01
+
+    def test_cholesky_handles_singular_covariance(self, moments):
+        _, cov = moments
+        L = _frontier_cholesky(cov)
+        np.testing.assert_allclose(L @ L.T, cov, atol=1e-10)
+        assert np.allclose(L, np.tril(L))
+
+        # Dois ativos idênticos: Σ singular, mas o fator ainda reproduz a covariância
+        singular = np.array([[0.04, 0.04], [0.04, 0.04]])
+        L = _frontier_cholesky(singular)
+        np.testing.assert_allclose(L @ L.T, singular, atol=1e-8)
+
+    def test_image_rejects_unreachable_max_weight(self, loader):
+        with pytest.raises(ValueError, match="max_weight"):
+            efficient_frontier_image(loader, Settings(), ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA'],
+                                     '2023-01-01', '2023-12-31', n_samples=10, max_weight=0.3)
+
+    def test_image_returns_png(self, loader):
+        png = efficient_frontier_image(loader, Settings(), ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA'],
+                                       '2023-01-01', '2023-12-31', n_samples=200, max_weight=0.6)
+        assert png[:8] == b'\x89PNG\r\n\x1a\n'
+
+    def test_image_formats(self, loader):
+        assets = ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA']
+        webp = efficient_frontier_image(loader, Settings(), assets, '2023-01-01', '2023-12-31',
+                                        n_samples=200, max_weight=0.6, fmt='webp')
+        assert webp[:4] == b'RIFF' and webp[8:12] == b'WEBP'
+        with pytest.raises(ValueError, match="Formato"):
+            efficient_frontier_image(loader, Settings(), assets, '2023-01-01', '2023-12-31',
+                                     n_samples=200, max_weight=0.6, fmt='gif')
+
+    def test_image_reuses_cached_moments(self, loader):
+        config = Settings()
+        config.ENABLE_CACHE = True
+        _FRONTIER_MOMENTS_CACHE.clear()
+        assets = ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA']
+        for _ in range(2):
+            png = efficient_frontier_image(loader, config, assets, '2023-01-01', '2023-12-31',
+                                           n_samples=200, max_weight=0.6)
+        _FRONTIER_MOMENTS_CACHE.clear()
+
+        assert png[:8] == b'\x89PNG\r\n\x1a\n'
+        assert loader.fetch_stock_prices.call_count == 1
+
+    def test_image_is_stable_across_pooled_renders(self, loader, monkeypatch):
+        # A figura da fronteira é reaproveitada: a colorbar não pode se acumular no eixo fixo
+        monkeypatch.setattr('backend_projeto.infrastructure.visualization.visualization.NUMBA_AVAILABLE', False)
+        assets = ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA']
+        renders = []
+        for _ in range(30):
+            np.random.seed(0)
+            renders.append(efficient_frontier_image(loader, Settings(), assets, '2023-01-01', '2023-12-31',
+                                                    n_samples=200, max_weight=0.6))
+
+        assert all(png == renders[0] for png in renders)
+        with _pooled_figure(('frontier',), (10, 6), _frontier_axes) as (_, (_, cax)):
+            assert cax.get_axes_locator() is None
+
+    def test_hexbin_cell_means_reproduce_matplotlib_hexbin(self):
+        from matplotlib.figure import Figure
+
+        rng = np.random.default_rng(5)
+        x, y = rng.gamma(4, 0.05, 3000), rng.normal(0.1, 0.05, 3000)
+        c = y / x
+        extent = (x.min(), x.max(), y.min(), y.max())
+        ax = Figure().add_subplot()
+        full = ax.hexbin(x, y, C=c, gridsize=60, extent=extent, reduce_C_function=np.mean, mincnt=1)
+        hx, hy, hc = _hexbin_cell_means(x, y, c, 60, extent)
+        agg = ax.hexbin(hx, hy, C=hc, gridsize=60, extent=extent, reduce_C_function=np.mean, mincnt=1)
+
+        def cells(coll):
+            offsets, values = coll.get_offsets(), np.asarray(coll.get_array())
+            order = np.lexsort(offsets.T)
+            return offsets[order], values[order]
+
+        (off_full, val_full), (off_agg, val_agg) = cells(full), cells(agg)
+        np.testing.assert_allclose(off_agg, off_full)
+        np.testing.assert_allclose(val_agg, val_full)